@@ -13,11 +13,12 @@ sys.path.append(os.path.join(os.path.dirname(__file__), "..", "phase2_knowledge_
 sys.path.append(os.path.join(os.path.dirname(__file__), "..", "phase3_llm_integration"))
 sys.path.append(os.path.join(os.path.dirname(__file__), "..", "phase4_api_service"))
 
-# Import the main FastAPI app
-from phase4_api_service.main import app as main_app
+# Import the main FastAPI app (pandas, SQLAlchemy and groq load on first use, not here)
+from phase4_api_service.main import app as main_app, lifespan
 
-# Create a wrapper app to handle the /api prefix from Vercel
-app = FastAPI()
+# Create a wrapper app to handle the /api prefix from Vercel.
+# Mounted apps don't get lifespan events, so the wrapper runs main's warmup itself.
+app = FastAPI(lifespan=lifespan)
 
 # Mount the main logic under /api to match Vercel's routing
 app.mount("/api", main_app)
@@ -2,9 +2,9 @@ import sys
 import os
 import pandas as pd
 sys.path.append(os.path.join(os.getcwd(), 'phase1_data_ingestion'))
-from data_ingestion import get_zomato_data
+from snapshot import load_restaurant_data
 
-df = get_zomato_data()
+df = load_restaurant_data()
 
 # Check for Belgian Waffle Factory
 waffles = df[df['name'].str.contains('Belgian Waffle Factory', case=False, na=False)]
@@ -3,11 +3,11 @@ import os
 import pandas as pd
 
 sys.path.append(os.path.join(os.getcwd(), 'phase1_data_ingestion'))
-from data_ingestion import get_zomato_data
+from snapshot import load_restaurant_data
 import warnings
 warnings.filterwarnings('ignore')
 
-df = get_zomato_data()
+df = load_restaurant_data()
 
 # Clean up
 df['approx_cost(for two people)'] = pd.to_numeric(df['approx_cost(for two people)'], errors='coerce')
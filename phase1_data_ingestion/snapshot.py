@@ -0,0 +1,239 @@
+import os
+import json
+import time
+import hashlib
+import logging
+from datetime import datetime, timezone
+from typing import Optional, List, Iterable
+
+import pandas as pd
+import pyarrow as pa
+
+from data_ingestion import CATEGORICAL_COLUMNS, HEAVY_TEXT_COLUMNS
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Snapshots live next to the ingestion code so Vercel ships them with the function ("phase*/**")
+SNAPSHOT_DIR = os.getenv(
+    "SNAPSHOT_DIR",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "snapshots")
+)
+MANIFEST_NAME = "manifest.json"
+SNAPSHOT_FORMAT_VERSION = 1
+
+
+def _file_sha256(path: str, chunk_size: int = 1 << 20) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _write_json_atomic(path: str, payload: dict) -> None:
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(payload, f, indent=2)
+    os.replace(tmp_path, path)
+
+
+def read_manifest(snapshot_dir: Optional[str] = None) -> Optional[dict]:
+    """
+    Returns the manifest of the current snapshot, or None if no snapshot has been built yet.
+    """
+    manifest_path = os.path.join(snapshot_dir or SNAPSHOT_DIR, MANIFEST_NAME)
+    if not os.path.exists(manifest_path):
+        return None
+    with open(manifest_path) as f:
+        return json.load(f)
+
+
+def publish_snapshot(tmp_path: str, snapshot_dir: str, rows: int, columns: List[str], source: Optional[str] = None) -> dict:
+    """
+    Renames a fully written Arrow IPC file to its content-hashed name and points the manifest at it.
+    Identical content always maps to the same file, so rebuilding unchanged data is a no-op.
+    """
+    content_hash = _file_sha256(tmp_path)
+    file_name = f"restaurants-{content_hash[:16]}.arrow"
+    final_path = os.path.join(snapshot_dir, file_name)
+    if os.path.exists(final_path):
+        os.remove(tmp_path)
+    else:
+        os.replace(tmp_path, final_path)
+
+    previous = read_manifest(snapshot_dir)
+    manifest = {
+        "format_version": SNAPSHOT_FORMAT_VERSION,
+        "file": file_name,
+        "content_hash": content_hash,
+        "rows": rows,
+        "columns": columns,
+        "bytes": os.path.getsize(final_path),
+        "source": source,
+        "created_at": datetime.now(timezone.utc).isoformat(),
+        "previous_hash": previous.get("content_hash") if previous else None,
+    }
+    _write_json_atomic(os.path.join(snapshot_dir, MANIFEST_NAME), manifest)
+    logger.info(f"Published snapshot {file_name} ({rows} rows, {manifest['bytes']} bytes).")
+    return manifest
+
+
+def write_snapshot(df: pd.DataFrame, snapshot_dir: Optional[str] = None, source: Optional[str] = None) -> dict:
+    """
+    Writes a cleaned DataFrame to a content-hashed Arrow IPC file and updates the manifest.
+    Returns the new manifest.
+    """
+    snapshot_dir = snapshot_dir or SNAPSHOT_DIR
+    os.makedirs(snapshot_dir, exist_ok=True)
+
+    table = pa.Table.from_pandas(df, preserve_index=False)
+    tmp_path = os.path.join(snapshot_dir, f".restaurants-{os.getpid()}.arrow.tmp")
+    # Uncompressed IPC so the loader can memory-map the buffers without copying
+    with pa.OSFile(tmp_path, "wb") as sink:
+        with pa.ipc.new_file(sink, table.schema) as writer:
+            writer.write_table(table)
+
+    return publish_snapshot(tmp_path, snapshot_dir, table.num_rows, table.column_names, source)
+
+
+def _decode_dictionaries(table: pa.Table) -> pa.Table:
+    # Each batch carries its own categorical dictionary and IPC files can't replace dictionaries
+    # mid-stream, so categoricals are stored as plain strings and re-encoded by the loader.
+    for i, field in enumerate(table.schema):
+        if pa.types.is_dictionary(field.type):
+            table = table.set_column(i, field.name, table.column(i).cast(field.type.value_type))
+    return table
+
+
+def write_snapshot_batches(batches: Iterable[pd.DataFrame], snapshot_dir: Optional[str] = None, source: Optional[str] = None, stats=None) -> dict:
+    """
+    Incrementally appends DataFrame batches to a new snapshot, so only one batch is in memory at a time.
+    The schema is fixed by the first batch; later batches are cast to it.
+    """
+    snapshot_dir = snapshot_dir or SNAPSHOT_DIR
+    os.makedirs(snapshot_dir, exist_ok=True)
+    tmp_path = os.path.join(snapshot_dir, f".restaurants-{os.getpid()}.arrow.tmp")
+
+    schema = None
+    rows = 0
+    with pa.OSFile(tmp_path, "wb") as sink:
+        writer = None
+        try:
+            for batch in batches:
+                start = time.perf_counter()
+                table = _decode_dictionaries(pa.Table.from_pandas(batch, preserve_index=False))
+                if writer is None:
+                    schema = table.schema
+                    writer = pa.ipc.new_file(sink, schema)
+                else:
+                    table = table.cast(schema)
+                writer.write_table(table)
+                rows += table.num_rows
+                if stats is not None:
+                    stats.add("write", table.num_rows, time.perf_counter() - start)
+        finally:
+            if writer is not None:
+                writer.close()
+
+    if schema is None:
+        os.remove(tmp_path)
+        raise ValueError("No batches were produced; refusing to publish an empty snapshot.")
+
+    return publish_snapshot(tmp_path, snapshot_dir, rows, schema.names, source)
+
+
+def open_snapshot(snapshot_dir: Optional[str] = None, verify: bool = False) -> pa.Table:
+    """
+    Memory-maps the current snapshot and returns it as a zero-copy Arrow table.
+    Set verify=True to re-hash the file against the manifest (reads the whole file).
+    """
+    snapshot_dir = snapshot_dir or SNAPSHOT_DIR
+    manifest = read_manifest(snapshot_dir)
+    if manifest is None:
+        raise FileNotFoundError(
+            f"No snapshot manifest in {snapshot_dir}. Run `python phase1_data_ingestion/snapshot.py` first."
+        )
+
+    path = os.path.join(snapshot_dir, manifest["file"])
+    if verify and _file_sha256(path) != manifest["content_hash"]:
+        raise ValueError(f"Snapshot {path} does not match its manifest hash.")
+
+    source = pa.memory_map(path, "r")
+    return pa.ipc.open_file(source).read_all()
+
+
+def load_snapshot(
+    snapshot_dir: Optional[str] = None,
+    columns: Optional[List[str]] = None,
+    include_text: bool = True,
+    verify: bool = False
+) -> pd.DataFrame:
+    """
+    Loads the current snapshot as a pandas DataFrame.
+    Pass `columns` to materialize only what you need; untouched columns are never paged in.
+    With include_text=False the heavy review/menu columns are skipped (see load_text_columns).
+    """
+    start = time.perf_counter()
+    table = open_snapshot(snapshot_dir, verify=verify)
+    if columns:
+        table = table.select([c for c in columns if c in table.column_names])
+    if not include_text:
+        table = table.drop_columns([c for c in HEAVY_TEXT_COLUMNS if c in table.column_names])
+    df = table.to_pandas()
+    for col in CATEGORICAL_COLUMNS:
+        if col in df.columns and not isinstance(df[col].dtype, pd.CategoricalDtype):
+            df[col] = df[col].astype('category')
+    logger.info(f"Loaded snapshot with {len(df)} rows in {(time.perf_counter() - start) * 1000:.1f} ms.")
+    return df
+
+
+def load_text_columns(snapshot_dir: Optional[str] = None, columns: Optional[List[str]] = None) -> pd.DataFrame:
+    """
+    Lazily materializes the heavy text columns, row-aligned with load_snapshot().
+    """
+    return load_snapshot(snapshot_dir, columns=columns or HEAVY_TEXT_COLUMNS)
+
+
+def load_restaurant_data(snapshot_dir: Optional[str] = None, columns: Optional[List[str]] = None) -> pd.DataFrame:
+    """
+    Preferred entry point for scripts: reads the local snapshot, and only falls back to
+    streaming from Hugging Face when no snapshot has been built.
+    """
+    if read_manifest(snapshot_dir) is not None:
+        return load_snapshot(snapshot_dir, columns=columns)
+
+    logger.warning("No snapshot found, falling back to Hugging Face download.")
+    from data_ingestion import get_zomato_data
+    df = get_zomato_data()
+    if columns:
+        df = df[[c for c in columns if c in df.columns]]
+    return df
+
+
+def build_snapshot(
+    dataset_name: str = "ManikaSaini/zomato-restaurant-recommendation",
+    snapshot_dir: Optional[str] = None,
+    streaming: bool = True,
+    batch_size: int = 2000
+) -> dict:
+    """
+    Downloads and cleans the full dataset once, then writes it as a snapshot.
+    Streaming mode keeps peak memory flat by cleaning and writing one batch at a time.
+    """
+    if not streaming:
+        from data_ingestion import get_zomato_data
+        df = get_zomato_data(dataset_name, limit=None)
+        return write_snapshot(df, snapshot_dir, source=dataset_name)
+
+    from data_ingestion import stream_zomato_data, StageStats
+    stats = StageStats()
+    batches = stream_zomato_data(dataset_name, batch_size=batch_size, stats=stats)
+    manifest = write_snapshot_batches(batches, snapshot_dir, source=dataset_name, stats=stats)
+    manifest["stage_stats"] = stats.report()
+    return manifest
+
+
+if __name__ == "__main__":
+    manifest = build_snapshot()
+    print(json.dumps(manifest, indent=2))
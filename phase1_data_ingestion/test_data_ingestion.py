@@ -1,6 +1,6 @@
 import pytest
 import pandas as pd
-from data_ingestion import get_zomato_data
+from data_ingestion import get_zomato_data, clean_dataframe, StageStats, iter_record_batches, dedup_batches, clean_batches
 
 def test_data_ingestion():
     # Attempt to load data
@@ -24,3 +24,57 @@ def test_data_ingestion():
     if 'name' in df.columns and 'address' in df.columns:
         duplicates = df.duplicated(subset=['name', 'address']).sum()
         assert duplicates == 0, f"Found {duplicates} duplicate restaurants in the dataset"
+
+def _raw_records():
+    return [
+        {'name': 'A', 'address': '1 Road', 'rate': '4.1/5', 'approx_cost(for two people)': '1,200', 'cuisines': 'Cafe,Bakery'},
+        {'name': 'B', 'address': '2 Road', 'rate': 'NEW', 'approx_cost(for two people)': '300', 'cuisines': 'Chinese'},
+        {'name': 'A', 'address': '1 Road', 'rate': '4.1/5', 'approx_cost(for two people)': '1,200', 'cuisines': 'Cafe,Bakery'},
+        {'name': 'C', 'address': '3 Road', 'rate': '3.9 /5', 'approx_cost(for two people)': '800', 'cuisines': 'North Indian'},
+        {'name': 'B', 'address': '2 Road', 'rate': 'NEW', 'approx_cost(for two people)': '300', 'cuisines': 'Chinese'},
+    ]
+
+def test_streaming_dedup_across_batches():
+    stats = StageStats()
+    batches = iter_record_batches(iter(_raw_records()), batch_size=2, stats=stats)
+    cleaned = list(clean_batches(dedup_batches(batches, stats), stats))
+
+    df = pd.concat(cleaned, ignore_index=True)
+    assert df['name'].tolist() == ['A', 'B', 'C']
+    assert df['approx_cost(for two people)'].tolist() == [1200, 300, 800]
+    assert df['cuisines'].iloc[0] == 'Cafe, Bakery'
+
+    report = stats.report()
+    assert report['read']['rows'] == 5
+    assert report['dedup']['rows'] == 5
+    assert report['clean']['rows'] == 3
+    assert all(stage['rows_per_sec'] > 0 for stage in report.values())
+
+def test_clean_dataframe_compact_dtypes():
+    raw = pd.DataFrame(_raw_records()).assign(
+        location=[' BTM', 'HSR ', ' BTM', 'BTM', 'HSR'],
+        online_order=['Yes', 'No', 'Yes', 'yes', 'No'],
+        reviews_list=['  long review  '] * 5,
+    )
+    df = clean_dataframe(raw)
+
+    assert df['rate'].dtype == 'float32'
+    assert str(df['approx_cost(for two people)'].dtype) == 'Int32'
+    assert df['online_order'].dtype == bool
+    assert df['online_order'].tolist() == [True, False, True, True, False]
+    assert isinstance(df['location'].dtype, pd.CategoricalDtype)
+    assert sorted(df['location'].cat.categories) == ['BTM', 'HSR']
+    assert pd.isna(df['rate'].iloc[1])
+
+    # Heavy text is left untouched rather than stripped
+    assert df['reviews_list'].iloc[0] == '  long review  '
+
+    report = df.attrs['cleaning_report']
+    assert set(report['timings_ms']) >= {'cost', 'rate', 'cuisines', 'categoricals'}
+    assert 0 < report['memory_bytes_after']
+
+def test_clean_dataframe_drop_text():
+    raw = pd.DataFrame(_raw_records()).assign(reviews_list='x', menu_item='y')
+    df = clean_dataframe(raw, drop_text=True)
+    assert 'reviews_list' not in df.columns
+    assert 'menu_item' not in df.columns
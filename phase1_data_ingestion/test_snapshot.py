@@ -0,0 +1,74 @@
+import pytest
+import pandas as pd
+from snapshot import write_snapshot, write_snapshot_batches, load_snapshot, load_text_columns, read_manifest, open_snapshot
+
+@pytest.fixture
+def cleaned_df():
+    return pd.DataFrame({
+        'name': ['Restaurant A', 'Restaurant B'],
+        'address': ['1 MG Road', '2 Church Street'],
+        'location': pd.Categorical(['MG Road', 'Church Street']),
+        'cuisines': ['North Indian, Chinese', 'Cafe'],
+        'approx_cost(for two people)': [500.0, 300.0],
+        'rate': [4.5, 3.8]
+    })
+
+def test_snapshot_round_trip(cleaned_df, tmp_path):
+    manifest = write_snapshot(cleaned_df, str(tmp_path), source="unit-test")
+
+    assert manifest["rows"] == 2
+    assert manifest["file"] == f"restaurants-{manifest['content_hash'][:16]}.arrow"
+    assert read_manifest(str(tmp_path)) == manifest
+
+    df = load_snapshot(str(tmp_path))
+    pd.testing.assert_frame_equal(df, cleaned_df)
+
+def test_snapshot_column_selection(cleaned_df, tmp_path):
+    write_snapshot(cleaned_df, str(tmp_path))
+    df = load_snapshot(str(tmp_path), columns=['name', 'rate'])
+    assert df.columns.tolist() == ['name', 'rate']
+
+def test_snapshot_is_content_hashed(cleaned_df, tmp_path):
+    first = write_snapshot(cleaned_df, str(tmp_path))
+    again = write_snapshot(cleaned_df, str(tmp_path))
+    assert again["content_hash"] == first["content_hash"]
+
+    changed = cleaned_df.assign(rate=[4.6, 3.8])
+    second = write_snapshot(changed, str(tmp_path))
+    assert second["content_hash"] != first["content_hash"]
+    assert second["previous_hash"] == first["content_hash"]
+
+    # Verification re-hashes the memory-mapped file against the manifest
+    assert open_snapshot(str(tmp_path), verify=True).num_rows == 2
+
+def test_missing_snapshot_raises(tmp_path):
+    with pytest.raises(FileNotFoundError):
+        load_snapshot(str(tmp_path))
+
+def test_snapshot_from_batches(cleaned_df, tmp_path):
+    batches = [cleaned_df.iloc[:1], cleaned_df.iloc[1:]]
+    manifest = write_snapshot_batches(iter(batches), str(tmp_path))
+    assert manifest["rows"] == 2
+
+    pd.testing.assert_frame_equal(load_snapshot(str(tmp_path)), cleaned_df)
+
+def test_snapshot_from_no_batches(tmp_path):
+    with pytest.raises(ValueError):
+        write_snapshot_batches(iter([]), str(tmp_path))
+
+def test_snapshot_batches_keep_compact_dtypes(tmp_path):
+    batches = [
+        pd.DataFrame({'name': ['A'], 'location': pd.Categorical(['BTM']), 'reviews_list': ['long'],
+                      'approx_cost(for two people)': pd.array([500], dtype='Int32')}),
+        pd.DataFrame({'name': ['B'], 'location': pd.Categorical(['HSR']), 'reviews_list': ['text'],
+                      'approx_cost(for two people)': pd.array([None], dtype='Int32')}),
+    ]
+    write_snapshot_batches(iter(batches), str(tmp_path))
+
+    df = load_snapshot(str(tmp_path), include_text=False)
+    assert 'reviews_list' not in df.columns
+    assert isinstance(df['location'].dtype, pd.CategoricalDtype)
+    assert str(df['approx_cost(for two people)'].dtype) == 'Int32'
+
+    text = load_text_columns(str(tmp_path))
+    assert text['reviews_list'].tolist() == ['long', 'text']
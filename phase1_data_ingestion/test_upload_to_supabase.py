@@ -0,0 +1,79 @@
+import os
+import pytest
+import pandas as pd
+from sqlalchemy import create_engine, text
+from upload_to_supabase import CsvCopyStream, prepare_frame, build_upsert_sql, upload_data, _psycopg2_url
+
+TEST_DATABASE_URL = os.getenv("TEST_DATABASE_URL")
+
+@pytest.fixture
+def cleaned_df():
+    return pd.DataFrame({
+        'name': ['Restaurant A', 'Restaurant B', 'Restaurant C'],
+        'address': ['1 MG Road', None, '3 Church Street'],
+        'location': pd.Categorical(['MG Road', 'BTM', 'Church Street']),
+        'cuisines': ['North Indian, Chinese', '', 'Cafe'],
+        'online_order': [True, False, True],
+        'approx_cost(for two people)': pd.array([500, None, 800], dtype='Int32'),
+        'rate': pd.array([4.5, None, 3.9], dtype='float32')
+    })
+
+def test_prepare_frame_renames_and_fills_keys(cleaned_df):
+    df = prepare_frame(cleaned_df)
+    assert 'approx_costfor_two_people' in df.columns
+    assert df['address'].tolist() == ['1 MG Road', '', '3 Church Street']
+
+def test_copy_stream_renders_nulls_lazily(cleaned_df):
+    df = prepare_frame(cleaned_df)
+    stream = CsvCopyStream(df, chunk_rows=1)
+
+    pieces = []
+    while True:
+        piece = stream.read(7)
+        if not piece:
+            break
+        pieces.append(piece)
+    lines = b"".join(pieces).decode("utf-8").splitlines()
+
+    assert len(lines) == 3
+    # Missing cost/rate (and their typed copies) become the COPY NULL marker;
+    # the empty cuisine stays an empty string
+    assert lines[1] == 'Restaurant B,,BTM,,False,\\N,\\N,\\N,\\N'
+
+def test_prepare_frame_adds_typed_columns():
+    legacy = pd.DataFrame({'name': ['A', 'B'], 'address': ['x', 'y'], 'rate': ['4.1/5', 'NEW'],
+                           'approx_cost(for two people)': ['1,200', '300']})
+    df = prepare_frame(legacy)
+    assert df['rate_numeric'].tolist()[0] == pytest.approx(4.1)
+    assert pd.isna(df['rate_numeric'].iloc[1])
+    assert df['cost_numeric'].tolist() == [1200, 300]
+
+def test_upsert_sql_only_touches_changed_rows():
+    sql = build_upsert_sql(['name', 'address', 'rate'])
+    assert 'ON CONFLICT ("name", "address")' in sql
+    assert 'IS DISTINCT FROM' in sql
+    assert '"rate" = EXCLUDED."rate"' in sql
+
+@pytest.mark.skipif(not TEST_DATABASE_URL, reason="TEST_DATABASE_URL not set (point it at a disposable local Postgres)")
+def test_incremental_reload(cleaned_df):
+    engine = create_engine(_psycopg2_url(TEST_DATABASE_URL))
+    with engine.begin() as conn:
+        conn.execute(text("DROP TABLE IF EXISTS restaurants CASCADE"))
+
+    first = upload_data(TEST_DATABASE_URL, cleaned_df)
+    assert (first["inserted"], first["updated"], first["deleted"]) == (3, 0, 0)
+
+    # Unchanged rows are skipped entirely
+    again = upload_data(TEST_DATABASE_URL, cleaned_df)
+    assert (again["inserted"], again["updated"], again["deleted"]) == (0, 0, 0)
+
+    changed = cleaned_df.iloc[:2].copy()
+    changed.loc[0, 'rate'] = 4.8
+    last = upload_data(TEST_DATABASE_URL, changed)
+    assert (last["inserted"], last["updated"], last["deleted"]) == (0, 1, 1)
+
+    with engine.connect() as conn:
+        rows = conn.execute(text("SELECT name, rate FROM restaurants ORDER BY name")).fetchall()
+    assert [r[0] for r in rows] == ['Restaurant A', 'Restaurant B']
+    assert rows[0][1] == pytest.approx(4.8)
+    assert rows[1][1] is None
@@ -0,0 +1,142 @@
+import json
+import time
+import hashlib
+import logging
+from typing import Optional
+
+import numpy as np
+
+from memory_index import RestaurantIndex
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# The search page's dropdowns: "Up to ₹X" and "X+ Stars"
+PRICE_BUCKETS = [500, 1000, 2000, 5000]
+RATING_BUCKETS = [3.0, 3.5, 4.0, 4.5]
+FACETS = ("location", "cuisine", "max_price", "min_rating")
+
+
+def popcount(words: np.ndarray) -> np.ndarray:
+    """
+    Set bits per row of uint64 words; np.bitwise_count needs NumPy 2.0, so older ones unpack the bytes.
+    """
+    if hasattr(np, "bitwise_count"):
+        return np.bitwise_count(words).sum(axis=1, dtype=np.int64)
+    return np.unpackbits(words.view(np.uint8), axis=1).sum(axis=1, dtype=np.int64)
+
+
+def _packed(bitmaps: list, n_rows: int) -> np.ndarray:
+    """
+    Boolean row bitmaps -> one row of uint64 words each, so counting is AND + popcount.
+    """
+    words = (n_rows + 63) // 64
+    matrix = np.zeros((len(bitmaps), words * 8), dtype=np.uint8)
+    for i, bitmap in enumerate(bitmaps):
+        packed = np.packbits(bitmap)
+        matrix[i, :len(packed)] = packed
+    return matrix.view(np.uint64)
+
+
+def _display_names(values, lowered: list) -> list:
+    # The index keys are lowercased; show the first spelling seen in the data
+    spelling = {}
+    for value in values:
+        spelling.setdefault(value.strip().lower(), value.strip())
+    return [spelling.get(name, name) for name in lowered]
+
+
+class FacetCatalog:
+    """
+    Location, cuisine, price and rating facets with restaurant (row) counts, built once from a
+    RestaurantIndex. Every facet value is a packed bitmap, so "counts given the current filters"
+    is one AND + popcount per value, and each facet is counted against the *other* filters only,
+    which is what a dropdown needs to grey out values that would return nothing.
+    """
+    def __init__(self, index: RestaurantIndex):
+        start = time.perf_counter()
+        self.index = index
+        n_rows = index.size
+        df = index.df
+
+        locations = _display_names(df['location'].dropna().astype(str), index.location_names) if 'location' in df.columns else []
+        cuisine_values = df['cuisines'].dropna().astype(str).str.split(',').explode() if 'cuisines' in df.columns else []
+        cuisines = _display_names(cuisine_values, index.cuisine_names)
+        price_bitmaps = [index.cost <= bound for bound in PRICE_BUCKETS]
+        rating_bitmaps = [index.rate >= np.float32(bound) for bound in RATING_BUCKETS]
+
+        self.values = {
+            "location": locations,
+            "cuisine": cuisines,
+            "max_price": PRICE_BUCKETS,
+            "min_rating": RATING_BUCKETS,
+        }
+        self.labels = {
+            "max_price": [f"Up to ₹{bound}" for bound in PRICE_BUCKETS],
+            "min_rating": [f"{bound:.1f}+ Stars" for bound in RATING_BUCKETS],
+        }
+        self.bitmaps = {
+            "location": _packed(index.location_bitmaps, n_rows),
+            "cuisine": _packed(index.cuisine_bitmaps, n_rows),
+            "max_price": _packed(price_bitmaps, n_rows),
+            "min_rating": _packed(rating_bitmaps, n_rows),
+        }
+        self.catalog = self._facets(np.ones(n_rows, dtype=bool), {})
+        self.etag = '"' + hashlib.sha1(json.dumps(self.catalog, sort_keys=True).encode()).hexdigest()[:20] + '"'
+        logger.info(
+            f"Built facet catalog ({len(locations)} locations, {len(cuisines)} cuisines) "
+            f"in {(time.perf_counter() - start) * 1000:.1f} ms"
+        )
+
+    def _counts(self, facet: str, mask: np.ndarray) -> np.ndarray:
+        words = self.bitmaps[facet]
+        packed = _packed([mask], self.index.size)[0]
+        return popcount(words & packed)
+
+    def _facets(self, full_mask: np.ndarray, masks: dict) -> dict:
+        result = {"total": int(full_mask.sum())}
+        for facet in FACETS:
+            # Each facet ignores its own selection, so the alternatives keep their counts
+            mask = np.ones(self.index.size, dtype=bool)
+            for other, other_mask in masks.items():
+                if other != facet:
+                    mask &= other_mask
+            counts = self._counts(facet, mask)
+            labels = self.labels.get(facet)
+            entries = []
+            for i, value in enumerate(self.values[facet]):
+                entry = {"value": value, "count": int(counts[i])}
+                if labels:
+                    entry["label"] = labels[i]
+                entries.append(entry)
+            if facet in ("location", "cuisine"):
+                entries.sort(key=lambda e: e["value"].lower())
+            result[facet] = entries
+        return result
+
+    def counts(
+        self,
+        location: Optional[str] = None,
+        cuisine=None,
+        max_price: Optional[float] = None,
+        min_rating: Optional[float] = None,
+        max_rating: Optional[float] = None
+    ) -> dict:
+        """
+        The catalog re-counted under the given filters (same semantics as retrieval).
+        `total` is the number of rows matching all of them.
+        """
+        index = self.index
+        masks = {}
+        if location:
+            masks["location"] = index.filter_mask(location=location)
+        if cuisine:
+            masks["cuisine"] = index.filter_mask(cuisine=cuisine)
+        if max_price is not None:
+            masks["max_price"] = index.filter_mask(max_price=max_price)
+        if min_rating is not None or max_rating is not None:
+            masks["min_rating"] = index.filter_mask(min_rating=min_rating, max_rating=max_rating)
+        full_mask = np.ones(index.size, dtype=bool)
+        for mask in masks.values():
+            full_mask &= mask
+        return self._facets(full_mask, masks)
@@ -0,0 +1,306 @@
+import time
+import logging
+from typing import Optional, List
+
+import numpy as np
+import pandas as pd
+
+from records import Restaurant, TEXT_FIELDS, split_cuisines, to_text
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Snapshot/cleaned frames use the original dataset names; frames read back from Postgres use the SQL names
+COST_COLUMNS = ['approx_cost(for two people)', 'approx_costfor_two_people', 'cost_numeric']
+RATE_COLUMNS = ['rate_numeric', 'rate']
+VOTE_COLUMNS = ['votes']
+
+
+def numeric_column(df: pd.DataFrame, candidates: List[str]) -> np.ndarray:
+    for col in candidates:
+        if col in df.columns:
+            values = df[col]
+            if not pd.api.types.is_numeric_dtype(values.dtype):
+                values = values.astype(str).str.replace(',', '', regex=False).str.extract(r'^\s*(\d+(?:\.\d+)?)', expand=False)
+            return pd.to_numeric(values, errors='coerce').to_numpy(dtype=np.float32, na_value=np.nan)
+    return np.full(len(df), np.nan, dtype=np.float32)
+
+
+def _bitmaps(codes: np.ndarray, row_ids: np.ndarray, size: int, n_rows: int) -> List[np.ndarray]:
+    """
+    One boolean row bitmap per token code, built in a single sort instead of one scan per token.
+    """
+    order = np.argsort(codes, kind='stable')
+    bounds = np.searchsorted(codes[order], np.arange(size + 1))
+    bitmaps = []
+    for k in range(size):
+        bitmap = np.zeros(n_rows, dtype=bool)
+        bitmap[row_ids[order[bounds[k]:bounds[k + 1]]]] = True
+        bitmaps.append(bitmap)
+    return bitmaps
+
+
+class RestaurantIndex:
+    """
+    In-process columnar copy of the restaurant table: NumPy arrays for the numeric columns
+    and inverted indexes from location / cuisine tokens to row-id bitmaps.
+    Filters become bitmap intersections and top-N uses argpartition, so a query never
+    touches more than the candidate rows.
+    """
+    def __init__(self, df: pd.DataFrame):
+        start = time.perf_counter()
+        self.df = df.reset_index(drop=True)
+        n_rows = len(self.df)
+        self.size = n_rows
+
+        self.rate = numeric_column(self.df, RATE_COLUMNS)
+        self.cost = numeric_column(self.df, COST_COLUMNS)
+        self.votes = numeric_column(self.df, VOTE_COLUMNS)
+        # NaN ratings sort last, like ORDER BY ... DESC NULLS LAST
+        self.sort_key = np.where(np.isnan(self.rate), -np.inf, self.rate)
+        # Stable row keys for tie-breaks and keyset pages; the database id when the frame has one
+        self.row_ids = self.df['id'].to_numpy(dtype=np.int64) if 'id' in self.df.columns else np.arange(n_rows, dtype=np.int64)
+        self.name_codes = pd.factorize(self.df['name'].astype(str))[0] if 'name' in self.df.columns else np.arange(n_rows)
+
+        # Location: one bitmap per distinct value (~100 in the full dataset)
+        self.location_names = []
+        self.location_bitmaps = []
+        if 'location' in self.df.columns:
+            codes, uniques = pd.factorize(self.df['location'].astype(str).str.strip().str.lower())
+            self.location_names = list(uniques)
+            self.location_bitmaps = _bitmaps(codes, np.arange(n_rows), len(uniques), n_rows)
+        self.location_lookup = {name: i for i, name in enumerate(self.location_names)}
+
+        # Cuisine: one bitmap per individual cuisine token
+        self.cuisine_names = []
+        self.cuisine_bitmaps = []
+        if 'cuisines' in self.df.columns:
+            tokens = self.df['cuisines'].fillna('').astype(str).str.split(',').explode()
+            tokens = tokens.str.strip().str.lower()
+            tokens = tokens[tokens != '']
+            codes, uniques = pd.factorize(tokens)
+            self.cuisine_names = list(uniques)
+            self.cuisine_bitmaps = _bitmaps(codes, tokens.index.to_numpy(), len(uniques), n_rows)
+        self.cuisine_lookup = {name: i for i, name in enumerate(self.cuisine_names)}
+        # Per-column lists for Restaurant records, filled on the first records() call
+        self._text_columns = None
+
+        logger.info(
+            f"Built in-memory index over {n_rows} rows ({len(self.location_names)} locations, "
+            f"{len(self.cuisine_names)} cuisines) in {(time.perf_counter() - start) * 1000:.1f} ms."
+        )
+
+    def _union(self, names: List[str], bitmaps: List[np.ndarray], needle: str) -> np.ndarray:
+        # Substring fallback mirrors the SQL `ILIKE '%x%'` path for partial names
+        result = np.zeros(self.size, dtype=bool)
+        for name, bitmap in zip(names, bitmaps):
+            if needle in name:
+                result |= bitmap
+        return result
+
+    def filter_mask(
+        self,
+        location: Optional[str] = None,
+        cuisine=None,
+        max_price: Optional[float] = None,
+        min_rating: Optional[float] = None,
+        max_rating: Optional[float] = None
+    ) -> np.ndarray:
+        mask = np.ones(self.size, dtype=bool)
+
+        if location:
+            needle = location.strip().lower()
+            i = self.location_lookup.get(needle)
+            mask &= self.location_bitmaps[i] if i is not None else self._union(self.location_names, self.location_bitmaps, needle)
+
+        if cuisine:
+            for name in split_cuisines(cuisine):
+                needle = name.lower()
+                i = self.cuisine_lookup.get(needle)
+                mask &= self.cuisine_bitmaps[i] if i is not None else self._union(self.cuisine_names, self.cuisine_bitmaps, needle)
+
+        # Comparisons against NaN are False, so unrated/unpriced rows drop out like SQL NULLs
+        if min_rating is not None:
+            mask &= self.rate >= np.float32(min_rating)
+        if max_rating is not None:
+            mask &= self.rate < np.float32(max_rating)
+        if max_price is not None:
+            mask &= self.cost <= max_price
+        return mask
+
+    def _after_mask(self, rows: np.ndarray, after: tuple) -> np.ndarray:
+        # Rows ranked strictly below the (rating, id) key under "rating DESC NULLS LAST, id"
+        rating, id_ = after
+        key = -np.inf if rating is None else np.float32(rating)
+        scores = self.sort_key[rows]
+        return (scores < key) | ((scores == key) & (self.row_ids[rows] > id_))
+
+    def top_rows(self, candidates: np.ndarray, top_n: int, after: Optional[tuple] = None) -> np.ndarray:
+        """
+        Highest-rated candidates, one row per restaurant name, ties broken by row id.
+        Only the best ~top_n rows are sorted; the window widens if name duplicates
+        (or, for later pages, rows already served) eat into it.
+        """
+        if top_n <= 0 or len(candidates) == 0:
+            return candidates[:0]
+
+        scores = self.sort_key[candidates]
+        k = min(len(candidates), top_n * 4)
+        while True:
+            if k < len(candidates):
+                # Keep every row tied with the k-th best score so the cut is deterministic
+                threshold = np.partition(scores, len(scores) - k)[len(scores) - k]
+                window = np.flatnonzero(scores >= threshold)
+            else:
+                window = np.arange(len(candidates))
+            ordered = window[np.lexsort((self.row_ids[candidates[window]], -scores[window]))]
+            rows = candidates[ordered]
+            # Every better-rated row is inside the window, so the first hit per name is its best branch
+            _, first = np.unique(self.name_codes[rows], return_index=True)
+            rows = rows[np.sort(first)]
+            if after is not None:
+                rows = rows[self._after_mask(rows, after)]
+            if len(rows) >= top_n or k >= len(candidates):
+                return rows[:top_n]
+            k = min(len(candidates), k * 2)
+
+    def query(
+        self,
+        location: Optional[str] = None,
+        cuisine=None,
+        max_price: Optional[float] = None,
+        min_rating: Optional[float] = None,
+        max_rating: Optional[float] = None,
+        top_n: int = 5,
+        after: Optional[tuple] = None,
+        records: bool = False
+    ):
+        """
+        Filtered top-N as a DataFrame slice, or as Restaurant records with `records`.
+        """
+        mask = self.filter_mask(location, cuisine, max_price, min_rating, max_rating)
+        rows = self.top_rows(np.flatnonzero(mask), top_n, after)
+        if records:
+            return self.records(rows)
+        result = self.df.iloc[rows]
+        if 'id' not in result.columns:
+            result = result.assign(id=self.row_ids[rows])
+        return result
+
+    def semantic_query(
+        self,
+        semantic_index,
+        text: str,
+        location: Optional[str] = None,
+        cuisine=None,
+        max_price: Optional[float] = None,
+        min_rating: Optional[float] = None,
+        max_rating: Optional[float] = None,
+        top_n: int = 5,
+        after: Optional[tuple] = None,
+        records: bool = False
+    ):
+        """
+        Rows passing the filters ranked by similarity to `text` (a SemanticIndex aligned with this
+        frame), one row per name, in a `similarity` column (records: `score`). `after` is the
+        (similarity, id) of the previous page's last row.
+        """
+        from semantic_index import DEFAULT_NPROBE, EXACT_SCAN_LIMIT
+
+        mask = self.filter_mask(location, cuisine, max_price, min_rating, max_rating)
+        lists = len(semantic_index.centroids)
+        nprobe = DEFAULT_NPROBE
+        while True:
+            positions, scores = semantic_index.search(text, mask, nprobe)
+            # Results are best-first, so the first hit per name is its most similar branch
+            _, first = np.unique(self.name_codes[positions], return_index=True)
+            first = np.sort(first)
+            positions, scores = positions[first], scores[first]
+            if after is not None:
+                key, id_ = after
+                keep = (scores < key) | ((scores == key) & (self.row_ids[positions] > id_))
+                positions, scores = positions[keep], scores[keep]
+            exhaustive = nprobe >= lists or mask.sum() <= EXACT_SCAN_LIMIT
+            if len(positions) >= top_n or exhaustive:
+                break
+            nprobe *= 4
+
+        rows, scores = positions[:top_n], scores[:top_n]
+        if records:
+            return self.records(rows, scores)
+        return self.df.iloc[rows].assign(id=self.row_ids[rows], similarity=scores)
+
+    def keyword_query(
+        self,
+        text_index,
+        text: str,
+        location: Optional[str] = None,
+        cuisine=None,
+        max_price: Optional[float] = None,
+        min_rating: Optional[float] = None,
+        max_rating: Optional[float] = None,
+        top_n: int = 5,
+        after: Optional[tuple] = None,
+        records: bool = False
+    ):
+        """
+        Rows passing the filters that match `text` in a TextIndex aligned with this frame, ranked by
+        BM25 blended with rating and votes, one row per name, in a `relevance` column (records: `score`).
+        `after` is the (relevance, id) of the previous page's last row. None when no filtered row matches at all.
+        """
+        from text_index import BM25_WEIGHT, RATING_WEIGHT, VOTES_WEIGHT
+
+        mask = self.filter_mask(location, cuisine, max_price, min_rating, max_rating)
+        bm25 = text_index.scores(text)
+        candidates = np.flatnonzero(mask & (bm25 > 0))
+        if len(candidates) == 0:
+            return None
+
+        matched = bm25[candidates]
+        rating = np.nan_to_num(self.rate[candidates], nan=0.0) / 5.0
+        votes = np.log1p(np.nan_to_num(self.votes[candidates], nan=0.0))
+        most_votes = votes.max()
+        popularity = votes / most_votes if most_votes > 0 else votes
+        # Rounded so later pages recompute exactly the same keys
+        scores = np.round(
+            BM25_WEIGHT * matched / matched.max() + RATING_WEIGHT * rating + VOTES_WEIGHT * popularity, 6
+        ).astype(np.float64)
+
+        order = np.lexsort((self.row_ids[candidates], -scores))
+        rows, scores = candidates[order], scores[order]
+        # Best-first, so the first hit per name is its most relevant branch
+        _, first = np.unique(self.name_codes[rows], return_index=True)
+        first = np.sort(first)
+        rows, scores = rows[first], scores[first]
+        if after is not None:
+            key, id_ = after
+            keep = (scores < key) | ((scores == key) & (self.row_ids[rows] > id_))
+            rows, scores = rows[keep], scores[keep]
+
+        rows, scores = rows[:top_n], scores[:top_n]
+        if records:
+            return self.records(rows, scores)
+        return self.df.iloc[rows].assign(id=self.row_ids[rows], relevance=scores)
+
+    def records(self, rows: np.ndarray, scores: Optional[np.ndarray] = None) -> List[Restaurant]:
+        """
+        Restaurant records for `rows` read from plain per-column lists and the numeric arrays,
+        so the request path never slices the DataFrame.
+        """
+        if self._text_columns is None:
+            self._text_columns = {
+                field: self.df[columns[0]].tolist() if columns[0] in self.df.columns else [None] * self.size
+                for field, columns in TEXT_FIELDS.items()
+            }
+        texts = self._text_columns
+        result = []
+        for i, row in enumerate(rows.tolist()):
+            rating, cost = float(self.rate[row]), float(self.cost[row])
+            result.append(Restaurant(
+                id=int(self.row_ids[row]),
+                rating=None if rating != rating else rating,
+                cost=None if cost != cost else cost,
+                score=None if scores is None else float(scores[i]),
+                **{field: to_text(values[row]) for field, values in texts.items()},
+            ))
+        return result
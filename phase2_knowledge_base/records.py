@@ -0,0 +1,118 @@
+import re
+from typing import List, Optional
+
+# Source columns per field, across the dataset's original names, the SQL names and the typed columns
+TEXT_FIELDS = {
+    'name': ['name'],
+    'location': ['location'],
+    'cuisines': ['cuisines'],
+    'address': ['address'],
+    'rest_type': ['rest_type'],
+    'dish_liked': ['dish_liked'],
+}
+RATING_FIELDS = ['rate_numeric', 'rate']
+COST_FIELDS = ['cost_numeric', 'approx_cost(for two people)', 'approx_costfor_two_people']
+# Semantic pages are ranked by similarity, keyword pages by relevance
+SCORE_FIELDS = ['relevance', 'similarity']
+
+NUMBER_PATTERN = re.compile(r'^\s*(\d+(?:\.\d+)?)')
+
+
+def split_cuisines(cuisine) -> List[str]:
+    """
+    "Chinese, North Indian" (or a list) -> ["Chinese", "North Indian"]; multiple cuisines are ANDed.
+    """
+    values = cuisine if isinstance(cuisine, (list, tuple)) else str(cuisine).split(',')
+    return [c.strip() for c in values if c and c.strip()]
+
+
+def is_missing(value) -> bool:
+    # None, NaN and pandas' NA (whose comparisons can't be used as a bool)
+    try:
+        return value is None or bool(value != value)
+    except TypeError:
+        return True
+
+
+def to_number(value) -> Optional[float]:
+    """
+    4.1, "4.1/5" or "1,200" -> float; None for missing or unparseable values ("NEW", "-").
+    """
+    if is_missing(value):
+        return None
+    if not isinstance(value, str):
+        try:
+            return float(value)
+        except (TypeError, ValueError):
+            return None
+    match = NUMBER_PATTERN.match(value.replace(',', ''))
+    return float(match.group(1)) if match else None
+
+
+def to_text(value) -> Optional[str]:
+    return None if is_missing(value) else str(value)
+
+
+def _first(row, columns: List[str]):
+    for column in columns:
+        if column in row:
+            return row[column]
+    return None
+
+
+class Restaurant:
+    """
+    One retrieved restaurant with just the fields the prompt, blurbs and cards read.
+    Built straight from a cursor row or the in-memory index, so serving a page allocates a
+    handful of small objects instead of a DataFrame. `score` is the similarity or relevance
+    of semantic/keyword pages (None when ranked by rating).
+    """
+    __slots__ = ('id', 'name', 'location', 'cuisines', 'address', 'rest_type', 'dish_liked', 'rating', 'cost', 'score')
+
+    def __init__(self, id=None, name=None, location=None, cuisines=None, address=None, rest_type=None,
+                 dish_liked=None, rating=None, cost=None, score=None):
+        self.id = id
+        self.name = name
+        self.location = location
+        self.cuisines = cuisines
+        self.address = address
+        self.rest_type = rest_type
+        self.dish_liked = dish_liked
+        self.rating = rating
+        self.cost = cost
+        self.score = score
+
+    @classmethod
+    def from_mapping(cls, row) -> "Restaurant":
+        """
+        From a database row mapping or a DataFrame record, under any of the column namings.
+        """
+        id_ = row.get('id')
+        score = _first(row, SCORE_FIELDS)
+        return cls(
+            id=None if is_missing(id_) else int(id_),
+            rating=to_number(_first(row, RATING_FIELDS)),
+            cost=to_number(_first(row, COST_FIELDS)),
+            score=None if is_missing(score) else float(score),
+            **{field: to_text(_first(row, columns)) for field, columns in TEXT_FIELDS.items()},
+        )
+
+    def as_dict(self) -> dict:
+        return {field: getattr(self, field) for field in self.__slots__}
+
+    def __eq__(self, other) -> bool:
+        return isinstance(other, Restaurant) and self.as_dict() == other.as_dict()
+
+    def __repr__(self) -> str:
+        return f"Restaurant(id={self.id!r}, name={self.name!r}, rating={self.rating!r})"
+
+
+def to_records(restaurants) -> List[Restaurant]:
+    """
+    A page as a list of records, whether it came as records or as a DataFrame (offline jobs, tests).
+    """
+    if restaurants is None:
+        return []
+    if hasattr(restaurants, 'columns') and hasattr(restaurants, 'to_dict'):
+        return [Restaurant.from_mapping(row) for row in restaurants.to_dict('records')]
+    return list(restaurants)
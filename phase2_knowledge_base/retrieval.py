@@ -1,9 +1,20 @@
 import os
-import pandas as pd
+import sys
+import json
+import base64
+import math
+import threading
 import logging
 from sqlalchemy import create_engine, text
+from sqlalchemy.engine import make_url
 from dotenv import load_dotenv
 
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'phase1_data_ingestion'))
+
+# pandas/NumPy are only needed for the in-memory backend and DataFrame results, so they load on
+# first use there; Postgres pages come back as Restaurant records with neither imported
+from records import Restaurant, split_cuisines
+
 load_dotenv()
 
 logging.basicConfig(level=logging.INFO)
@@ -14,6 +25,16 @@ DATABASE_URL = os.getenv("DATABASE_URL")
 if not DATABASE_URL:
     logger.warning("DATABASE_URL not found in environment variables!")
 
+# Consistent column naming for expected output
+RENAME_MAP = {
+    'approx_costfor_two_people': 'approx_cost(for two people)',
+    'listed_intype': 'listed_in(type)',
+    'listed_incity': 'listed_in(city)'
+}
+
+# "postgres" or "memory" (serve from the local snapshot without any database round trip)
+RETRIEVAL_BACKEND = os.getenv("RETRIEVAL_BACKEND", "postgres").lower()
+
 # Persistent engine to be reused across calls (SQLAlchemy handles pooling)
 _engine = None
 
@@ -23,81 +44,454 @@ def get_engine():
         _engine = create_engine(DATABASE_URL, pool_pre_ping=True)
     return _engine
 
+# Lowercase names in the `location` / `cuisine` dimension tables (loaded once per process). They only
+# choose between an exact match and ILIKE: ids are resolved by name in SQL, because a reload prunes
+# unused rows and a re-inserted name gets a new id.
+_dimension_names = {}
+
+def get_dimension_names(table: str) -> set:
+    if table not in _dimension_names:
+        try:
+            with get_engine().connect() as conn:
+                rows = conn.execute(text(f"SELECT name FROM {table}"))
+                _dimension_names[table] = {name.lower() for (name,) in rows}
+        except Exception as e:
+            # Tables loaded before the dimension schema existed: fall back to ILIKE filters
+            logger.warning(f"Dimension table '{table}' unavailable: {e}")
+            return set()
+    return _dimension_names[table]
+
+# --- Async engine (asyncpg) for the non-blocking API path ---
+_async_engine = None
+
+# libpq query parameters that asyncpg rejects as connect arguments (Supabase URLs carry ?sslmode=require);
+# sslmode itself is passed on as asyncpg's `ssl`
+LIBPQ_ONLY_PARAMS = ("sslmode", "channel_binding", "gssencmode", "target_session_attrs")
+
+def async_database_url(url: str) -> str:
+    """
+    postgresql:// (or postgresql+psycopg2://) -> postgresql+asyncpg://, without the libpq-only parameters.
+    """
+    parsed = make_url(url)
+    if not parsed.drivername.startswith("postgres"):
+        return url
+    parsed = parsed.set(drivername="postgresql+asyncpg").difference_update_query(LIBPQ_ONLY_PARAMS)
+    return parsed.render_as_string(hide_password=False)
+
+def async_connect_args(url: str) -> dict:
+    """
+    asyncpg connect arguments for the URL's libpq parameters: ?sslmode=require -> {"ssl": "require"}.
+    """
+    sslmode = make_url(url).query.get("sslmode")
+    return {"ssl": sslmode} if sslmode else {}
+
+def get_async_engine():
+    global _async_engine
+    if _async_engine is None:
+        from sqlalchemy.ext.asyncio import create_async_engine
+        _async_engine = create_async_engine(
+            async_database_url(DATABASE_URL), connect_args=async_connect_args(DATABASE_URL), pool_pre_ping=True
+        )
+    return _async_engine
+
+async def get_dimension_names_async(table: str) -> set:
+    if table not in _dimension_names:
+        try:
+            async with get_async_engine().connect() as conn:
+                rows = await conn.execute(text(f"SELECT name FROM {table}"))
+                _dimension_names[table] = {name.lower() for (name,) in rows}
+        except Exception as e:
+            logger.warning(f"Dimension table '{table}' unavailable: {e}")
+            return set()
+    return _dimension_names[table]
+
+# --- Keyset pagination ---
+CURSOR_VERSION = 1
+# Largest page the API serves, whether asked for through top_n or carried in a cursor
+MAX_PAGE_SIZE = int(os.getenv("MAX_PAGE_SIZE", 20))
+CURSOR_FILTERS = ("location", "cuisine", "max_price", "min_rating", "max_rating")
+# Carried only when set, so plain filter cursors stay unchanged
+OPTIONAL_CURSOR_FILTERS = ("semantic_query", "keyword_query")
+
+def page_key(df) -> tuple:
+    """
+    (rating, id) of the last row of a page (Restaurant records or a DataFrame); rating is None for unrated rows.
+    Semantic pages are keyed on (similarity, id) and keyword pages on (relevance, id) instead.
+    """
+    if isinstance(df, list):
+        last = df[-1]
+        return (last.score if last.score is not None else last.rating, last.id)
+    from memory_index import numeric_column, RATE_COLUMNS
+    if 'relevance' in df.columns:
+        return (float(df['relevance'].iloc[-1]), int(df['id'].iloc[-1]))
+    if 'similarity' in df.columns:
+        return (float(df['similarity'].iloc[-1]), int(df['id'].iloc[-1]))
+    rating = float(numeric_column(df.tail(1), RATE_COLUMNS)[0])
+    return (None if math.isnan(rating) else rating, int(df['id'].iloc[-1]))
+
+def encode_cursor(filters: dict, after: tuple, page_size: int) -> str:
+    """
+    Opaque continuation token: the already-resolved filters plus the last (rating, id) served.
+    """
+    payload = {
+        "v": CURSOR_VERSION,
+        "f": {
+            **{k: filters.get(k) for k in CURSOR_FILTERS},
+            **{k: filters[k] for k in OPTIONAL_CURSOR_FILTERS if filters.get(k)},
+        },
+        "k": list(after),
+        "n": page_size,
+    }
+    raw = json.dumps(payload, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+def decode_cursor(cursor: str) -> tuple:
+    """
+    Returns (filters, after, page_size), page_size capped at MAX_PAGE_SIZE.
+    Raises ValueError for malformed or stale cursors.
+    """
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        payload = json.loads(raw)
+        rating, id_ = payload["k"]
+        after = (None if rating is None else float(rating), int(id_))
+        filters = {k: payload["f"].get(k) for k in CURSOR_FILTERS}
+        filters.update({k: payload["f"][k] for k in OPTIONAL_CURSOR_FILTERS if payload["f"].get(k)})
+        page_size = int(payload["n"])
+    except Exception as e:
+        raise ValueError(f"Invalid cursor: {e}")
+    if payload.get("v") != CURSOR_VERSION:
+        raise ValueError("Cursor was issued by an incompatible version")
+    if page_size < 1:
+        raise ValueError("Invalid cursor: page size must be positive")
+    return filters, after, min(page_size, MAX_PAGE_SIZE)
+
+# --- In-process backend ---
+# The dataset is small enough that a network round trip per request costs more than the query itself.
+_memory_index = None
+# content_hash of the snapshot the memory index was loaded from; the semantic/full-text indexes must match it
+_memory_snapshot_hash = None
+_frame_index = (None, None)
+
+def get_memory_index() -> "RestaurantIndex":
+    """
+    Builds the in-memory index from the local snapshot once per process.
+    """
+    global _memory_index, _memory_snapshot_hash
+    if _memory_index is None:
+        from snapshot import load_snapshot, read_manifest
+        from memory_index import RestaurantIndex
+        _memory_snapshot_hash = (read_manifest() or {}).get("content_hash")
+        _memory_index = RestaurantIndex(load_snapshot(include_text=False))
+    return _memory_index
+
+def check_snapshot_alignment(index) -> None:
+    """
+    Raises ValueError unless a derived index (built with the snapshot's content_hash in its manifest)
+    matches the snapshot the memory index serves; the row count is checked as a second guard.
+    """
+    memory = get_memory_index()
+    built_from = index.manifest.get("snapshot_hash")
+    if built_from != _memory_snapshot_hash:
+        raise ValueError(f"index was built from snapshot {built_from}, serving {_memory_snapshot_hash}; rebuild it")
+    if index.size != memory.size:
+        raise ValueError(f"index has {index.size} rows, snapshot has {memory.size}; rebuild it")
+
+_semantic_index = None
+_semantic_checked = False
+
+def get_semantic_index():
+    """
+    The memory-mapped vector index built by semantic_index.py, or None if it hasn't been built
+    (or no longer matches the snapshot the memory index was loaded from).
+    """
+    global _semantic_index, _semantic_checked
+    if not _semantic_checked:
+        _semantic_checked = True
+        try:
+            from semantic_index import SemanticIndex
+            index = SemanticIndex()
+            check_snapshot_alignment(index)
+            _semantic_index = index
+        except FileNotFoundError:
+            logger.info("No semantic index built; free-text queries use filter retrieval only.")
+        except Exception as e:
+            logger.error(f"Semantic index unavailable: {e}")
+    return _semantic_index
+
+_text_index = None
+_text_checked = False
+
+def get_text_index():
+    """
+    The memory-mapped BM25 index built by text_index.py, or None if it hasn't been built
+    (or no longer matches the snapshot the memory index was loaded from).
+    """
+    global _text_index, _text_checked
+    if not _text_checked:
+        _text_checked = True
+        try:
+            from text_index import TextIndex
+            index = TextIndex()
+            check_snapshot_alignment(index)
+            _text_index = index
+        except FileNotFoundError:
+            logger.info("No full-text index built; keyword queries use filter retrieval only.")
+        except Exception as e:
+            logger.error(f"Full-text index unavailable: {e}")
+    return _text_index
+
+_facet_catalog = None
+# Startup warmup and the first request may ask from different threads; build only once
+_facet_lock = threading.Lock()
+
+def get_facet_catalog():
+    """
+    Location/cuisine/price/rating facets with counts, built once per process from the snapshot
+    (memory backend) or one scan of the restaurants table.
+    """
+    global _facet_catalog
+    with _facet_lock:
+        if _facet_catalog is None:
+            from facets import FacetCatalog
+            if RETRIEVAL_BACKEND == "memory":
+                index = get_memory_index()
+            else:
+                import pandas as pd
+                from memory_index import RestaurantIndex
+                with get_engine().connect() as conn:
+                    frame = pd.read_sql(text("SELECT id, name, location, cuisines, rate_numeric, cost_numeric FROM restaurants"), conn)
+                index = RestaurantIndex(frame)
+            _facet_catalog = FacetCatalog(index)
+    return _facet_catalog
+
+def _index_for_frame(df: "pd.DataFrame") -> "RestaurantIndex":
+    global _frame_index
+    if _frame_index[0] is not df:
+        from memory_index import RestaurantIndex
+        _frame_index = (df, RestaurantIndex(df))
+    return _frame_index[1]
+
+def empty_page(records: bool = False):
+    """
+    No results, as an empty record list or an empty DataFrame.
+    """
+    if records:
+        return []
+    import pandas as pd
+    return pd.DataFrame()
+
 def retrieve_restaurants(
     location: str = None, 
     cuisine: str = None, 
     max_price: float = None, 
     min_rating: float = None,
     max_rating: float = None,
-    top_n: int = 5
-) -> pd.DataFrame:
+    top_n: int = 5,
+    df: "pd.DataFrame" = None,
+    backend: str = None,
+    after: tuple = None,
+    semantic_query: str = None,
+    keyword_query: str = None,
+    records: bool = False
+):
     """
-    Filters the Zomato dataset using a Supabase PostgreSQL query.
-    Stability Fix: Performs location/cuisine filtering in SQL and numeric filtering in Python.
+    Returns the top_n highest-rated restaurants (one row per name) matching the filters, as a
+    DataFrame or, with `records` (the API's request path), as a list of Restaurant records.
+    Passing `df` queries that frame in-process; otherwise RETRIEVAL_BACKEND selects
+    "postgres" (default) or "memory" (the local snapshot).
+    `after` is the (rating, id) page_key of the previous page and returns the rows ranked below it.
+    With `semantic_query` (and a built semantic index) the filtered rows are ranked by
+    similarity to that text instead, from the snapshot regardless of backend.
+    `keyword_query` (with a built full-text index) takes precedence: rows matching its words are
+    ranked by BM25 blended with rating and votes; when no filtered row matches, the semantic or
+    plain ranking applies.
+    """
+    filters = (location, cuisine, max_price, min_rating, max_rating, top_n, after)
+    try:
+        if keyword_query and df is None and get_text_index() is not None:
+            result = get_memory_index().keyword_query(get_text_index(), keyword_query, *filters, records=records)
+            if result is not None:
+                return result
+        if semantic_query and df is None and get_semantic_index() is not None:
+            return get_memory_index().semantic_query(get_semantic_index(), semantic_query, *filters, records=records)
+        if df is not None:
+            return _index_for_frame(df).query(*filters, records=records)
+        if (backend or RETRIEVAL_BACKEND) == "memory":
+            return get_memory_index().query(*filters, records=records)
+    except Exception as e:
+        logger.error(f"In-memory query failed: {e}")
+        return empty_page(records)
+
+    return _retrieve_from_postgres(*filters, records=records)
+
+def build_retrieval_query(
+    location: str = None,
+    cuisine: str = None,
+    max_price: float = None,
+    min_rating: float = None,
+    max_rating: float = None,
+    top_n: int = 5,
+    after: tuple = None,
+    location_names: set = None,
+    cuisine_names: set = None
+) -> tuple:
+    """
+    Builds a single statement that filters, keeps the best-rated row per name and returns
+    only the top_n rows. Returns (sql, params).
+    Known locations and cuisines are matched exactly through the integer-keyed dimension
+    tables (names looked up synchronously unless passed in); unknown names fall back to
+    the trigram-indexed ILIKE.
+    """
+    conditions = []
+    params = {"top_n": int(top_n)}
+
+    if location:
+        if location_names is None:
+            location_names = get_dimension_names("location")
+        name = location.strip().lower()
+        if name in location_names:
+            conditions.append("location_id IN (SELECT id FROM location WHERE lower(name) = :location_name)")
+            params["location_name"] = name
+        else:
+            # Partial names like "Koramangala" still cover every block via substring match
+            conditions.append("location ILIKE :location")
+            params["location"] = f"%{location}%"
+
+    if cuisine:
+        if cuisine_names is None:
+            cuisine_names = get_dimension_names("cuisine")
+        for i, name in enumerate(split_cuisines(cuisine)):
+            if name.lower() in cuisine_names:
+                conditions.append(
+                    "EXISTS (SELECT 1 FROM restaurant_cuisine rc JOIN cuisine c ON c.id = rc.cuisine_id"
+                    f" WHERE rc.restaurant_id = restaurants.id AND lower(c.name) = :cuisine_name_{i})"
+                )
+                params[f"cuisine_name_{i}"] = name.lower()
+            else:
+                conditions.append(f"cuisines ILIKE :cuisine_{i}")
+                params[f"cuisine_{i}"] = f"%{name}%"
+
+    # rate_numeric is REAL; compare in REAL too, otherwise 4.2 (float4) < 4.2 (float8)
+    if min_rating is not None:
+        conditions.append("rate_numeric >= CAST(:min_rating AS REAL)")
+        params["min_rating"] = min_rating
+
+    if max_rating is not None:
+        conditions.append("rate_numeric < CAST(:max_rating AS REAL)")
+        params["max_rating"] = max_rating
+
+    if max_price is not None:
+        conditions.append("cost_numeric <= CAST(:max_price AS NUMERIC)")
+        params["max_price"] = max_price
+
+    where = " AND ".join(conditions) or "TRUE"
+
+    # Keyset on the final ordering; applied after dedup so a chain never reappears on a later page
+    page = ""
+    if after is not None:
+        after_rating, params["after_id"] = after
+        if after_rating is None:
+            page = " WHERE rate_numeric IS NULL AND id > :after_id"
+        else:
+            page = (
+                " WHERE (rate_numeric < CAST(:after_rating AS REAL)"
+                " OR (rate_numeric = CAST(:after_rating AS REAL) AND id > :after_id)"
+                " OR rate_numeric IS NULL)"
+            )
+            params["after_rating"] = after_rating
+
+    # DISTINCT ON keeps the best-rated branch of each chain (walking the name/rating/id index);
+    # the outer ORDER BY/LIMIT ranks the survivors
+    sql = (
+        "SELECT * FROM ("
+        " SELECT DISTINCT ON (name) * FROM restaurants"
+        f" WHERE {where}"
+        " ORDER BY name, rate_numeric DESC NULLS LAST, id"
+        ") best"
+        f"{page}"
+        " ORDER BY rate_numeric DESC NULLS LAST, id"
+        " LIMIT :top_n"
+    )
+    return sql, params
+
+def _retrieve_from_postgres(
+    location: str = None, 
+    cuisine: str = None, 
+    max_price: float = None, 
+    min_rating: float = None,
+    max_rating: float = None,
+    top_n: int = 5,
+    after: tuple = None,
+    records: bool = False
+):
+    """
+    Runs the query from build_retrieval_query against Supabase PostgreSQL.
+    Filtering, dedup, ordering and the top-N cut all happen in SQL, so only top_n rows leave the database.
     """
     if not DATABASE_URL:
-        return pd.DataFrame()
+        return empty_page(records)
 
     try:
-        engine = get_engine()
+        query_str, params = build_retrieval_query(location, cuisine, max_price, min_rating, max_rating, top_n, after)
+
+        with get_engine().connect() as conn:
+            result = conn.execute(text(query_str), params)
+            return page_from_result(result, records)
         
-        # Base query - simple SQL to avoid syntax errors
-        query_str = "SELECT * FROM restaurants WHERE 1=1"
-        params = {}
+    except Exception as e:
+        logger.error(f"Database query failed: {e}")
+        return empty_page(records)
 
-        if location:
-            query_str += " AND location ILIKE :location"
-            params["location"] = f"%{location}%"
+def page_from_result(result, records: bool = False):
+    """
+    Restaurant records straight from the cursor rows, or (for DataFrame callers) a frame with the
+    dataset's column names.
+    """
+    if records:
+        return [Restaurant.from_mapping(row) for row in result.mappings()]
+    import pandas as pd
+    return pd.DataFrame(result.fetchall(), columns=list(result.keys())).rename(columns=RENAME_MAP)
+
+async def retrieve_restaurants_async(
+    location: str = None, 
+    cuisine: str = None, 
+    max_price: float = None, 
+    min_rating: float = None,
+    max_rating: float = None,
+    top_n: int = 5,
+    df: "pd.DataFrame" = None,
+    backend: str = None,
+    after: tuple = None,
+    semantic_query: str = None,
+    keyword_query: str = None,
+    records: bool = False
+):
+    """
+    retrieve_restaurants for async callers: the Postgres query is awaited on the asyncpg engine.
+    The in-memory backends (and semantic/keyword search) answer in milliseconds, so they run inline.
+    """
+    indexed_text = (semantic_query and get_semantic_index() is not None) or (keyword_query and get_text_index() is not None)
+    if df is not None or (backend or RETRIEVAL_BACKEND) == "memory" or indexed_text:
+        return retrieve_restaurants(
+            location, cuisine, max_price, min_rating, max_rating, top_n, df, backend, after, semantic_query, keyword_query,
+            records
+        )
+
+    if not DATABASE_URL:
+        return empty_page(records)
 
-        if cuisine:
-            query_str += " AND cuisines ILIKE :cuisine"
-            params["cuisine"] = f"%{cuisine}%"
+    try:
+        location_names = await get_dimension_names_async("location") if location else set()
+        cuisine_names = await get_dimension_names_async("cuisine") if cuisine else set()
+        query_str, params = build_retrieval_query(
+            location, cuisine, max_price, min_rating, max_rating, top_n, after, location_names, cuisine_names
+        )
 
-        # Fetch a sufficient buffer for Python-side filtering (price/rating)
-        query_str += " LIMIT 500"
+        async with get_async_engine().connect() as conn:
+            result = await conn.execute(text(query_str), params)
+            return page_from_result(result, records)
 
-        with engine.connect() as conn:
-            df = pd.read_sql(text(query_str), conn, params=params)
-        
-        if df.empty:
-            return df
-
-        # --- Stable Python-side Filtering ---
-        # 1. Clean Rating (handles "4.1/5", "NEW", "-")
-        if 'rate' in df.columns:
-            df['rate_numeric'] = df['rate'].astype(str).str.split('/').str[0].str.strip()
-            df['rate_numeric'] = pd.to_numeric(df['rate_numeric'], errors='coerce')
-            
-            if min_rating is not None:
-                df = df[df['rate_numeric'] >= min_rating]
-            if max_rating is not None:
-                df = df[df['rate_numeric'] < max_rating]
-
-        # 2. Clean Cost (handles "1,200", strings)
-        if 'approx_costfor_two_people' in df.columns:
-            df['cost_numeric'] = df['approx_costfor_two_people'].astype(str).str.replace(',', '', regex=False)
-            df['cost_numeric'] = pd.to_numeric(df['cost_numeric'], errors='coerce')
-            
-            if max_price is not None:
-                df = df[df['cost_numeric'] <= max_price]
-
-        # 3. Final Cleaning & Deduplication
-        df = df.drop_duplicates(subset=['name'], keep='first')
-        
-        # Sorting by rating
-        if 'rate_numeric' in df.columns:
-            df = df.sort_values(by='rate_numeric', ascending=False)
-        
-        # Consistent column naming for expected output
-        rename_map = {
-            'approx_costfor_two_people': 'approx_cost(for two people)',
-            'listed_intype': 'listed_in(type)',
-            'listed_incity': 'listed_in(city)'
-        }
-        df = df.rename(columns=rename_map)
-        
-        return df.head(top_n)
-        
     except Exception as e:
         logger.error(f"Database query failed: {e}")
-        return pd.DataFrame()
+        return empty_page(records)
@@ -0,0 +1,228 @@
+import os
+import re
+import sys
+import json
+import math
+import time
+import zlib
+import logging
+from typing import Optional, List
+
+import numpy as np
+import pandas as pd
+
+from tokens import LETTERS, words
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+INDEX_DIR = os.getenv(
+    "SEMANTIC_INDEX_DIR",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "semantic_index")
+)
+# 2: stopwords shared with the full-text index (tokens.py)
+INDEX_FORMAT_VERSION = 2
+
+# Signed feature hashing: tokens hash into HASH_SPACE buckets (idf is kept per bucket),
+# and each bucket folds onto one of DIMENSIONS dense components with a +/- sign.
+DIMENSIONS = 512
+HASH_SPACE = 1 << 18
+MAX_REVIEW_CHARS = 6000
+# Below this many filtered candidates an exact scan beats probing the IVF lists
+EXACT_SCAN_LIMIT = 4000
+DEFAULT_NPROBE = 8
+
+# Review lists are stored as the repr of [("Rated 4.0", "RATED\n  text"), ...]
+REVIEW_NOISE = re.compile(r"Rated \d(?:\.\d)?|RATED|\\n|\\x[0-9a-f]{2}")
+
+
+def review_text(raw) -> str:
+    if raw is None or (isinstance(raw, float) and math.isnan(raw)):
+        return ""
+    return REVIEW_NOISE.sub(" ", str(raw))[:MAX_REVIEW_CHARS]
+
+
+def restaurant_documents(df: pd.DataFrame) -> List[str]:
+    """
+    Text each restaurant is embedded from: name, type, cuisines and liked dishes (repeated for weight), reviews.
+    """
+    def column(name):
+        if name not in df.columns:
+            return pd.Series("", index=df.index)
+        return df[name].astype("string").fillna("")
+
+    reviews = df['reviews_list'].map(review_text) if 'reviews_list' in df.columns else pd.Series("", index=df.index)
+    docs = (
+        column('name') + " " + column('rest_type') + " " + column('cuisines') + " " + column('cuisines') + " "
+        + column('dish_liked') + " " + column('dish_liked') + " " + reviews
+    )
+    return docs.tolist()
+
+
+def tokenize(text: str) -> List[str]:
+    unigrams = words(text, LETTERS)
+    return unigrams + [f"{a} {b}" for a, b in zip(unigrams, unigrams[1:])]
+
+
+class _Hasher:
+    """
+    Token -> bucket with a memo, since the same few thousand words dominate every document.
+    """
+    def __init__(self):
+        self.memo = {}
+
+    def buckets(self, text: str) -> np.ndarray:
+        memo = self.memo
+        out = []
+        for token in tokenize(text):
+            bucket = memo.get(token)
+            if bucket is None:
+                bucket = memo[token] = zlib.crc32(token.encode()) % HASH_SPACE
+            out.append(bucket)
+        return np.asarray(out, dtype=np.int64)
+
+
+def _fold(buckets: np.ndarray, counts: np.ndarray, idf: np.ndarray) -> np.ndarray:
+    weights = (1.0 + np.log(counts)) * idf[buckets]
+    signs = np.where((buckets // DIMENSIONS) % 2 == 0, 1.0, -1.0)
+    vector = np.zeros(DIMENSIONS, dtype=np.float32)
+    np.add.at(vector, buckets % DIMENSIONS, signs * weights)
+    norm = np.linalg.norm(vector)
+    return vector / norm if norm > 0 else vector
+
+
+def _spherical_kmeans(vectors: np.ndarray, n_lists: int, iterations: int = 12, seed: int = 0) -> tuple:
+    rng = np.random.default_rng(seed)
+    centroids = vectors[rng.choice(len(vectors), n_lists, replace=False)].astype(np.float32)
+    for _ in range(iterations):
+        assignment = np.argmax(vectors @ centroids.T, axis=1)
+        for k in range(n_lists):
+            members = vectors[assignment == k]
+            if len(members) == 0:
+                centroids[k] = vectors[rng.integers(len(vectors))]
+                continue
+            center = members.sum(axis=0)
+            norm = np.linalg.norm(center)
+            centroids[k] = center / norm if norm > 0 else center
+    return centroids, np.argmax(vectors @ centroids.T, axis=1)
+
+
+def build_index(df: pd.DataFrame, index_dir: Optional[str] = None, snapshot_hash: Optional[str] = None) -> dict:
+    """
+    Embeds every row of df (row order = snapshot order) and writes an IVF index of
+    memory-mappable .npy files plus a manifest. Returns the manifest.
+    """
+    start = time.perf_counter()
+    index_dir = index_dir or INDEX_DIR
+    os.makedirs(index_dir, exist_ok=True)
+
+    docs = restaurant_documents(df)
+    hasher = _Hasher()
+    # Chain branches and re-listings repeat the same text; hash each distinct document once
+    distinct = {}
+    doc_ids = np.array([distinct.setdefault(doc, len(distinct)) for doc in docs], dtype=np.int64)
+    bucket_counts = []
+    document_frequency = np.zeros(HASH_SPACE, dtype=np.int64)
+    for doc in distinct:
+        buckets, counts = np.unique(hasher.buckets(doc), return_counts=True)
+        bucket_counts.append((buckets, counts))
+        document_frequency[buckets] += 1
+
+    idf = (np.log((len(distinct) + 1) / (document_frequency + 1)) + 1.0).astype(np.float32)
+    distinct_vectors = np.stack([_fold(b, c, idf) for b, c in bucket_counts]) if bucket_counts else np.zeros((0, DIMENSIONS), np.float32)
+    vectors = distinct_vectors[doc_ids]
+
+    n_lists = max(1, min(256, int(math.sqrt(len(distinct_vectors)))))
+    centroids, _ = _spherical_kmeans(distinct_vectors, n_lists) if len(distinct_vectors) else (np.zeros((1, DIMENSIONS), np.float32), None)
+    assignment = np.argmax(vectors @ centroids.T, axis=1) if len(vectors) else np.zeros(0, dtype=np.int64)
+
+    # Rows grouped by list so each probe reads one contiguous slice of the mapped file
+    order = np.argsort(assignment, kind="stable")
+    offsets = np.searchsorted(assignment[order], np.arange(len(centroids) + 1))
+    np.save(os.path.join(index_dir, "vectors.npy"), vectors[order].astype(np.float16))
+    np.save(os.path.join(index_dir, "positions.npy"), order.astype(np.int64))
+    np.save(os.path.join(index_dir, "offsets.npy"), offsets.astype(np.int64))
+    np.save(os.path.join(index_dir, "centroids.npy"), centroids.astype(np.float32))
+    np.save(os.path.join(index_dir, "idf.npy"), idf)
+
+    manifest = {
+        "format_version": INDEX_FORMAT_VERSION,
+        "rows": len(df),
+        "distinct_documents": len(distinct),
+        "dimensions": DIMENSIONS,
+        "lists": len(centroids),
+        "snapshot_hash": snapshot_hash,
+        "built_at": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+    }
+    with open(os.path.join(index_dir, "manifest.json"), "w") as f:
+        json.dump(manifest, f, indent=2)
+    logger.info(
+        f"Built semantic index over {len(df)} rows ({len(distinct)} distinct documents, {len(centroids)} lists) "
+        f"in {time.perf_counter() - start:.1f} s."
+    )
+    return manifest
+
+
+class SemanticIndex:
+    """
+    Memory-mapped IVF index over hashed TF-IDF vectors. search() ranks the rows allowed by a
+    filter mask (from RestaurantIndex.filter_mask) by cosine similarity to the query text:
+    small candidate sets are scanned exactly, large ones only through the nearest lists.
+    """
+    def __init__(self, index_dir: Optional[str] = None):
+        start = time.perf_counter()
+        index_dir = index_dir or INDEX_DIR
+        with open(os.path.join(index_dir, "manifest.json")) as f:
+            self.manifest = json.load(f)
+        if self.manifest.get("format_version") != INDEX_FORMAT_VERSION:
+            raise ValueError(f"Unsupported semantic index version: {self.manifest.get('format_version')}")
+        self.vectors = np.load(os.path.join(index_dir, "vectors.npy"), mmap_mode="r")
+        self.positions = np.load(os.path.join(index_dir, "positions.npy"), mmap_mode="r")
+        self.offsets = np.load(os.path.join(index_dir, "offsets.npy"))
+        self.centroids = np.load(os.path.join(index_dir, "centroids.npy"))
+        self.idf = np.load(os.path.join(index_dir, "idf.npy"), mmap_mode="r")
+        self.size = len(self.positions)
+        # position in the snapshot -> row in the list-ordered vector file
+        self.slot = np.empty(self.size, dtype=np.int64)
+        self.slot[self.positions] = np.arange(self.size)
+        self.hasher = _Hasher()
+        logger.info(f"Mapped semantic index ({self.size} rows, {len(self.centroids)} lists) in {(time.perf_counter() - start) * 1000:.1f} ms.")
+
+    def embed(self, text: str) -> np.ndarray:
+        buckets, counts = np.unique(self.hasher.buckets(text), return_counts=True)
+        return _fold(buckets, counts, np.asarray(self.idf)) if len(buckets) else np.zeros(DIMENSIONS, np.float32)
+
+    def search(self, text: str, mask: Optional[np.ndarray] = None, nprobe: int = DEFAULT_NPROBE) -> tuple:
+        """
+        Returns (positions, scores) of candidate rows, best first (ties by position).
+        Scores are rounded so later pages recompute exactly the same keys.
+        """
+        query = self.embed(text)
+        if not query.any():
+            return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.float64)
+
+        allowed = np.flatnonzero(mask) if mask is not None else None
+        if allowed is not None and len(allowed) <= EXACT_SCAN_LIMIT:
+            positions = allowed
+            slots = self.slot[positions]
+        else:
+            nearest = np.argsort(-(self.centroids @ query), kind="stable")[:nprobe]
+            slots = np.concatenate([np.arange(self.offsets[k], self.offsets[k + 1]) for k in nearest])
+            positions = np.asarray(self.positions[slots])
+            if mask is not None:
+                keep = mask[positions]
+                slots, positions = slots[keep], positions[keep]
+
+        scores = np.round(np.asarray(self.vectors[np.sort(slots)], dtype=np.float32) @ query, 6).astype(np.float64)
+        positions = np.asarray(self.positions[np.sort(slots)])
+        order = np.lexsort((positions, -scores))
+        return positions[order], scores[order]
+
+
+if __name__ == "__main__":
+    sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'phase1_data_ingestion'))
+    from snapshot import load_snapshot, read_manifest
+
+    snapshot_manifest = read_manifest() or {}
+    frame = load_snapshot(columns=['name', 'rest_type', 'cuisines', 'dish_liked', 'reviews_list'])
+    print(json.dumps(build_index(frame, snapshot_hash=snapshot_manifest.get("content_hash")), indent=2))
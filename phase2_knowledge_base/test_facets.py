@@ -0,0 +1,64 @@
+import numpy as np
+import pandas as pd
+import pytest
+from memory_index import RestaurantIndex
+from facets import FacetCatalog
+
+@pytest.fixture
+def catalog():
+    rng = np.random.default_rng(9)
+    n = 700
+    df = pd.DataFrame({
+        'name': [f"R{i}" for i in range(n)],
+        'location': rng.choice(['BTM', 'Indiranagar', 'Koramangala 5th Block'], n),
+        'cuisines': [", ".join(rng.choice(['Chinese', 'North Indian', 'Cafe', 'Tibetan'], rng.integers(1, 3), replace=False)) for _ in range(n)],
+        'rate': rng.choice([np.nan, 3.2, 3.8, 4.1, 4.6], n).astype(np.float32),
+        'approx_cost(for two people)': pd.array(rng.choice([300, 800, 1500, 3000, 6000], n), dtype='Int32'),
+    })
+    # Only in one combination, to check empty values are reported
+    df.loc[0, ['location', 'cuisines']] = ['Whitefield', 'Sushi']
+    return FacetCatalog(RestaurantIndex(df)), df
+
+def values(facet):
+    return {e["value"]: e["count"] for e in facet}
+
+def test_catalog_is_complete_with_counts(catalog):
+    facets, df = catalog
+    full = facets.catalog
+    assert full["total"] == len(df)
+    assert values(full["location"]) == df['location'].value_counts().to_dict()
+    assert sum(values(full["cuisine"]).values()) == df['cuisines'].str.split(', ').str.len().sum()
+    assert [e["label"] for e in full["max_price"]] == ["Up to ₹500", "Up to ₹1000", "Up to ₹2000", "Up to ₹5000"]
+    assert values(full["min_rating"])[4.0] == int((df['rate'] >= 4.0).sum())
+
+def test_counts_match_the_filtered_rows(catalog):
+    facets, df = catalog
+    result = facets.counts(location='BTM', cuisine='Chinese', max_price=1000, min_rating=4.0)
+    expected = df[(df['location'] == 'BTM') & df['cuisines'].str.contains('Chinese')
+                  & (df['approx_cost(for two people)'] <= 1000) & (df['rate'] >= 4.0)]
+    assert result["total"] == len(expected)
+    # A facet is counted against the other filters only, so alternatives keep their counts
+    btm_or_not = df[df['cuisines'].str.contains('Chinese') & (df['approx_cost(for two people)'] <= 1000) & (df['rate'] >= 4.0)]
+    assert values(result["location"]) == {**{loc: 0 for loc in df['location'].unique()}, **btm_or_not['location'].value_counts().to_dict()}
+
+def test_empty_combinations_count_zero(catalog):
+    facets, _ = catalog
+    result = facets.counts(location='Whitefield')
+    assert values(result["cuisine"])["Chinese"] == 0
+    assert values(result["cuisine"])["Sushi"] == 1
+
+def test_etag_tracks_the_data(catalog):
+    facets, df = catalog
+    assert facets.etag == FacetCatalog(RestaurantIndex(df)).etag
+    changed = df.copy()
+    changed.loc[1, 'location'] = 'HSR'
+    assert FacetCatalog(RestaurantIndex(changed)).etag != facets.etag
+
+def test_popcount_fallback_without_bitwise_count(catalog, monkeypatch):
+    from facets import popcount
+    facets, _ = catalog
+    words = facets.bitmaps["location"]
+    expected = popcount(words)
+    monkeypatch.delattr(np, "bitwise_count")
+    assert popcount(words).tolist() == expected.tolist()
+    assert facets.counts(location='BTM')["total"] == values(facets.catalog["location"])["BTM"]
@@ -0,0 +1,76 @@
+import numpy as np
+import pandas as pd
+import pytest
+from memory_index import RestaurantIndex, split_cuisines
+
+@pytest.fixture
+def index():
+    return RestaurantIndex(pd.DataFrame({
+        'name': ['Wok Express', 'Punjabi Dhaba', 'Campus Cafeteria', 'Third Wave', 'Mainland', 'Wok Express'],
+        'location': ['BTM', 'BTM', 'Koramangala 5th Block', 'Koramangala 6th Block', 'BTM', 'Indiranagar'],
+        'cuisines': ['Chinese, North Indian', 'North Indian', 'Cafeteria', 'Cafe, Desserts', 'Chinese', 'Chinese'],
+        'approx_cost(for two people)': pd.array([400, 300, 200, 600, None, 500], dtype='Int32'),
+        'rate': np.array([4.1, 4.3, 3.9, 4.5, np.nan, 4.8], dtype=np.float32)
+    }))
+
+def test_split_cuisines():
+    assert split_cuisines(' Chinese,North Indian, ') == ['Chinese', 'North Indian']
+    assert split_cuisines(['Cafe', '']) == ['Cafe']
+
+def test_exact_cuisine_token_does_not_match_substrings(index):
+    assert index.query(cuisine='Cafe')['name'].tolist() == ['Third Wave']
+
+def test_unknown_names_fall_back_to_substring(index):
+    assert set(index.query(location='koramangala')['name']) == {'Third Wave', 'Campus Cafeteria'}
+    assert index.query(cuisine='dessert')['name'].tolist() == ['Third Wave']
+
+def test_cuisines_are_anded(index):
+    assert index.query(cuisine='Chinese, North Indian')['name'].tolist() == ['Wok Express']
+
+def test_missing_values_drop_out_of_numeric_filters(index):
+    assert 'Mainland' not in set(index.query(max_price=1000, top_n=10)['name'])
+    assert 'Mainland' not in set(index.query(min_rating=0, top_n=10)['name'])
+    assert index.query(max_rating=4.3, top_n=10)['name'].tolist() == ['Wok Express', 'Campus Cafeteria']
+
+def test_float32_bounds_include_equal_ratings(index):
+    assert index.query(min_rating=4.3, max_rating=4.5)['name'].tolist() == ['Punjabi Dhaba']
+
+def test_top_n_dedups_by_name_and_puts_unrated_last(index):
+    result = index.query(top_n=10)
+    assert result['name'].tolist() == ['Wok Express', 'Third Wave', 'Punjabi Dhaba', 'Campus Cafeteria', 'Mainland']
+    # The best-rated duplicate wins
+    assert result.iloc[0]['location'] == 'Indiranagar'
+
+def test_top_n_widens_window_past_duplicates():
+    df = pd.DataFrame({
+        'name': ['Chain'] * 20 + ['Solo'],
+        'location': ['BTM'] * 21,
+        'cuisines': ['Cafe'] * 21,
+        'rate': [4.9] * 20 + [3.0]
+    })
+    assert RestaurantIndex(df).query(top_n=2)['name'].tolist() == ['Chain', 'Solo']
+
+def test_empty_result(index):
+    assert index.query(location='Whitefield').empty
+
+def test_keyset_pages_cover_each_name_once(index):
+    first = index.query(top_n=2)
+    assert first['name'].tolist() == ['Wok Express', 'Third Wave']
+
+    rating, id_ = float(index.rate[first['id'].iloc[-1]]), int(first['id'].iloc[-1])
+    second = index.query(top_n=2, after=(rating, id_))
+    # The lower-rated Wok Express branch (row 0) must not resurface
+    assert second['name'].tolist() == ['Punjabi Dhaba', 'Campus Cafeteria']
+
+    third = index.query(top_n=2, after=(3.9, int(second['id'].iloc[-1])))
+    assert third['name'].tolist() == ['Mainland']
+    assert index.query(top_n=2, after=(None, int(third['id'].iloc[-1]))).empty
+
+def test_keyset_breaks_rating_ties_by_id():
+    index = RestaurantIndex(pd.DataFrame({
+        'id': [30, 10, 20],
+        'name': ['C', 'A', 'B'],
+        'rate': [4.0, 4.0, 4.0]
+    }))
+    assert index.query(top_n=3)['id'].tolist() == [10, 20, 30]
+    assert index.query(top_n=3, after=(4.0, 10))['name'].tolist() == ['B', 'C']
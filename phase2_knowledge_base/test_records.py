@@ -0,0 +1,55 @@
+import os
+import sys
+import subprocess
+import numpy as np
+import pandas as pd
+import pytest
+import retrieval
+from memory_index import RestaurantIndex
+from records import Restaurant, to_records, to_number
+
+@pytest.fixture
+def frame():
+    return pd.DataFrame({
+        'name': ['Wok Express', 'Punjabi Dhaba', 'Third Wave', 'Mainland', 'Wok Express'],
+        'location': ['BTM', 'BTM', 'Koramangala 6th Block', 'BTM', 'Indiranagar'],
+        'cuisines': ['Chinese, North Indian', 'North Indian', 'Cafe, Desserts', 'Chinese', 'Chinese'],
+        'address': ['1 Road', None, '3 Road', '4 Road', '5 Road'],
+        'approx_cost(for two people)': pd.array([400, 300, 600, None, 500], dtype='Int32'),
+        'rate': np.array([4.1, 4.3, 4.5, np.nan, 4.8], dtype=np.float32),
+    })
+
+def test_numbers_parse_like_the_dataset():
+    assert to_number("4.1/5") == 4.1
+    assert to_number("1,200") == 1200.0
+    assert to_number("NEW") is None
+    assert to_number(pd.NA) is None and to_number(float("nan")) is None
+
+def test_cursor_rows_under_sql_names():
+    row = {'id': 7, 'name': 'Mainland', 'rate': '4.0/5', 'rate_numeric': 4.0, 'approx_costfor_two_people': '1,200',
+           'cost_numeric': 1200, 'address': None, 'similarity': 0.8}
+    record = Restaurant.from_mapping(row)
+    assert (record.id, record.rating, record.cost, record.address, record.score) == (7, 4.0, 1200.0, None, 0.8)
+    with pytest.raises(AttributeError):
+        record.extra = 1
+
+def test_index_records_match_the_frame_rows(frame):
+    index = RestaurantIndex(frame)
+    rows = index.query(top_n=10)
+    records = index.query(top_n=10, records=True)
+    assert records == to_records(rows)
+    assert [r.name for r in records] == ['Wok Express', 'Third Wave', 'Punjabi Dhaba', 'Mainland']
+    assert records[2].address is None and records[3].rating is None and records[3].cost is None
+
+def test_record_pages_use_the_same_keys(frame):
+    first = retrieval.retrieve_restaurants(df=frame, top_n=2, records=True)
+    assert retrieval.page_key(first) == retrieval.page_key(retrieval.retrieve_restaurants(df=frame, top_n=2))
+    rest = retrieval.retrieve_restaurants(df=frame, top_n=5, after=retrieval.page_key(first), records=True)
+    assert [r.name for r in rest] == ['Punjabi Dhaba', 'Mainland']
+    assert retrieval.page_key(rest) == (None, 3)
+
+def test_retrieval_imports_without_pandas():
+    code = "import sys, retrieval, records; print(sorted(m for m in ('pandas', 'numpy') if m in sys.modules))"
+    here = os.path.dirname(os.path.abspath(__file__))
+    result = subprocess.run([sys.executable, "-c", code], cwd=here, capture_output=True, text=True, check=True)
+    assert result.stdout.strip() == "[]"
@@ -1,5 +1,7 @@
+import os
 import pytest
 import pandas as pd
+import retrieval
 from retrieval import retrieve_restaurants
 
 @pytest.fixture
@@ -52,3 +54,220 @@ def test_sorting_and_top_n(sample_df):
     # Should sort by rating descending, so 4.5 then 4.2
     assert result.iloc[0]['name'] == 'Restaurant A'
     assert result.iloc[1]['name'] == 'Restaurant D'
+
+# --- Postgres-backed retrieval (runs only against a disposable local database) ---
+# upload_to_supabase is importable once retrieval has put phase1_data_ingestion on the path
+TEST_DATABASE_URL = os.getenv("TEST_DATABASE_URL")
+
+@pytest.fixture
+def seeded_db(sample_df, monkeypatch):
+    if not TEST_DATABASE_URL:
+        pytest.skip("TEST_DATABASE_URL not set (point it at a disposable local Postgres)")
+    from sqlalchemy import create_engine, text
+    from upload_to_supabase import upload_data, _psycopg2_url
+
+    url = _psycopg2_url(TEST_DATABASE_URL)
+    with create_engine(url).begin() as conn:
+        conn.execute(text("DROP TABLE IF EXISTS restaurants CASCADE"))
+    seed = sample_df.assign(address=[f"{i} Main Road" for i in range(len(sample_df))])
+    # Legacy string formats are parsed into the typed columns by the loader
+    seed['rate'] = ['4.5/5', '3.8/5', '4.0 /5', '4.2/5']
+    seed['approx_cost(for two people)'] = ['500', '300', '1,500', '800']
+    upload_data(url, seed)
+
+    monkeypatch.setattr(retrieval, "DATABASE_URL", url)
+    monkeypatch.setattr(retrieval, "_engine", None)
+    yield url
+
+def test_postgres_numeric_filters_run_in_sql(seeded_db):
+    result = retrieval.retrieve_restaurants(min_rating=4.0, max_price=1000.0, top_n=5)
+    assert result['name'].tolist() == ['Restaurant A', 'Restaurant D']
+    assert result['rate_numeric'].tolist() == pytest.approx([4.5, 4.2])
+
+def test_postgres_max_rating(seeded_db):
+    result = retrieval.retrieve_restaurants(max_rating=4.2, top_n=5)
+    assert set(result['name']) == {'Restaurant B', 'Restaurant C'}
+
+@pytest.fixture
+def seeded_cuisine_db(monkeypatch):
+    if not TEST_DATABASE_URL:
+        pytest.skip("TEST_DATABASE_URL not set (point it at a disposable local Postgres)")
+    from sqlalchemy import create_engine, text
+    from upload_to_supabase import upload_data, _psycopg2_url
+
+    url = _psycopg2_url(TEST_DATABASE_URL)
+    with create_engine(url).begin() as conn:
+        conn.execute(text("DROP TABLE IF EXISTS restaurant_cuisine, cuisine, location, restaurants CASCADE"))
+    upload_data(url, pd.DataFrame({
+        'name': ['Wok Express', 'Punjabi Dhaba', 'Campus Cafeteria', 'Third Wave', 'Mainland'],
+        'address': ['1 Road', '2 Road', '3 Road', '4 Road', '5 Road'],
+        'location': ['BTM', 'BTM', 'Koramangala 5th Block', 'Koramangala 6th Block', 'BTM'],
+        'cuisines': ['Chinese, North Indian', 'North Indian', 'Cafeteria', 'Cafe, Desserts', 'Chinese'],
+        'approx_cost(for two people)': [400, 300, 200, 600, 900],
+        'rate': [4.1, 4.3, 3.9, 4.5, 4.0]
+    }))
+
+    monkeypatch.setattr(retrieval, "DATABASE_URL", url)
+    monkeypatch.setattr(retrieval, "_engine", None)
+    monkeypatch.setattr(retrieval, "_dimension_names", {})
+    yield url
+
+def test_postgres_cuisine_filter_is_exact(seeded_cuisine_db):
+    result = retrieval.retrieve_restaurants(cuisine='Cafe', top_n=5)
+    assert result['name'].tolist() == ['Third Wave']
+
+def test_postgres_cuisines_are_anded(seeded_cuisine_db):
+    result = retrieval.retrieve_restaurants(cuisine='Chinese, North Indian', top_n=5)
+    assert result['name'].tolist() == ['Wok Express']
+
+def test_postgres_location_by_id_and_partial_name(seeded_cuisine_db):
+    exact = retrieval.retrieve_restaurants(location='btm', top_n=5)
+    assert set(exact['name']) == {'Wok Express', 'Punjabi Dhaba', 'Mainland'}
+
+    partial = retrieval.retrieve_restaurants(location='Koramangala', top_n=5)
+    assert set(partial['name']) == {'Campus Cafeteria', 'Third Wave'}
+
+def test_postgres_dimension_tables_follow_reloads(seeded_cuisine_db):
+    from sqlalchemy import create_engine, text
+    from upload_to_supabase import upload_data
+
+    upload_data(seeded_cuisine_db, pd.DataFrame({
+        'name': ['Wok Express'], 'address': ['1 Road'], 'location': ['BTM'],
+        'cuisines': ['Chinese'], 'approx_cost(for two people)': [400], 'rate': [4.1]
+    }))
+    with create_engine(seeded_cuisine_db).connect() as conn:
+        cuisines = [r[0] for r in conn.execute(text("SELECT name FROM cuisine ORDER BY name"))]
+        bridge = conn.execute(text("SELECT count(*) FROM restaurant_cuisine")).scalar()
+    assert cuisines == ['Chinese']
+    assert bridge == 1
+
+def test_postgres_filters_survive_reloads_that_renumber_dimensions(seeded_cuisine_db):
+    from upload_to_supabase import upload_data
+
+    assert retrieval.retrieve_restaurants(location='BTM', cuisine='Chinese', top_n=5)['name'].tolist() == ['Wok Express', 'Mainland']
+    row = {'address': ['9 Road'], 'approx_cost(for two people)': [500], 'rate': [4.2]}
+    # The first reload prunes BTM and Chinese, the second inserts them again under new ids
+    upload_data(seeded_cuisine_db, pd.DataFrame({**row, 'name': ['Dosa Hut'], 'location': ['HSR'], 'cuisines': ['South Indian']}))
+    upload_data(seeded_cuisine_db, pd.DataFrame({**row, 'name': ['Wok Express'], 'location': ['BTM'], 'cuisines': ['Chinese']}))
+    assert retrieval.retrieve_restaurants(location='BTM', cuisine='Chinese', top_n=5)['name'].tolist() == ['Wok Express']
+
+def test_memory_backend_reads_snapshot(sample_df, tmp_path, monkeypatch):
+    import snapshot
+    snapshot.write_snapshot(sample_df, str(tmp_path))
+    monkeypatch.setattr(snapshot, "SNAPSHOT_DIR", str(tmp_path))
+    monkeypatch.setattr(retrieval, "_memory_index", None)
+
+    result = retrieval.retrieve_restaurants(location='BTM', min_rating=4.0, backend="memory")
+    assert result['name'].tolist() == ['Restaurant A', 'Restaurant C']
+
+def test_build_retrieval_query_pushes_everything_into_sql(monkeypatch):
+    monkeypatch.setattr(retrieval, "_dimension_names", {"location": {"btm"}, "cuisine": {"cafe"}})
+    sql, params = retrieval.build_retrieval_query(
+        location='BTM', cuisine='Cafe, Tibetan', max_price=800, min_rating=4.0, max_rating=4.5, top_n=3
+    )
+    assert "DISTINCT ON (name)" in sql
+    assert sql.endswith("LIMIT :top_n")
+    assert "LIMIT 500" not in sql
+    assert params == {
+        "top_n": 3, "location_name": "btm", "cuisine_name_0": "cafe", "cuisine_1": "%Tibetan%",
+        "min_rating": 4.0, "max_rating": 4.5, "max_price": 800
+    }
+
+def test_postgres_top_n_is_not_cut_by_row_buffer(seeded_db):
+    from upload_to_supabase import upload_data
+
+    # 600 mediocre rows ahead of the best ones, plus a chain whose best branch must win
+    filler = pd.DataFrame({
+        'name': [f"Filler {i}" for i in range(600)] + ['Chain', 'Chain', 'Gem'],
+        'address': [f"{i} Side Street" for i in range(603)],
+        'location': ['BTM'] * 603,
+        'cuisines': ['Cafe'] * 603,
+        'approx_cost(for two people)': [300] * 603,
+        'rate': [3.0] * 600 + [3.5, 4.9, 4.8]
+    })
+    upload_data(seeded_db, filler)
+
+    result = retrieval.retrieve_restaurants(location='BTM', top_n=2)
+    assert result['name'].tolist() == ['Chain', 'Gem']
+    assert result['rate_numeric'].tolist() == pytest.approx([4.9, 4.8])
+
+def test_cursor_round_trip():
+    filters = {'location': 'BTM', 'cuisine': None, 'max_price': 800.0, 'min_rating': 4.0, 'max_rating': None, 'extra': 1}
+    cursor = retrieval.encode_cursor(filters, (4.2, 17), 6)
+    decoded_filters, after, page_size = retrieval.decode_cursor(cursor)
+    assert decoded_filters == {k: v for k, v in filters.items() if k != 'extra'}
+    assert after == (4.2, 17)
+    assert page_size == 6
+
+    with pytest.raises(ValueError):
+        retrieval.decode_cursor("not-a-cursor")
+
+def test_cursor_page_size_is_checked():
+    with pytest.raises(ValueError):
+        retrieval.decode_cursor(retrieval.encode_cursor({}, (4.2, 17), 0))
+    _, _, page_size = retrieval.decode_cursor(retrieval.encode_cursor({}, (4.2, 17), 10 ** 6))
+    assert page_size == retrieval.MAX_PAGE_SIZE
+
+def test_df_pages_follow_page_key(sample_df):
+    first = retrieve_restaurants(df=sample_df, top_n=2)
+    second = retrieve_restaurants(df=sample_df, top_n=2, after=retrieval.page_key(first))
+    assert first['name'].tolist() == ['Restaurant A', 'Restaurant D']
+    assert second['name'].tolist() == ['Restaurant C', 'Restaurant B']
+
+def test_postgres_keyset_pages(seeded_db):
+    names = []
+    after = None
+    while True:
+        page = retrieval.retrieve_restaurants(top_n=3, after=after)
+        names += page['name'].tolist()
+        if len(page) < 3:
+            break
+        after = retrieval.page_key(page)
+    assert names == ['Restaurant A', 'Restaurant D', 'Restaurant C', 'Restaurant B']
+
+def test_async_database_url():
+    assert retrieval.async_database_url("postgresql://u:p@h:5432/db") == "postgresql+asyncpg://u:p@h:5432/db"
+    assert retrieval.async_database_url("postgresql+psycopg2://u@h/db") == "postgresql+asyncpg://u@h/db"
+
+def test_async_engine_translates_libpq_parameters():
+    url = "postgresql://u:p@db.example.supabase.co:5432/postgres?sslmode=require&channel_binding=require&application_name=api"
+    assert retrieval.async_database_url(url) == "postgresql+asyncpg://u:p@db.example.supabase.co:5432/postgres?application_name=api"
+    assert retrieval.async_connect_args(url) == {"ssl": "require"}
+    assert retrieval.async_connect_args("postgresql://u@h/db") == {}
+
+def test_postgres_async_matches_sync(seeded_cuisine_db, monkeypatch):
+    import asyncio
+
+    async def run_queries():
+        monkeypatch.setattr(retrieval, "_async_engine", None)
+        try:
+            return [
+                await retrieval.retrieve_restaurants_async(location='btm', cuisine='North Indian', max_price=500.0),
+                await retrieval.retrieve_restaurants_async(min_rating=4.0, max_rating=4.5, top_n=2, after=(4.3, 0)),
+            ]
+        finally:
+            await retrieval.get_async_engine().dispose()
+
+    by_location, paged = asyncio.run(run_queries())
+    assert by_location['name'].tolist() == ['Punjabi Dhaba', 'Wok Express']
+    assert by_location['name'].tolist() == retrieval.retrieve_restaurants(
+        location='btm', cuisine='North Indian', max_price=500.0)['name'].tolist()
+    # Ties on the cursor rating continue by id, so the 4.3 row is still ahead of the cursor (4.3, 0)
+    assert paged['name'].tolist() == ['Punjabi Dhaba', 'Wok Express']
+
+def test_postgres_records_skip_the_frame(seeded_cuisine_db, monkeypatch):
+    import asyncio
+
+    async def run_query():
+        monkeypatch.setattr(retrieval, "_async_engine", None)
+        try:
+            return await retrieval.retrieve_restaurants_async(location='btm', top_n=2, records=True)
+        finally:
+            await retrieval.get_async_engine().dispose()
+
+    frame = retrieval.retrieve_restaurants(location='btm', top_n=2)
+    records = retrieval.retrieve_restaurants(location='btm', top_n=2, records=True)
+    assert [r.name for r in records] == frame['name'].tolist()
+    assert [r.name for r in asyncio.run(run_query())] == frame['name'].tolist()
+    # REAL ratings: the frame path widens float32, the driver parses the text; both are the same REAL
+    assert retrieval.page_key(records) == pytest.approx(retrieval.page_key(frame))
@@ -0,0 +1,113 @@
+import time
+import numpy as np
+import pandas as pd
+import pytest
+import retrieval
+from memory_index import RestaurantIndex
+from semantic_index import SemanticIndex, build_index, review_text, EXACT_SCAN_LIMIT
+
+REVIEWS = {
+    'Skyline Terrace': "[('Rated 4.5', 'RATED\\n  Gorgeous rooftop with a cozy ambience and live music at night.')]",
+    'Sky High Lounge': "[('Rated 4.0', 'RATED\\n  Rooftop seating, cocktails and a great view of the city.')]",
+    'Idli Corner': "[('Rated 4.2', 'RATED\\n  Crispy dosa and soft idli, quick service for breakfast.')]",
+    'Bean There': "[('Rated 4.1', 'RATED\\n  Quiet cafe to work from, good cold brew and wifi.')]",
+}
+
+@pytest.fixture
+def frame():
+    rng = np.random.default_rng(3)
+    filler = 600
+    names = list(REVIEWS) + [f"Filler {i}" for i in range(filler)]
+    return pd.DataFrame({
+        'name': names,
+        'location': ['Indiranagar', 'BTM', 'BTM', 'Indiranagar'] + list(rng.choice(['BTM', 'HSR', 'Indiranagar'], filler)),
+        'rest_type': ['Lounge', 'Bar', 'Quick Bites', 'Cafe'] + ['Casual Dining'] * filler,
+        'cuisines': ['Continental', 'Finger Food', 'South Indian', 'Cafe'] + list(rng.choice(['Chinese', 'North Indian', 'Biryani'], filler)),
+        'dish_liked': ['Mocktails', 'Nachos', 'Masala Dosa', 'Cold Brew'] + ['Noodles, Paneer'] * filler,
+        'reviews_list': list(REVIEWS.values()) + [f"[('Rated 3.5', 'RATED\\n  Decent {w} and average service.')]" for w in rng.choice(['noodles', 'curry', 'rice'], filler)],
+        'rate': np.array([4.5, 4.0, 4.2, 4.1] + list(rng.uniform(3, 4.9, filler)), dtype=np.float32),
+        'approx_cost(for two people)': pd.array([1500, 1200, 200, 500] + list(rng.choice([300, 600, 900], filler)), dtype='Int32'),
+    })
+
+@pytest.fixture
+def semantic(frame, tmp_path):
+    build_index(frame, str(tmp_path))
+    return SemanticIndex(str(tmp_path)), RestaurantIndex(frame.drop(columns=['reviews_list']))
+
+def test_review_text_strips_dataset_markup():
+    text = review_text("[('Rated 4.0', 'RATED\\n  Great rooftop')]")
+    assert "Rated" not in text and "RATED" not in text and "\\n" not in text
+    assert "Great rooftop" in text
+    assert review_text(None) == ""
+
+def test_index_is_memory_mapped(semantic):
+    index, _ = semantic
+    assert isinstance(index.vectors, np.memmap)
+    assert index.vectors.dtype == np.float16
+
+def test_free_text_ranks_by_meaning(semantic):
+    index, restaurants = semantic
+    result = restaurants.semantic_query(index, "cozy place with great rooftop ambience", top_n=2)
+    assert result['name'].tolist() == ['Skyline Terrace', 'Sky High Lounge']
+    assert result['similarity'].is_monotonic_decreasing
+
+    dosa = restaurants.semantic_query(index, "crispy dosa breakfast", top_n=1)
+    assert dosa['name'].tolist() == ['Idli Corner']
+
+def test_filters_still_apply(semantic):
+    index, restaurants = semantic
+    result = restaurants.semantic_query(index, "rooftop", location='BTM', max_price=1300, top_n=1)
+    assert result['name'].tolist() == ['Sky High Lounge']
+
+def test_ivf_and_exact_scan_agree_on_the_best_match(semantic):
+    index, restaurants = semantic
+    mask = np.ones(restaurants.size, dtype=bool)
+    assert mask.sum() <= EXACT_SCAN_LIMIT
+    exact_positions, _ = index.search("rooftop view cocktails", mask)
+    probed_positions, _ = index.search("rooftop view cocktails", None, nprobe=len(index.centroids))
+    assert exact_positions[0] == probed_positions[0] == 1
+
+def test_semantic_pages_continue_without_repeats(semantic, monkeypatch):
+    index, restaurants = semantic
+    monkeypatch.setattr(retrieval, "_memory_index", restaurants)
+    monkeypatch.setattr(retrieval, "_semantic_index", index)
+    monkeypatch.setattr(retrieval, "_semantic_checked", True)
+
+    first = retrieval.retrieve_restaurants(top_n=3, semantic_query="rooftop music", backend="memory")
+    after = retrieval.page_key(first)
+    second = retrieval.retrieve_restaurants(top_n=3, semantic_query="rooftop music", backend="memory", after=after)
+    assert first['name'].iloc[0] == 'Skyline Terrace'
+    assert not set(first['name']) & set(second['name'])
+    assert second['similarity'].max() <= first['similarity'].min()
+
+def test_search_takes_milliseconds(semantic):
+    index, restaurants = semantic
+    restaurants.semantic_query(index, "warmup", top_n=5)
+    start = time.perf_counter()
+    for _ in range(20):
+        restaurants.semantic_query(index, "cozy rooftop with live music", location='Indiranagar', top_n=5)
+    assert (time.perf_counter() - start) / 20 < 0.01
+
+def test_semantic_query_survives_the_cursor():
+    filters = {'location': 'BTM', 'cuisine': None, 'max_price': None, 'min_rating': None, 'max_rating': None, 'semantic_query': 'rooftop music'}
+    decoded, after, _ = retrieval.decode_cursor(retrieval.encode_cursor(filters, (0.42, 1), 5))
+    assert decoded == filters
+    assert after == (0.42, 1)
+
+def test_index_from_another_snapshot_is_refused(frame, tmp_path, monkeypatch):
+    import snapshot
+    import semantic_index
+    manifest = snapshot.write_snapshot(frame, str(tmp_path / "snapshot"))
+    monkeypatch.setattr(snapshot, "SNAPSHOT_DIR", str(tmp_path / "snapshot"))
+    for name, value in [("_memory_index", None), ("_semantic_index", None), ("_semantic_checked", False)]:
+        monkeypatch.setattr(retrieval, name, value)
+
+    # Same row count, different order: only the content hash tells them apart
+    build_index(frame.iloc[::-1], str(tmp_path / "stale"), snapshot_hash="0" * 64)
+    monkeypatch.setattr(semantic_index, "INDEX_DIR", str(tmp_path / "stale"))
+    assert retrieval.get_semantic_index() is None
+
+    build_index(frame, str(tmp_path / "current"), snapshot_hash=manifest["content_hash"])
+    monkeypatch.setattr(semantic_index, "INDEX_DIR", str(tmp_path / "current"))
+    monkeypatch.setattr(retrieval, "_semantic_checked", False)
+    assert retrieval.get_semantic_index() is not None
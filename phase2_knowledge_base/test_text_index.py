@@ -0,0 +1,116 @@
+import time
+import numpy as np
+import pandas as pd
+import pytest
+import retrieval
+from memory_index import RestaurantIndex
+from text_index import TextIndex, build_text_index, normalize_terms
+
+@pytest.fixture
+def frame():
+    rng = np.random.default_rng(5)
+    filler = 800
+    named = ['Biryani Junction', 'Meghana Foods', 'Toit', 'Arbor Brewing', 'Empire']
+    return pd.DataFrame({
+        'name': named + [f"Filler {i}" for i in range(filler)],
+        'location': ['BTM', 'Indiranagar', 'Indiranagar', 'Indiranagar', 'BTM'] + list(rng.choice(['BTM', 'HSR', 'Indiranagar'], filler)),
+        'rest_type': ['Quick Bites', 'Casual Dining', 'Microbrewery', 'Microbrewery', 'Casual Dining'] + ['Casual Dining'] * filler,
+        'cuisines': ['Biryani', 'Andhra, Biryani', 'Continental', 'American', 'North Indian, Mughlai'] + list(rng.choice(['Chinese', 'North Indian', 'Cafe'], filler)),
+        'dish_liked': ['Chicken Biryani', 'Boneless Biryani', 'Craft Beer, Pizza', 'Craft Beers, Nachos', 'Ghee Rice, Biryani'] + ['Noodles, Paneer'] * filler,
+        'reviews_list': [
+            "[('Rated 3.6', 'RATED\\n  Biryani was fine.')]",
+            "[('Rated 4.5', 'RATED\\n  Best biryani in town, spicy and generous.')]",
+            "[('Rated 4.7', 'RATED\\n  Great craft beer and a lively crowd.')]",
+            "[('Rated 4.4', 'RATED\\n  Good craft beer selection on tap.')]",
+            "[('Rated 4.1', 'RATED\\n  Late night kebabs.')]",
+        ] + [f"[('Rated 3.5', 'RATED\\n  Decent {w} and average service.')]" for w in rng.choice(['noodles', 'curry', 'rice'], filler)],
+        'rate': np.array([3.6, 4.5, 4.7, 4.4, 4.1] + list(rng.uniform(3, 4.9, filler)), dtype=np.float32),
+        'votes': np.array([40, 12000, 14000, 3000, 9000] + list(rng.integers(0, 500, filler))),
+        'approx_cost(for two people)': pd.array([300, 600, 1500, 1400, 700] + list(rng.choice([300, 600, 900], filler)), dtype='Int32'),
+    })
+
+@pytest.fixture
+def keyword(frame, tmp_path):
+    build_text_index(frame, str(tmp_path))
+    return TextIndex(str(tmp_path)), RestaurantIndex(frame.drop(columns=['reviews_list']))
+
+def test_normalize_terms_drops_stopwords_and_plurals():
+    assert normalize_terms("The best Craft Beers near BTM") == ['craft', 'beer', 'btm']
+
+def test_postings_are_memory_mapped(keyword):
+    index, _ = keyword
+    assert isinstance(index.posting_docs, np.memmap)
+    assert index.scores("zzz unknown").sum() == 0
+
+def test_dish_and_review_text_match(keyword):
+    index, restaurants = keyword
+    beer = restaurants.keyword_query(index, "craft beer", top_n=5)
+    assert beer['name'].tolist() == ['Toit', 'Arbor Brewing']
+    assert beer['relevance'].is_monotonic_decreasing
+
+def test_rating_and_votes_break_close_text_matches(keyword):
+    index, restaurants = keyword
+    biryani = restaurants.keyword_query(index, "best biryani", top_n=3)
+    assert biryani['name'].iloc[0] == 'Meghana Foods'
+    assert 'Biryani Junction' in biryani['name'].tolist()
+
+def test_filters_still_apply(keyword):
+    index, restaurants = keyword
+    result = restaurants.keyword_query(index, "biryani", location='BTM', top_n=5)
+    assert set(result['name']) == {'Biryani Junction', 'Empire'}
+    assert restaurants.keyword_query(index, "craft beer", location='BTM') is None
+
+def test_keyword_pages_continue_without_repeats(keyword, monkeypatch):
+    index, restaurants = keyword
+    monkeypatch.setattr(retrieval, "_memory_index", restaurants)
+    monkeypatch.setattr(retrieval, "_text_index", index)
+    monkeypatch.setattr(retrieval, "_text_checked", True)
+
+    first = retrieval.retrieve_restaurants(top_n=2, keyword_query="biryani", backend="memory")
+    after = retrieval.page_key(first)
+    second = retrieval.retrieve_restaurants(top_n=2, keyword_query="biryani", backend="memory", after=after)
+    assert not set(first['name']) & set(second['name'])
+    assert len(first) + len(second) == 3
+    assert second['relevance'].max() <= first['relevance'].min()
+
+def test_no_match_falls_back_to_filter_ranking(keyword, monkeypatch):
+    index, restaurants = keyword
+    monkeypatch.setattr(retrieval, "_memory_index", restaurants)
+    monkeypatch.setattr(retrieval, "_text_index", index)
+    monkeypatch.setattr(retrieval, "_text_checked", True)
+    monkeypatch.setattr(retrieval, "_semantic_checked", True)
+    monkeypatch.setattr(retrieval, "_semantic_index", None)
+
+    result = retrieval.retrieve_restaurants(top_n=3, keyword_query="sushi", backend="memory")
+    assert len(result) == 3 and 'relevance' not in result.columns
+
+def test_lookup_takes_milliseconds(keyword):
+    index, restaurants = keyword
+    restaurants.keyword_query(index, "warmup", top_n=5)
+    start = time.perf_counter()
+    for _ in range(20):
+        restaurants.keyword_query(index, "spicy biryani ghee rice", location='BTM', top_n=5)
+    assert (time.perf_counter() - start) / 20 < 0.01
+
+def test_keyword_query_survives_the_cursor():
+    filters = {'location': None, 'cuisine': None, 'max_price': None, 'min_rating': None, 'max_rating': None, 'keyword_query': 'craft beer'}
+    decoded, after, _ = retrieval.decode_cursor(retrieval.encode_cursor(filters, (0.81, 4), 5))
+    assert decoded == filters
+    assert after == (0.81, 4)
+
+def test_index_from_another_snapshot_is_refused(frame, tmp_path, monkeypatch):
+    import snapshot
+    import text_index
+    manifest = snapshot.write_snapshot(frame, str(tmp_path / "snapshot"))
+    monkeypatch.setattr(snapshot, "SNAPSHOT_DIR", str(tmp_path / "snapshot"))
+    for name, value in [("_memory_index", None), ("_text_index", None), ("_text_checked", False)]:
+        monkeypatch.setattr(retrieval, name, value)
+
+    build_text_index(frame.iloc[::-1], str(tmp_path / "stale"), snapshot_hash="0" * 64)
+    monkeypatch.setattr(text_index, "INDEX_DIR", str(tmp_path / "stale"))
+    assert retrieval.get_text_index() is None
+
+    build_text_index(frame, str(tmp_path / "current"), snapshot_hash=manifest["content_hash"])
+    monkeypatch.setattr(text_index, "INDEX_DIR", str(tmp_path / "current"))
+    monkeypatch.setattr(retrieval, "_text_checked", False)
+    assert retrieval.get_text_index() is not None
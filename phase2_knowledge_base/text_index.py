@@ -0,0 +1,184 @@
+import os
+import sys
+import json
+import time
+import logging
+from collections import Counter
+from typing import Optional, List
+
+import numpy as np
+import pandas as pd
+
+from semantic_index import review_text
+from tokens import words
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+INDEX_DIR = os.getenv(
+    "TEXT_INDEX_DIR",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "text_index")
+)
+INDEX_FORMAT_VERSION = 1
+
+# BM25F-style field weights: a term in the name counts three times, in the reviews once
+FIELD_WEIGHTS = {
+    'name': 3.0,
+    'cuisines': 2.0,
+    'dish_liked': 2.0,
+    'rest_type': 1.0,
+    'menu_item': 1.0,
+    'reviews_list': 1.0,
+}
+TEXT_COLUMNS = list(FIELD_WEIGHTS)
+REVIEW_SNIPPET_CHARS = 1500
+K1 = 1.2
+B = 0.75
+# Keyword ranking: BM25 (scaled to the best match) blended with rating/5 and log-scaled votes
+BM25_WEIGHT = 0.7
+RATING_WEIGHT = 0.2
+VOTES_WEIGHT = 0.1
+
+def normalize_terms(text: str) -> List[str]:
+    """
+    Lowercased words without stopwords, with a naive plural strip ("beers" -> "beer").
+    """
+    terms = []
+    for word in words(text):
+        if len(word) > 3 and word.endswith("s") and not word.endswith("ss"):
+            word = word[:-1]
+        terms.append(word)
+    return terms
+
+
+def _field_texts(df: pd.DataFrame) -> dict:
+    texts = {}
+    for column in TEXT_COLUMNS:
+        if column not in df.columns:
+            continue
+        values = df[column]
+        if column == 'reviews_list':
+            texts[column] = values.map(lambda v: review_text(v)[:REVIEW_SNIPPET_CHARS]).tolist()
+        else:
+            texts[column] = values.astype("string").fillna("").tolist()
+    return texts
+
+
+def build_text_index(df: pd.DataFrame, index_dir: Optional[str] = None, snapshot_hash: Optional[str] = None) -> dict:
+    """
+    Builds a BM25 inverted index over the text columns of df (row order = snapshot order) and
+    writes it as CSR .npy files: per-term slices of (document, precomputed BM25 impact).
+    Returns the manifest.
+    """
+    start = time.perf_counter()
+    index_dir = index_dir or INDEX_DIR
+    os.makedirs(index_dir, exist_ok=True)
+
+    texts = _field_texts(df)
+    fields = list(texts)
+    distinct = {}
+    doc_of_row = np.empty(len(df), dtype=np.int32)
+    doc_terms = []
+    for row in range(len(df)):
+        key = tuple(texts[f][row] for f in fields)
+        doc = distinct.get(key)
+        if doc is None:
+            doc = distinct[key] = len(doc_terms)
+            counts = Counter()
+            for field, text in zip(fields, key):
+                weight = FIELD_WEIGHTS[field]
+                for term in normalize_terms(text):
+                    counts[term] += weight
+            doc_terms.append(counts)
+        doc_of_row[row] = doc
+
+    vocabulary = {}
+    term_ids, doc_ids, frequencies = [], [], []
+    for doc, counts in enumerate(doc_terms):
+        for term, tf in counts.items():
+            term_ids.append(vocabulary.setdefault(term, len(vocabulary)))
+            doc_ids.append(doc)
+            frequencies.append(tf)
+    term_ids = np.asarray(term_ids, dtype=np.int64)
+    doc_ids = np.asarray(doc_ids, dtype=np.int32)
+    frequencies = np.asarray(frequencies, dtype=np.float32)
+
+    n_docs = len(doc_terms)
+    lengths = np.bincount(doc_ids, weights=frequencies, minlength=n_docs) if n_docs else np.zeros(0)
+    avg_length = lengths.mean() if n_docs else 1.0
+    document_frequency = np.bincount(term_ids, minlength=len(vocabulary))
+    idf = np.log(1 + (n_docs - document_frequency + 0.5) / (document_frequency + 0.5))
+    norm = K1 * (1 - B + B * lengths[doc_ids] / max(avg_length, 1e-9))
+    impacts = (idf[term_ids] * frequencies * (K1 + 1) / (frequencies + norm)).astype(np.float32)
+
+    order = np.argsort(term_ids, kind="stable")
+    offsets = np.searchsorted(term_ids[order], np.arange(len(vocabulary) + 1))
+    np.save(os.path.join(index_dir, "term_offsets.npy"), offsets.astype(np.int64))
+    np.save(os.path.join(index_dir, "posting_docs.npy"), doc_ids[order])
+    np.save(os.path.join(index_dir, "posting_impacts.npy"), impacts[order])
+    np.save(os.path.join(index_dir, "doc_of_row.npy"), doc_of_row)
+    with open(os.path.join(index_dir, "terms.json"), "w") as f:
+        json.dump(list(vocabulary), f)
+
+    manifest = {
+        "format_version": INDEX_FORMAT_VERSION,
+        "rows": len(df),
+        "documents": n_docs,
+        "terms": len(vocabulary),
+        "postings": int(len(doc_ids)),
+        "fields": fields,
+        "snapshot_hash": snapshot_hash,
+        "built_at": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+    }
+    with open(os.path.join(index_dir, "manifest.json"), "w") as f:
+        json.dump(manifest, f, indent=2)
+    logger.info(
+        f"Built BM25 index over {len(df)} rows ({n_docs} documents, {len(vocabulary)} terms, "
+        f"{len(doc_ids)} postings) in {time.perf_counter() - start:.1f} s."
+    )
+    return manifest
+
+
+class TextIndex:
+    """
+    Memory-mapped BM25 index. scores() returns one BM25 score per snapshot row from a single
+    pass over the query terms' posting slices.
+    """
+    def __init__(self, index_dir: Optional[str] = None):
+        start = time.perf_counter()
+        index_dir = index_dir or INDEX_DIR
+        with open(os.path.join(index_dir, "manifest.json")) as f:
+            self.manifest = json.load(f)
+        if self.manifest.get("format_version") != INDEX_FORMAT_VERSION:
+            raise ValueError(f"Unsupported text index version: {self.manifest.get('format_version')}")
+        with open(os.path.join(index_dir, "terms.json")) as f:
+            self.vocabulary = {term: i for i, term in enumerate(json.load(f))}
+        self.offsets = np.load(os.path.join(index_dir, "term_offsets.npy"))
+        self.posting_docs = np.load(os.path.join(index_dir, "posting_docs.npy"), mmap_mode="r")
+        self.posting_impacts = np.load(os.path.join(index_dir, "posting_impacts.npy"), mmap_mode="r")
+        self.doc_of_row = np.load(os.path.join(index_dir, "doc_of_row.npy"))
+        self.size = len(self.doc_of_row)
+        self.n_docs = self.manifest["documents"]
+        logger.info(f"Mapped BM25 index ({self.size} rows, {len(self.vocabulary)} terms) in {(time.perf_counter() - start) * 1000:.1f} ms.")
+
+    def scores(self, text: str) -> np.ndarray:
+        """
+        BM25 score of every row for the query text (zeros when no term is indexed).
+        """
+        term_ids = {self.vocabulary[t] for t in normalize_terms(text) if t in self.vocabulary}
+        if not term_ids:
+            return np.zeros(self.size, dtype=np.float32)
+        slices = [slice(self.offsets[t], self.offsets[t + 1]) for t in term_ids]
+        docs = np.concatenate([self.posting_docs[s] for s in slices])
+        impacts = np.concatenate([self.posting_impacts[s] for s in slices])
+        doc_scores = np.bincount(docs, weights=impacts, minlength=self.n_docs).astype(np.float32)
+        return doc_scores[self.doc_of_row]
+
+
+if __name__ == "__main__":
+    sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'phase1_data_ingestion'))
+    from snapshot import load_snapshot, read_manifest
+
+    snapshot_manifest = read_manifest() or {}
+    frame = load_snapshot(columns=TEXT_COLUMNS)
+    print(json.dumps(build_text_index(frame, snapshot_hash=snapshot_manifest.get("content_hash")), indent=2))
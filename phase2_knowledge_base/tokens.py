@@ -0,0 +1,20 @@
+import re
+from typing import List
+
+# Shared by the semantic and full-text indexes, so documents and queries split the same way in both
+WORD = re.compile(r"[a-z0-9]+")
+# The semantic index hashes letters only: numbers (prices, block numbers) are noise in its vectors
+LETTERS = re.compile(r"[a-z]+")
+STOPWORDS = {
+    "a", "an", "the", "and", "or", "but", "is", "are", "was", "were", "be", "been", "it", "its", "this", "that",
+    "of", "in", "on", "at", "to", "for", "with", "from", "by", "as", "we", "i", "you", "they", "my", "our",
+    "me", "us", "so", "very", "also", "had", "have", "has", "there", "here", "best", "good", "great", "nice",
+    "place", "places", "restaurant", "restaurants", "food", "rated", "want", "find", "near", "some",
+}
+
+
+def words(text, pattern=WORD) -> List[str]:
+    """
+    Lowercased words of two or more characters, without stopwords.
+    """
+    return [w for w in pattern.findall(str(text).lower()) if w not in STOPWORDS and len(w) > 1]
@@ -0,0 +1,305 @@
+import os
+import re
+import sys
+import json
+import time
+import sqlite3
+import asyncio
+import hashlib
+import logging
+from typing import Optional, Dict
+
+from prompt_builder import render_restaurant_lines, estimate_tokens, describe_preferences, format_cost
+from records import to_records
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Built offline and shipped next to the code, like the Arrow snapshot
+BLURB_DB_PATH = os.getenv(
+    "BLURB_DB_PATH",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "blurbs.sqlite3")
+)
+BLURB_COLUMNS = ['name', 'address', 'location', 'rest_type', 'cuisines', 'rate', 'approx_cost(for two people)', 'dish_liked']
+BATCH_SIZE = 8
+TOKENS_PER_BLURB = 90
+
+BLURB_INSTRUCTIONS = """For EACH restaurant above, write a 2-3 sentence description of what it is good for:
+signature cuisines or dishes, price level, the kind of outing it suits. Do not mention any particular search or user.
+Output strictly valid JSON: {"blurbs": [{"id": <line number>, "blurb": "..."}]}"""
+
+
+def blurb_key(name, address) -> str:
+    """
+    Stable identity of a restaurant across snapshot rebuilds and database reloads.
+    """
+    raw = f"{str(name).strip()}\x1f{'' if address is None else str(address).strip()}"
+    return hashlib.sha1(raw.encode()).hexdigest()[:20]
+
+
+def frame_keys(restaurants) -> list:
+    return [blurb_key(r.name, r.address) for r in to_records(restaurants)]
+
+
+class BlurbStore:
+    """
+    SQLite table of precomputed per-restaurant blurbs. Writes are committed per batch,
+    so an interrupted enrichment run resumes where it stopped.
+    """
+    def __init__(self, path: Optional[str] = None):
+        self.path = path or BLURB_DB_PATH
+        self._conn = None
+
+    def _connect(self, create: bool = False) -> Optional[sqlite3.Connection]:
+        if self._conn is None:
+            if not create and not os.path.exists(self.path):
+                return None
+            conn = sqlite3.connect(self.path, check_same_thread=False)
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS blurbs ("
+                " key TEXT PRIMARY KEY, name TEXT, address TEXT, blurb TEXT NOT NULL,"
+                " model TEXT, created_at REAL NOT NULL)"
+            )
+            self._conn = conn
+        return self._conn
+
+    def existing_keys(self) -> set:
+        conn = self._connect()
+        return {row[0] for row in conn.execute("SELECT key FROM blurbs")} if conn else set()
+
+    def save_many(self, rows: list, model: str) -> None:
+        """
+        rows: (key, name, address, blurb) tuples.
+        """
+        conn = self._connect(create=True)
+        now = time.time()
+        with conn:
+            conn.executemany(
+                "INSERT OR REPLACE INTO blurbs (key, name, address, blurb, model, created_at) VALUES (?, ?, ?, ?, ?, ?)",
+                [(*row, model, now) for row in rows]
+            )
+
+    def lookup(self, restaurants) -> Dict[str, str]:
+        """
+        key -> blurb for the restaurants that have one.
+        """
+        conn = self._connect()
+        keys = frame_keys(restaurants)
+        if conn is None or not keys:
+            return {}
+        placeholders = ",".join("?" * len(keys))
+        return dict(conn.execute(f"SELECT key, blurb FROM blurbs WHERE key IN ({placeholders})", keys))
+
+    def for_frame(self, restaurants) -> Optional[list]:
+        """
+        Blurbs for every restaurant, in order, or None if any is missing one.
+        """
+        restaurants = to_records(restaurants)
+        found = self.lookup(restaurants)
+        blurbs = [found.get(key) for key in frame_keys(restaurants)]
+        return None if not restaurants or None in blurbs else blurbs
+
+    def count(self) -> int:
+        conn = self._connect()
+        return conn.execute("SELECT count(*) FROM blurbs").fetchone()[0] if conn else 0
+
+
+# --- Serving from stored blurbs ---
+
+def template_reason(name, rating, cost, cuisines) -> str:
+    parts = [f"{name} serves {cuisines}" if cuisines else str(name)]
+    if rating is not None:
+        parts.append(f"is rated {rating}⭐")
+    if cost != "N/A":
+        parts.append(f"costs about ₹{cost} for two")
+    return ", ".join(parts[:-1]) + (" and " if len(parts) > 1 else "") + parts[-1] + "."
+
+
+def blurb_cards(restaurants, blurbs: list) -> list:
+    """
+    Restaurant entries in the LLM's output shape, with the stored blurb as aiReason
+    (or a templated one where a blurb is None).
+    """
+    cards = []
+    for i, (r, blurb) in enumerate(zip(to_records(restaurants), blurbs)):
+        rating = None if r.rating is None else round(r.rating, 1)
+        cost = format_cost(r.cost)
+        cards.append({
+            "id": i + 1,
+            "name": r.name,
+            "rating": rating,
+            "costForTwo": cost,
+            "address": r.address,
+            "cuisines": r.cuisines,
+            "aiReason": blurb or template_reason(r.name, rating, cost, r.cuisines),
+        })
+    return cards
+
+
+def template_summary(restaurants, preferences: dict) -> str:
+    names = [str(r.name) for r in to_records(restaurants)[:3]]
+    picks = names[0] if len(names) == 1 else ", ".join(names[:-1]) + f" and {names[-1]}"
+    return f"For {describe_preferences(preferences)}, the best-rated matches are {picks}."
+
+
+def build_summary_messages(restaurants, preferences: dict) -> list:
+    prompt = (
+        f"Request: {describe_preferences(preferences)}.\n"
+        f"Top matches (name | rating | cost for two | location | cuisines):\n"
+        + render_restaurant_lines(restaurants, address_chars=0, max_cuisines=3)
+        + "\n\nWrite a friendly 2-3 sentence summary naming the best picks for this request. Plain text only."
+    )
+    return [
+        {"role": "system", "content": "You are a helpful local food guide."},
+        {"role": "user", "content": prompt}
+    ]
+
+
+# --- Offline enrichment job ---
+
+def _parse_duration(value: Optional[str]) -> float:
+    """
+    Groq reset headers look like "7.66s", "2m59.56s" or "120ms".
+    """
+    if not value:
+        return 0.0
+    total = 0.0
+    for amount, unit in re.findall(r"([\d.]+)(ms|h|m|s)", value):
+        total += float(amount) * {"ms": 0.001, "s": 1, "m": 60, "h": 3600}[unit]
+    return total if total else float(value) if value.replace(".", "", 1).isdigit() else 0.0
+
+
+class RateLimitGate:
+    """
+    Shared pause for all workers: opened by 429 Retry-After and by the x-ratelimit-* headers
+    reporting an exhausted request or token allowance.
+    """
+    def __init__(self):
+        self.resume_at = 0.0
+        self.pauses = 0
+
+    def pause(self, seconds: float) -> None:
+        if seconds > 0:
+            self.pauses += 1
+            self.resume_at = max(self.resume_at, time.monotonic() + seconds)
+
+    def observe(self, headers, needed_tokens: int = 0) -> None:
+        remaining_requests = headers.get("x-ratelimit-remaining-requests")
+        remaining_tokens = headers.get("x-ratelimit-remaining-tokens")
+        if remaining_requests is not None and int(float(remaining_requests)) <= 0:
+            self.pause(_parse_duration(headers.get("x-ratelimit-reset-requests")))
+        if remaining_tokens is not None and int(float(remaining_tokens)) < needed_tokens:
+            self.pause(_parse_duration(headers.get("x-ratelimit-reset-tokens")))
+
+    async def wait(self) -> None:
+        delay = self.resume_at - time.monotonic()
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+
+def build_blurb_messages(batch: "pd.DataFrame") -> list:
+    prompt = (
+        "Restaurants (name | rating | cost for two | location | cuisines):\n"
+        + render_restaurant_lines(batch, address_chars=0)
+        + "\n\n" + BLURB_INSTRUCTIONS
+    )
+    return [
+        {"role": "system", "content": "You write short, reusable restaurant blurbs. You only respond in JSON."},
+        {"role": "user", "content": prompt}
+    ]
+
+
+async def _generate_batch(client, batch: "pd.DataFrame", model: str, gate: RateLimitGate, max_retries: int) -> Dict[int, str]:
+    import groq
+
+    messages = build_blurb_messages(batch)
+    needed = estimate_tokens(messages[-1]["content"]) + TOKENS_PER_BLURB * len(batch)
+    for attempt in range(max_retries + 1):
+        await gate.wait()
+        try:
+            raw = await client.chat.completions.with_raw_response.create(
+                messages=messages,
+                model=model,
+                response_format={"type": "json_object"},
+                temperature=0.5,
+                max_tokens=TOKENS_PER_BLURB * len(batch) + 50,
+            )
+            gate.observe(raw.headers, needed)
+            content = (await raw.parse()).choices[0].message.content
+            items = json.loads(content).get("blurbs", [])
+            return {int(item["id"]): str(item["blurb"]).strip() for item in items if item.get("blurb")}
+        except groq.RateLimitError as e:
+            retry_after = _parse_duration(e.response.headers.get("retry-after")) or 2 ** attempt
+            logger.warning(f"Rate limited, pausing {retry_after:.2f}s (attempt {attempt + 1})")
+            gate.pause(retry_after)
+        except (groq.APIError, ValueError, KeyError, TypeError) as e:
+            logger.warning(f"Blurb batch failed (attempt {attempt + 1}): {e}")
+            await asyncio.sleep(min(2 ** attempt, 30))
+    return {}
+
+
+async def enrich_blurbs(
+    df: "pd.DataFrame",
+    store: BlurbStore,
+    client,
+    model: str = "llama-3.1-8b-instant",
+    concurrency: int = 4,
+    batch_size: int = BATCH_SIZE,
+    limit: Optional[int] = None,
+    max_retries: int = 5
+) -> dict:
+    """
+    Generates blurbs for every restaurant in df that the store doesn't have yet.
+    At most `concurrency` Groq requests are in flight; each finished batch is committed immediately.
+    """
+    start = time.perf_counter()
+    df = df.drop_duplicates(subset=['name', 'address']).reset_index(drop=True)
+    keys = frame_keys(df)
+    done = store.existing_keys()
+    pending = df[[k not in done for k in keys]]
+    if limit is not None:
+        pending = pending.head(limit)
+    logger.info(f"{len(done)} blurbs already stored, {len(pending)} restaurants to enrich.")
+
+    # The SDK's own retries would bypass the shared gate
+    client = client.with_options(max_retries=0)
+    gate = RateLimitGate()
+    semaphore = asyncio.Semaphore(concurrency)
+    stats = {"stored": 0, "failed": 0}
+
+    async def run(batch: "pd.DataFrame"):
+        async with semaphore:
+            blurbs = await _generate_batch(client, batch, model, gate, max_retries)
+        rows = []
+        for position, (_, row) in enumerate(batch.iterrows(), start=1):
+            if position in blurbs:
+                rows.append((keys[row.name], row['name'], row.get('address'), blurbs[position]))
+        if rows:
+            store.save_many(rows, model)
+        stats["stored"] += len(rows)
+        stats["failed"] += len(batch) - len(rows)
+
+    await asyncio.gather(*[run(pending.iloc[i:i + batch_size]) for i in range(0, len(pending), batch_size)])
+
+    stats.update(rate_limit_pauses=gate.pauses, seconds=round(time.perf_counter() - start, 2), total=store.count())
+    logger.info(f"Blurb enrichment finished: {stats}")
+    return stats
+
+
+if __name__ == "__main__":
+    import argparse
+    from groq import AsyncGroq
+
+    sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'phase1_data_ingestion'))
+    from snapshot import load_snapshot
+
+    parser = argparse.ArgumentParser(description="Precompute per-restaurant blurbs from the cleaned snapshot.")
+    parser.add_argument("--limit", type=int, default=None)
+    parser.add_argument("--concurrency", type=int, default=4)
+    parser.add_argument("--model", default="llama-3.1-8b-instant")
+    args = parser.parse_args()
+
+    snapshot = load_snapshot(columns=BLURB_COLUMNS)
+    print(json.dumps(asyncio.run(enrich_blurbs(
+        snapshot, BlurbStore(), AsyncGroq(), model=args.model, concurrency=args.concurrency, limit=args.limit
+    )), indent=2))
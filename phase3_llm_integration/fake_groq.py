@@ -0,0 +1,147 @@
+import os
+import re
+import json
+import time
+import asyncio
+import logging
+
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, StreamingResponse
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Simulated latencies (seconds); override per process or per test via configure()
+SETTINGS = {
+    "first_token_delay": float(os.getenv("FAKE_GROQ_FIRST_TOKEN_DELAY", 0)),
+    "token_delay": float(os.getenv("FAKE_GROQ_TOKEN_DELAY", 0)),
+    # Alternative to token_delay: generation speed in tokens/second (~4 characters per token)
+    "tokens_per_second": float(os.getenv("FAKE_GROQ_TOKENS_PER_SECOND", 0)),
+    "chunk_chars": int(os.getenv("FAKE_GROQ_CHUNK_CHARS", 16)),
+    # Answer every Nth request with a 429 + Retry-After (0 disables)
+    "rate_limit_every": int(os.getenv("FAKE_GROQ_RATE_LIMIT_EVERY", 0)),
+    "retry_after": float(os.getenv("FAKE_GROQ_RETRY_AFTER", 0.05)),
+}
+STATE = {"requests": 0, "in_flight": 0, "max_in_flight": 0}
+
+# Restaurant lines as rendered by prompt_builder: "1. Name | 4.5⭐ | ₹600 | Location | Cuisines | Address"
+ROW = re.compile(r"^\d+\. (.+ \| .+)$", re.M)
+
+app = FastAPI(title="Fake Groq")
+
+
+def configure(**settings) -> None:
+    SETTINGS.update(settings)
+    STATE.update(requests=0, in_flight=0, max_in_flight=0)
+
+
+def _number(value: str):
+    try:
+        return float(value)
+    except ValueError:
+        return None
+
+
+def fake_completion_content(messages: list) -> str:
+    """
+    Deterministic JSON shaped like the real model's output for our prompts.
+    """
+    system = messages[0]["content"] if messages else ""
+    prompt = messages[-1]["content"] if messages else ""
+    if "query parser" in system:
+        return json.dumps({"location": None, "cuisine": None, "max_price": None, "min_rating": None})
+    if "restaurant blurbs" in system:
+        blurbs = []
+        for i, row in enumerate(ROW.finditer(prompt), start=1):
+            name, _, cost, location, cuisines = (row.group(1).split(" | ") + [""] * 5)[:5]
+            blurbs.append({"id": i, "blurb": f"{name} in {location} serves {cuisines} at about {cost} for two."})
+        return json.dumps({"blurbs": blurbs}, ensure_ascii=False)
+
+    restaurants = []
+    for i, row in enumerate(ROW.finditer(prompt), start=1):
+        fields = row.group(1).split(" | ") + [""] * 6
+        name, rating, cost, _, cuisines, address = fields[:6]
+        restaurants.append({
+            "id": i,
+            "name": name,
+            "rating": _number(rating.rstrip("⭐")),
+            "costForTwo": cost.lstrip("₹"),
+            "address": address,
+            "cuisines": cuisines,
+            "aiReason": f"{name} is a reliable pick for {cuisines}.",
+        })
+    names = ", ".join(r["name"] for r in restaurants[:2]) or "nothing"
+    return json.dumps({"summary": f"Top picks: {names}.", "restaurants": restaurants}, ensure_ascii=False)
+
+
+def _chunk_delay() -> float:
+    if SETTINGS["tokens_per_second"]:
+        return SETTINGS["chunk_chars"] / 4 / SETTINGS["tokens_per_second"]
+    return SETTINGS["token_delay"]
+
+
+def _envelope(model: str, **fields) -> dict:
+    return {"id": "fake-completion", "created": int(time.time()), "model": model, "system_fingerprint": "fake", **fields}
+
+
+def _rate_limit_headers() -> dict:
+    return {
+        "x-ratelimit-remaining-requests": "1000",
+        "x-ratelimit-reset-requests": "0.1s",
+        "x-ratelimit-remaining-tokens": "100000",
+        "x-ratelimit-reset-tokens": "0.1s",
+    }
+
+
+def _chunk(model: str, delta: dict, finish_reason=None) -> str:
+    body = _envelope(model, object="chat.completion.chunk", choices=[{"index": 0, "delta": delta, "finish_reason": finish_reason}])
+    return f"data: {json.dumps(body, ensure_ascii=False)}\n\n"
+
+
+@app.post("/openai/v1/chat/completions")
+async def chat_completions(request: Request):
+    body = await request.json()
+    model = body.get("model", "fake-model")
+    content = fake_completion_content(body.get("messages", []))
+
+    STATE["requests"] += 1
+    every = SETTINGS["rate_limit_every"]
+    if every and STATE["requests"] % every == 0:
+        return JSONResponse(
+            {"error": {"message": "Rate limit reached", "type": "tokens", "code": "rate_limit_exceeded"}},
+            status_code=429,
+            headers={"retry-after": str(SETTINGS["retry_after"])},
+        )
+
+    if not body.get("stream"):
+        STATE["in_flight"] += 1
+        STATE["max_in_flight"] = max(STATE["max_in_flight"], STATE["in_flight"])
+        try:
+            await asyncio.sleep(SETTINGS["first_token_delay"] + _chunk_delay() * len(content) / SETTINGS["chunk_chars"])
+        finally:
+            STATE["in_flight"] -= 1
+        return JSONResponse(_envelope(
+            model,
+            object="chat.completion",
+            choices=[{"index": 0, "message": {"role": "assistant", "content": content}, "finish_reason": "stop"}],
+            usage={"prompt_tokens": 0, "completion_tokens": len(content) // 4, "total_tokens": len(content) // 4},
+        ), headers=_rate_limit_headers())
+
+    async def events():
+        await asyncio.sleep(SETTINGS["first_token_delay"])
+        yield _chunk(model, {"role": "assistant", "content": ""})
+        size = SETTINGS["chunk_chars"]
+        for start in range(0, len(content), size):
+            if _chunk_delay():
+                await asyncio.sleep(_chunk_delay())
+            yield _chunk(model, {"content": content[start:start + size]})
+        yield _chunk(model, {}, finish_reason="stop")
+        yield "data: [DONE]\n\n"
+
+    return StreamingResponse(events(), media_type="text/event-stream", headers=_rate_limit_headers())
+
+
+if __name__ == "__main__":
+    # GROQ_BASE_URL=http://127.0.0.1:8001 points the real SDK at this server
+    import uvicorn
+    uvicorn.run(app, host="127.0.0.1", port=int(os.getenv("FAKE_GROQ_PORT", 8001)))
@@ -0,0 +1,205 @@
+import re
+import time
+import logging
+from typing import Iterable, Optional
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+TOKEN = re.compile(r"₹|⭐|\+|\d+(?:\.\d+)?k?|[a-z]+")
+
+# Filler words that may stay unmatched without sending the query to the LLM
+STOPWORDS = {
+    "a", "an", "the", "in", "at", "near", "around", "and", "or", "with", "for", "of", "on", "to", "is", "are",
+    "me", "i", "im", "we", "want", "need", "show", "find", "get", "give", "looking", "some", "any", "please",
+    "restaurant", "restaurants", "place", "places", "spot", "spots", "food", "eat", "eating", "options",
+    "good", "best", "top", "great", "nice", "area", "bangalore", "bengaluru", "two", "people", "person",
+    "price", "cost", "rating", "ratings", "star", "stars", "than",
+}
+UPPER_WORDS = {"under", "below", "within", "upto", "max", "maximum", "less", "cheaper", "lt", "budget"}
+LOWER_WORDS = {"above", "over", "atleast", "min", "minimum", "more", "greater", "rated", "from"}
+CURRENCY_WORDS = {"rs", "inr", "rupees", "rupee", "₹"}
+RATING_WORDS = {"star", "stars", "rating", "ratings", "⭐", "+"}
+MAX_RATING_VALUE = 5.0
+
+
+def tokenize(text: str) -> list:
+    return TOKEN.findall(text.lower())
+
+
+def _number(token: str) -> Optional[float]:
+    if not token[0].isdigit():
+        return None
+    if token.endswith("k"):
+        return float(token[:-1]) * 1000
+    return float(token)
+
+
+class Gazetteer:
+    """
+    Deterministic parser for structured queries like "burger in indiranagar under 500 above 4 stars".
+    Known locations and cuisines live in one word-level trie (longest match wins); prices and
+    ratings come from comparator patterns. parse() returns None whenever a meaningful token is
+    left over, so only free-form queries pay for the Groq parser.
+    """
+    def __init__(self, locations: Iterable[str] = (), cuisines: Iterable[str] = ()):
+        self.trie = {}
+        self.local = 0
+        self.fallback = 0
+        self.total_seconds = 0.0
+        for name in locations:
+            self._add(name, "location")
+        for name in cuisines:
+            self._add(name, "cuisine")
+            # "burgers" / "momos" should still hit "Burger" / "Momos"
+            if not name.lower().endswith("s"):
+                self._add(name, "cuisine", plural=True)
+
+    def _add(self, name: str, kind: str, plural: bool = False) -> None:
+        words = tokenize(name)
+        if not words:
+            return
+        if plural:
+            words = words[:-1] + [words[-1] + "s"]
+        node = self.trie
+        for word in words:
+            node = node.setdefault(word, {})
+        # The first name registered for a phrase wins (locations before cuisines)
+        node.setdefault(None, (kind, name))
+
+    def _longest_match(self, tokens: list, start: int):
+        node = self.trie
+        match = None
+        for i in range(start, len(tokens)):
+            node = node.get(tokens[i])
+            if node is None:
+                break
+            if None in node:
+                match = (i + 1, node[None])
+        return match
+
+    def _quantity(self, tokens: list, start: int):
+        """
+        Matches [comparator] [currency] number [unit] starting at `start`.
+        Returns (end, field, value) or None.
+        """
+        i = start
+        bound = None
+        if tokens[i] in UPPER_WORDS or tokens[i] in LOWER_WORDS:
+            bound = "upper" if tokens[i] in UPPER_WORDS else "lower"
+            i += 1
+            # "less than", "more than", "at least", "up to"
+            if i < len(tokens) and tokens[i] in ("than", "least", "to"):
+                i += 1
+        elif tokens[i] in ("at", "up") and i + 1 < len(tokens) and tokens[i + 1] in ("least", "to"):
+            bound = "lower" if tokens[i + 1] == "least" else "upper"
+            i += 2
+
+        currency = False
+        if i < len(tokens) and tokens[i] in CURRENCY_WORDS:
+            currency = True
+            i += 1
+        if i >= len(tokens):
+            return None
+        value = _number(tokens[i])
+        if value is None:
+            return None
+        i += 1
+
+        rating = False
+        while i < len(tokens) and tokens[i] in RATING_WORDS:
+            rating = True
+            i += 1
+        if i < len(tokens) and tokens[i] in CURRENCY_WORDS:
+            currency = True
+            i += 1
+        # "4 stars and above"
+        if rating and i + 1 < len(tokens) and tokens[i] in ("and", "or") and tokens[i + 1] in ("above", "more", "up"):
+            bound = bound or "lower"
+            i += 2
+
+        if not rating and not currency:
+            if bound is None:
+                return None
+            # A bare "above 4" is a rating; "under 500" is a price
+            rating = value <= MAX_RATING_VALUE
+        if rating:
+            if value > MAX_RATING_VALUE:
+                return None
+            return i, ("max_rating" if bound == "upper" else "min_rating"), value
+        if bound == "lower":
+            # Minimum prices are not a supported filter
+            return None
+        return i, "max_price", value
+
+    def _scan(self, tokens: list) -> tuple:
+        """
+        (filters, unresolved words); a second, different location is reported as unresolved too.
+        """
+        filters = {"location": None, "cuisine": None, "max_price": None, "min_rating": None, "max_rating": None}
+        cuisines = []
+        unresolved = []
+
+        i = 0
+        while i < len(tokens):
+            match = self._longest_match(tokens, i)
+            if match is not None:
+                i, (kind, name) = match
+                if kind == "location":
+                    if filters["location"] not in (None, name):
+                        unresolved.append(name)  # two locations: let the LLM decide
+                    filters["location"] = name
+                elif name not in cuisines:
+                    cuisines.append(name)
+                continue
+
+            quantity = self._quantity(tokens, i)
+            if quantity is not None:
+                i, field, value = quantity
+                filters[field] = int(value) if field == "max_price" else value
+                continue
+
+            if tokens[i] not in STOPWORDS:
+                unresolved.append(tokens[i])
+            i += 1
+
+        if cuisines:
+            filters["cuisine"] = ", ".join(cuisines)
+        return filters, unresolved
+
+    def parse(self, query: str) -> Optional[dict]:
+        """
+        Returns filters shaped like parse_search_query's output, or None to defer to the LLM.
+        """
+        start = time.perf_counter()
+        filters, unresolved = self._scan(tokenize(query))
+        self.total_seconds += time.perf_counter() - start
+
+        if unresolved:
+            self.fallback += 1
+            logger.info(f"Gazetteer deferring to LLM, unresolved tokens: {unresolved}")
+            return None
+        self.local += 1
+        return filters
+
+    def leftover(self, query: str, parsed: Optional[dict] = None) -> str:
+        """
+        The words of `query` that no known location, cuisine, price or rating phrase accounts for
+        (nor any word of the location/cuisine in `parsed`), e.g. "craft beer in indiranagar under 800" -> "craft beer".
+        """
+        covered = set()
+        for field in ("location", "cuisine"):
+            if (parsed or {}).get(field):
+                covered.update(tokenize(str(parsed[field])))
+        tokens = [t for t in tokenize(query) if t not in covered]
+        _, unresolved = self._scan(tokens)
+        return " ".join(word for word in unresolved if word in tokens)
+
+    def stats(self) -> dict:
+        total = self.local + self.fallback
+        return {
+            "local": self.local,
+            "llm_fallback": self.fallback,
+            "local_share": round(self.local / total, 4) if total else 0.0,
+            "avg_parse_us": round(self.total_seconds / total * 1e6, 1) if total else 0.0,
+        }
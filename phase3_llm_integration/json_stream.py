@@ -0,0 +1,84 @@
+import json
+import logging
+from typing import List, Tuple
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+class RecommendationStreamParser:
+    """
+    Incremental scanner for the recommendation JSON
+    ({"summary": "...", "restaurants": [{...}, ...]}) as it streams in.
+    feed() returns ("summary", str) and ("restaurant", dict) events the moment the
+    corresponding value closes, without re-parsing the whole buffer on every chunk.
+    """
+    def __init__(self):
+        self.buffer = ""
+        self.pos = 0
+        self.stack = []          # open containers: '{' or '['
+        self.in_string = False
+        self.escape = False
+        self.string_start = None
+        self.expect_key = False  # only tracked for the top-level object
+        self.last_key = None
+        self.restaurants_depth = None
+        self.object_start = None
+
+    def feed(self, chunk: str) -> List[Tuple[str, object]]:
+        self.buffer += chunk
+        events = []
+        buf = self.buffer
+        for i in range(self.pos, len(buf)):
+            ch = buf[i]
+            if self.in_string:
+                if self.escape:
+                    self.escape = False
+                elif ch == "\\":
+                    self.escape = True
+                elif ch == '"':
+                    self.in_string = False
+                    self._close_string(self.string_start, i, events)
+                continue
+
+            if ch == '"':
+                self.in_string = True
+                self.string_start = i
+            elif ch in "{[":
+                self.stack.append(ch)
+                depth = len(self.stack)
+                if depth == 1:
+                    self.expect_key = True
+                elif ch == "[" and depth == 2 and self.last_key == "restaurants":
+                    self.restaurants_depth = depth
+                elif ch == "{" and self.restaurants_depth is not None and depth == self.restaurants_depth + 1:
+                    self.object_start = i
+            elif ch in "}]":
+                depth = len(self.stack)
+                if self.object_start is not None and depth == self.restaurants_depth + 1:
+                    self._emit(events, "restaurant", buf[self.object_start:i + 1])
+                    self.object_start = None
+                if ch == "]" and depth == self.restaurants_depth:
+                    self.restaurants_depth = None
+                if self.stack:
+                    self.stack.pop()
+            elif ch == "," and len(self.stack) == 1:
+                self.expect_key = True
+            elif ch == ":" and len(self.stack) == 1:
+                self.expect_key = False
+        self.pos = len(buf)
+        return events
+
+    def _close_string(self, start: int, end: int, events: list) -> None:
+        if len(self.stack) != 1:
+            return
+        if self.expect_key:
+            self.last_key = json.loads(self.buffer[start:end + 1])
+        elif self.last_key == "summary":
+            self._emit(events, "summary", self.buffer[start:end + 1])
+
+    def _emit(self, events: list, kind: str, raw: str) -> None:
+        try:
+            events.append((kind, json.loads(raw)))
+        except ValueError as e:
+            logger.warning(f"Skipping malformed streamed {kind}: {e}")
@@ -1,8 +1,18 @@
 import os
-import pandas as pd
+import json
+import asyncio
 import logging
 from dotenv import load_dotenv
-from groq import Groq
+from groq import Groq, AsyncGroq
+
+from contextvars import ContextVar
+
+from response_cache import ResponseCache, make_key
+from prompt_builder import build_recommendation_prompt, completion_budget, estimate_tokens
+from blurbs import BlurbStore, blurb_cards, template_summary, build_summary_messages, frame_keys
+from records import to_records
+import resilience
+from resilience import resilient_call, remaining_budget
 
 # Load environment variables from .env file (if present)
 load_dotenv()
@@ -14,21 +24,75 @@ logger = logging.getLogger(__name__)
 # It will automatically pick up GROQ_API_KEY from the environment
 try:
     client = Groq()
+    # Non-blocking client for the async API path; shares the same key and defaults
+    async_client = AsyncGroq()
 except Exception as e:
     logger.warning(f"Failed to initialize Groq client: {e}")
     client = None
+    async_client = None
 
-from functools import lru_cache
+# Parsed filters barely change over time, so they are kept for a week (and survive restarts)
+parse_cache = ResponseCache("parse", ttl_seconds=float(os.getenv("PARSE_CACHE_TTL_SECONDS", 7 * 24 * 3600)))
 
-@lru_cache(maxsize=100)
-def parse_search_query(query: str, model: str = "llama-3.1-8b-instant") -> dict:
+# Shared on-disk cache of recommendation JSON, keyed on model + preferences + restaurant identities
+recommendation_cache = ResponseCache("recommendation")
+
+# Per-restaurant blurbs precomputed offline (blurbs.py); when a page is fully covered,
+# only the short summary is generated per request ("llm") or none at all ("template")
+blurb_store = BlurbStore()
+BLURB_SUMMARY = os.getenv("BLURB_SUMMARY", "llm")
+SUMMARY_MAX_TOKENS = 120
+
+# Parsing is only worth a small slice of the request budget; without filters we still retrieve
+PARSE_TIMEOUT_SECONDS = float(os.getenv("PARSE_TIMEOUT_SECONDS", 2))
+
+MAX_QUERY_CHARS = 500
+
+def _repeated_prefix(text: str) -> str:
     """
-    Parses a natural language search query into structured filters using Groq.
-    Cached to speed up repeated queries.
+    The first copy when the whole text is k >= 2 copies of one multi-word query
+    ("x in yx in y", "x in y x in y"), ignoring whitespace; otherwise the text itself.
     """
-    if not client or not query:
-        return {}
+    compact = text.replace(" ", "")
+    # Smallest period of the string: the first position where it reappears inside itself doubled
+    period = (compact + compact).find(compact, 1)
+    if period >= len(compact):
+        return text
+    seen = 0
+    for end, char in enumerate(text):
+        if char != " ":
+            seen += 1
+            if seen == period:
+                prefix = text[:end + 1].strip()
+                # Repeated single words are usually real ("bora bora", "dum dum"), not a double paste
+                return prefix if " " in prefix else text
+    return text
+
+def canonicalize_query(query: str) -> str:
+    """
+    Case-folds, collapses whitespace and drops a query pasted several times over, so
+    "Burger  in Indiranagar" and "burger in indiranagarburger in indiranagar"
+    share one cache entry (and one Groq call).
+    """
+    text = " ".join(str(query).split()).casefold()[:MAX_QUERY_CHARS]
+    return _repeated_prefix(text)
+
+def parse_cache_key(query: str, model: str) -> str:
+    return make_key(model, query)
+
+def _from_cache(cached):
+    # Fresh dict per call: callers edit the result (e.g. dropping a hallucinated location)
+    return json.loads(cached) if cached is not None else None
 
+def _checked_parse(parsed) -> dict:
+    if not isinstance(parsed, dict):
+        raise ValueError(f"Expected a JSON object, got {type(parsed).__name__}")
+    return parsed
+
+def build_parse_messages(query: str) -> list:
+    """
+    Chat messages asking the model to turn a search query into structured filters.
+    """
     prompt = f"""
     Parse the user's Bangalore restaurant search query into a structured JSON object.
     Query: "{query}"
@@ -49,97 +113,377 @@ def parse_search_query(query: str, model: str = "llama-3.1-8b-instant") -> dict:
     - Return ONLY valid JSON.
     """
 
+    return [
+        {"role": "system", "content": "You are a specialized query parser for Bangalore restaurants. You output JSON only."},
+        {"role": "user", "content": prompt}
+    ]
+
+def parse_search_query(query: str, model: str = "llama-3.1-8b-instant") -> dict:
+    """
+    Parses a natural language search query into structured filters using Groq.
+    Results are cached on the canonical query; failures return {} and are never cached.
+    """
+    if not client or not query:
+        return {}
+
+    query = canonicalize_query(query)
+    key = parse_cache_key(query, model)
+    cached = _from_cache(parse_cache.get(key))
+    if cached is not None:
+        return cached
+
     try:
         completion = client.chat.completions.create(
-            messages=[
-                {"role": "system", "content": "You are a specialized query parser for Bangalore restaurants. You output JSON only."},
-                {"role": "user", "content": prompt}
-            ],
+            messages=build_parse_messages(query),
             model=model,
             response_format={"type": "json_object"},
             temperature=0,
+            timeout=PARSE_TIMEOUT_SECONDS,
         )
-        import json
-        return json.loads(completion.choices[0].message.content)
+        parsed = _checked_parse(json.loads(completion.choices[0].message.content))
+        parse_cache.set(key, json.dumps(parsed))
+        return parsed
     except Exception as e:
         logger.error(f"Error parsing search query: {e}")
         return {}
 
-def generate_recommendation_prompt(df: pd.DataFrame, preferences: dict) -> str:
+async def parse_search_query_async(query: str, model: str = "llama-3.1-8b-instant") -> dict:
     """
-    Restores high-quality, detailed prompts for persuasive recommendations.
+    Non-blocking parse_search_query for the async API; shares the same persistent cache.
     """
-    if df.empty:
-        return '{"summary": "No exact matches found. Try broadening your criteria.", "restaurants": []}'
-        
-    prompt = f"You are an expert food guide. Recommend these SPECIFIC restaurants for preferences: {preferences}.\n\n"
-    prompt += "RESTAURANTS FROM DATABASE:\n"
-    
-    for _, row in df.iterrows():
-        # Clean price string for the prompt
-        price = str(row.get('approx_cost(for two people)', 'N/A')).replace('.0', '')
-        prompt += f"- Name: {row.get('name')}, Rating: {row.get('rate')}, Cost: ₹{price}, Location: {row.get('location')}, Cuisines: {row.get('cuisines')}, Address: {row.get('address')}\n"
-        
-    prompt += """
-Based on the data above, provide customized, engaging recommendations. 
-CRITICAL QUALITY RULES:
-1. You MUST ONLY use the real names and data provided above. NEVER hallucinate names like "Joe's Diner".
-2. You MUST return ALL the restaurants provided in the 'RESTAURANTS FROM DATABASE' section. Do not skip any. If 6 are provided, return 6.
-3. The 'summary' field MUST be a detailed, conversational 3-4 sentence paragraph naming the top spots and why they fit the user's specific request.
-4. For EVERY restaurant, the 'aiReason' MUST be a persuasive 3-4 sentence explanation. Do NOT just say "High rating". Explain why this specific place is a great match.
-5. Preserve the 'cuisines' formatting exactly as shown (e.g. "Pizza, Italian, Cafe" with spaces and commas).
-
-Output strictly valid JSON:
-{
-  "summary": "Full detailed paragraph...",
-  "restaurants": [
-    {
-      "id": 1,
-      "name": "Exact Name",
-      "rating": 4.5,
-      "costForTwo": "600",
-      "address": "Full Address",
-      "cuisines": "Cuisine 1, Cuisine 2 (KEEP SPACES)",
-      "aiReason": "A detailed 3-4 sentence persuasive explanation..."
+    if not async_client or not query:
+        return {}
+
+    query = canonicalize_query(query)
+    key = parse_cache_key(query, model)
+    cached = _from_cache(await parse_cache.aget(key))
+    if cached is not None:
+        return cached
+
+    try:
+        completion = await resilient_call(
+            lambda: async_client.chat.completions.create(
+                messages=build_parse_messages(query),
+                model=model,
+                response_format={"type": "json_object"},
+                temperature=0,
+            ),
+            "parse",
+            remaining_budget(PARSE_TIMEOUT_SECONDS),
+            resilience.parse_breaker,
+        )
+        parsed = _checked_parse(json.loads(completion.choices[0].message.content))
+        await parse_cache.aset(key, json.dumps(parsed))
+        return parsed
+    except Exception as e:
+        logger.error(f"Error parsing search query: {e}")
+        return {}
+
+def generate_recommendation_prompt(df, preferences: dict) -> str:
+    """
+    Compact, token-budgeted prompt (see prompt_builder).
+    """
+    return build_recommendation_prompt(df, preferences)[0]
+
+# Token accounting for the current request (contextvars are per asyncio task, so per request)
+last_token_usage = ContextVar("last_token_usage", default=None)
+
+def record_token_usage(estimated_prompt_tokens: int, max_tokens: int, usage=None, completion_text: str = None, cached: bool = False) -> dict:
+    """
+    Prefers Groq's reported usage; falls back to local estimates (e.g. for streamed responses).
+    """
+    report = {
+        "prompt_tokens": getattr(usage, "prompt_tokens", None) if usage is not None else None,
+        "completion_tokens": getattr(usage, "completion_tokens", None) if usage is not None else None,
+        "estimated_prompt_tokens": estimated_prompt_tokens,
+        "max_tokens": max_tokens,
+        "cached": cached,
     }
-  ]
-}
-"""
-    return prompt
+    if cached:
+        report["prompt_tokens"] = report["completion_tokens"] = 0
+    if report["prompt_tokens"] is None:
+        report["prompt_tokens"] = estimated_prompt_tokens
+    if report["completion_tokens"] is None:
+        report["completion_tokens"] = estimate_tokens(completion_text or "")
+    last_token_usage.set(report)
+    logger.info(
+        f"LLM tokens: prompt={report['prompt_tokens']} completion={report['completion_tokens']} "
+        f"(max_tokens={max_tokens}, cached={cached})"
+    )
+    return report
 
-def get_llm_recommendation(df: pd.DataFrame, preferences: dict, model: str = "llama-3.1-8b-instant") -> str:
+def normalize_preferences(preferences: dict) -> dict:
+    """
+    Drops empty filters and canonicalizes the rest so equivalent requests share a cache entry.
+    """
+    normalized = {}
+    for key, value in (preferences or {}).items():
+        if value is None or value == "":
+            continue
+        if isinstance(value, str):
+            value = " ".join(value.split()).lower()
+        elif isinstance(value, (int, float)):
+            value = round(float(value), 2)
+        normalized[key] = value
+    return normalized
+
+def recommendation_cache_key(restaurants, preferences: dict, model: str) -> str:
+    """
+    Restaurants are identified by database id when present, otherwise by (name, address).
+    """
+    restaurants = to_records(restaurants)
+    if all(r.id is not None for r in restaurants):
+        identities = sorted(r.id for r in restaurants)
+    else:
+        identities = sorted((str(r.name), str(r.address)) for r in restaurants)
+    return make_key(model, normalize_preferences(preferences), identities)
+
+def _cacheable(content: str) -> bool:
+    # Only well-formed JSON is worth replaying
+    try:
+        json.loads(content)
+    except (TypeError, ValueError):
+        return False
+    return True
+
+def _cache_response(key: str, content: str) -> None:
+    if _cacheable(content):
+        recommendation_cache.set(key, content)
+
+async def _cache_response_async(key: str, content: str) -> None:
+    if _cacheable(content):
+        await recommendation_cache.aset(key, content)
+
+def fallback_recommendation(df, preferences: dict) -> str:
+    """
+    Deterministic response from the retrieved rows (and any stored blurbs) for when Groq
+    is slow, failing or behind an open circuit; never cached.
+    """
+    df = to_records(df)
+    found = blurb_store.lookup(df)
+    blurbs = [found.get(key) for key in frame_keys(df)]
+    record_token_usage(0, 0)
+    return json.dumps({"summary": template_summary(df, preferences), "restaurants": blurb_cards(df, blurbs)}, ensure_ascii=False)
+
+def build_recommendation_messages(prompt: str) -> list:
+    return [
+        {"role": "system", "content": "You are a helpful local food guide. You only respond in JSON."},
+        {"role": "user", "content": prompt}
+    ]
+
+def get_llm_recommendation(df, preferences: dict, model: str = "llama-3.1-8b-instant") -> str:
     """
     Calls the Groq API to generate JSON-formatted recommendations.
     Restored high token limit for quality.
     """
-    if not client:
-        return '{"summary": "Service unavailable.", "restaurants": []}'
-        
-    if df is None or df.empty:
+    df = to_records(df)
+    if not df:
         return '{"summary": "No restaurants found matching your filters. Try broadening your search!", "restaurants": []}'
+
+    if not client:
+        return fallback_recommendation(df, preferences)
         
-    prompt = generate_recommendation_prompt(df, preferences)
+    cache_key = recommendation_cache_key(df, preferences, model)
+    cached = recommendation_cache.get(cache_key)
+    if cached is not None:
+        record_token_usage(0, 0, cached=True)
+        return cached
+
+    prompt, prompt_tokens = build_recommendation_prompt(df, preferences)
+    max_tokens = completion_budget(len(df))
     
     try:
         chat_completion = client.chat.completions.create(
-            messages=[
-                {"role": "system", "content": "You are a helpful local food guide. You only respond in JSON."},
-                {"role": "user", "content": prompt}
-            ],
+            messages=build_recommendation_messages(prompt),
             model=model,
             response_format={"type": "json_object"},
             temperature=0.7,
-            max_tokens=3000, # Increased token limit to allow longer output (all 5 recommendations)
+            max_tokens=max_tokens,
+            timeout=remaining_budget(),
+        )
+        content = chat_completion.choices[0].message.content
+        record_token_usage(prompt_tokens, max_tokens, getattr(chat_completion, "usage", None), content)
+        _cache_response(cache_key, content)
+        return content
+    except Exception as e:
+        logger.error(f"Error calling Groq API, serving templated response: {e}")
+        return fallback_recommendation(df, preferences)
+
+async def get_blurb_recommendation_async(df, preferences: dict, model: str = "llama-3.1-8b-instant"):
+    """
+    Assembles the recommendation JSON from stored blurbs plus a short summary.
+    Returns None when any restaurant in df has no blurb yet.
+    """
+    df = to_records(df)
+    blurbs = blurb_store.for_frame(df)
+    if blurbs is None:
+        return None
+
+    cache_key = recommendation_cache_key(df, preferences, model)
+    cached = await recommendation_cache.aget(cache_key)
+    if cached is not None:
+        record_token_usage(0, 0, cached=True)
+        return cached
+
+    summary = template_summary(df, preferences)
+    cacheable = True
+    if BLURB_SUMMARY == "llm" and async_client:
+        messages = build_summary_messages(df, preferences)
+        prompt_tokens = estimate_tokens(messages[-1]["content"])
+        try:
+            chat_completion = await resilient_call(
+                lambda: async_client.chat.completions.create(
+                    messages=messages,
+                    model=model,
+                    temperature=0.7,
+                    max_tokens=SUMMARY_MAX_TOKENS,
+                ),
+                "summary",
+                remaining_budget(),
+            )
+            summary = chat_completion.choices[0].message.content.strip() or summary
+            record_token_usage(prompt_tokens, SUMMARY_MAX_TOKENS, getattr(chat_completion, "usage", None), summary)
+        except Exception as e:
+            logger.error(f"Error generating summary, using template: {e!r}")
+            record_token_usage(0, 0)
+            cacheable = False
+    else:
+        record_token_usage(0, 0)
+
+    content = json.dumps({"summary": summary, "restaurants": blurb_cards(df, blurbs)}, ensure_ascii=False)
+    if cacheable:
+        await _cache_response_async(cache_key, content)
+    return content
+
+async def get_llm_recommendation_async(df, preferences: dict, model: str = "llama-3.1-8b-instant") -> str:
+    """
+    Non-blocking get_llm_recommendation: awaits Groq instead of holding a threadpool slot.
+    Pages fully covered by stored blurbs skip the per-restaurant generation.
+    `df` is a list of Restaurant records (the API path) or a DataFrame.
+    """
+    df = to_records(df)
+    if df:
+        assembled = await get_blurb_recommendation_async(df, preferences, model)
+        if assembled is not None:
+            return assembled
+
+    if not df:
+        return '{"summary": "No restaurants found matching your filters. Try broadening your search!", "restaurants": []}'
+
+    if not async_client:
+        return fallback_recommendation(df, preferences)
+
+    cache_key = recommendation_cache_key(df, preferences, model)
+    cached = await recommendation_cache.aget(cache_key)
+    if cached is not None:
+        record_token_usage(0, 0, cached=True)
+        return cached
+
+    prompt, prompt_tokens = build_recommendation_prompt(df, preferences)
+    max_tokens = completion_budget(len(df))
+
+    try:
+        chat_completion = await resilient_call(
+            lambda: async_client.chat.completions.create(
+                messages=build_recommendation_messages(prompt),
+                model=model,
+                response_format={"type": "json_object"},
+                temperature=0.7,
+                max_tokens=max_tokens,
+            ),
+            "recommend",
+            remaining_budget(),
         )
-        return chat_completion.choices[0].message.content
+        content = chat_completion.choices[0].message.content
+        record_token_usage(prompt_tokens, max_tokens, getattr(chat_completion, "usage", None), content)
+        await _cache_response_async(cache_key, content)
+        return content
     except Exception as e:
-        logger.error(f"Error calling Groq API: {e}")
-        return '{"restaurants": []}'
+        logger.error(f"Error calling Groq API, serving templated response: {e!r}")
+        return fallback_recommendation(df, preferences)
+
+async def stream_llm_recommendation_async(df, preferences: dict, model: str = "llama-3.1-8b-instant"):
+    """
+    Yields the recommendation JSON as text deltas while Groq generates it (stream=True).
+    Cache hits and fallbacks are yielded as a single chunk; the full text is cached at the end.
+    With stored blurbs the restaurants go out first and the summary follows.
+    Failures before the first delta yield the fallback; failures after it are raised.
+    """
+    df = to_records(df)
+    if df:
+        blurbs = blurb_store.for_frame(df)
+        if blurbs is not None:
+            cards = json.dumps(blurb_cards(df, blurbs), ensure_ascii=False)
+            yield '{"restaurants": ' + cards + ', '
+            content = await get_blurb_recommendation_async(df, preferences, model)
+            yield '"summary": ' + json.dumps(json.loads(content)["summary"], ensure_ascii=False) + '}'
+            return
+
+    if not df:
+        yield '{"summary": "No restaurants found matching your filters. Try broadening your search!", "restaurants": []}'
+        return
+
+    if not async_client:
+        yield fallback_recommendation(df, preferences)
+        return
+
+    cache_key = recommendation_cache_key(df, preferences, model)
+    cached = await recommendation_cache.aget(cache_key)
+    if cached is not None:
+        record_token_usage(0, 0, cached=True)
+        yield cached
+        return
+
+    prompt, prompt_tokens = build_recommendation_prompt(df, preferences)
+    max_tokens = completion_budget(len(df))
+    parts = []
+    stream = None
+    try:
+        stream = await resilient_call(
+            lambda: async_client.chat.completions.create(
+                messages=build_recommendation_messages(prompt),
+                model=model,
+                response_format={"type": "json_object"},
+                temperature=0.7,
+                max_tokens=max_tokens,
+                stream=True,
+            ),
+            "first_token",
+            remaining_budget(),
+        )
+        usage = None
+        chunks = stream.__aiter__()
+        while True:
+            # Every chunk has to arrive within what is left of the request budget
+            try:
+                chunk = await asyncio.wait_for(chunks.__anext__(), timeout=remaining_budget())
+            except StopAsyncIteration:
+                break
+            # Groq reports usage on the final chunk under x_groq
+            usage = getattr(getattr(chunk, "x_groq", None), "usage", None) or usage
+            delta = chunk.choices[0].delta.content if chunk.choices else None
+            if delta:
+                parts.append(delta)
+                yield delta
     except Exception as e:
-        logger.error(f"Error calling Groq API: {e}")
-        return '{"restaurants": []}'
+        logger.error(f"Error streaming from Groq API: {e!r}")
+        if stream is not None:
+            # resilient_call only saw the first token; a stream that stalls or drops later counts too
+            resilience.groq_breaker.record_failure()
+            await stream.close()
+        # Half a JSON object can't be completed with the fallback, so the caller reports the failure
+        if parts:
+            raise
+        yield fallback_recommendation(df, preferences)
+        return
+
+    content = "".join(parts)
+    record_token_usage(prompt_tokens, max_tokens, usage, content)
+    await _cache_response_async(cache_key, content)
 
 if __name__ == "__main__":
+    import pandas as pd
+
     # A simple mock DB result for manual testing
     mock_data = pd.DataFrame({
         'name': ['ECHOES Koramangala', 'Pin Me Down'],
@@ -0,0 +1,121 @@
+import os
+import re
+import sys
+import math
+import logging
+from typing import Optional
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'phase2_knowledge_base'))
+
+from records import to_records
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+PROMPT_TOKEN_BUDGET = int(os.getenv("PROMPT_TOKEN_BUDGET", 1500))
+# Output sizing: the summary paragraph plus one card (echoed fields + 3-4 sentence reason) per restaurant
+SUMMARY_TOKENS = 160
+TOKENS_PER_RESTAURANT = 190
+MAX_COMPLETION_TOKENS = 3000
+
+# Roughly how BPE tokenizers split English: words, numbers and individual symbols
+TOKEN_PATTERN = re.compile(r"[A-Za-z]+|\d+|[^\sA-Za-z\d]")
+
+# Progressively cheaper renderings, tried in order until the prompt fits the budget
+TRIM_LEVELS = [
+    {"address_chars": None, "max_cuisines": None},
+    {"address_chars": 60, "max_cuisines": None},
+    {"address_chars": 30, "max_cuisines": 3},
+    {"address_chars": 0, "max_cuisines": 2},
+]
+
+INSTRUCTIONS = """Rules:
+1. Use ONLY the restaurants listed above, with their exact names and data. Never invent places.
+2. Return ALL {count} restaurants, in the listed order.
+3. 'summary': a conversational 3-4 sentence paragraph naming the top spots and why they fit the request.
+4. 'aiReason': a persuasive 3-4 sentence explanation per restaurant, specific to the request (not just "high rating").
+5. Keep 'cuisines' exactly as listed (e.g. "Pizza, Italian, Cafe").
+
+Output strictly valid JSON:
+{{"summary": "...", "restaurants": [{{"id": 1, "name": "Exact Name", "rating": 4.5, "costForTwo": "600", "address": "Address as listed", "cuisines": "Cuisine 1, Cuisine 2", "aiReason": "..."}}]}}"""
+
+
+def estimate_tokens(text: str) -> int:
+    """
+    Local token estimate (no tokenizer download): ~1.3 tokens per word-ish piece.
+    Good to within ~15% of Llama 3 counts for these prompts, which is all a budget needs.
+    """
+    return math.ceil(len(TOKEN_PATTERN.findall(text)) * 1.3)
+
+
+def completion_budget(restaurant_count: int) -> int:
+    """
+    max_tokens scaled to the number of cards the model has to write.
+    """
+    return min(MAX_COMPLETION_TOKENS, SUMMARY_TOKENS + TOKENS_PER_RESTAURANT * max(restaurant_count, 1))
+
+
+def describe_preferences(preferences: dict) -> str:
+    parts = [f"{k}={v}" for k, v in (preferences or {}).items() if v is not None and v != ""]
+    return "; ".join(parts) or "no specific filters"
+
+
+def _text(value) -> str:
+    return "N/A" if value is None else value.strip()
+
+
+def format_rating(rating) -> str:
+    return "N/A" if rating is None else str(round(rating, 1))
+
+
+def format_cost(cost) -> str:
+    return "N/A" if cost is None else str(int(cost))
+
+
+def render_restaurant_lines(restaurants, address_chars: Optional[int] = None, max_cuisines: Optional[int] = None) -> str:
+    """
+    One compact line per restaurant (Restaurant records, or a DataFrame from offline callers):
+    "1. Name | 4.5⭐ | ₹600 | Location | Cuisines | Address"
+    """
+    lines = []
+    for i, r in enumerate(to_records(restaurants), start=1):
+        cuisines = _text(r.cuisines)
+        if max_cuisines:
+            cuisines = ",".join(cuisines.split(",")[:max_cuisines])
+        line = (
+            f"{i}. {_text(r.name)} | {format_rating(r.rating)}⭐ | ₹{format_cost(r.cost)} | "
+            f"{_text(r.location)} | {cuisines}"
+        )
+        if address_chars != 0:
+            address = _text(r.address)
+            if address_chars and len(address) > address_chars:
+                address = address[:address_chars].rstrip() + "…"
+            line += " | " + address
+        lines.append(line)
+    return "\n".join(lines)
+
+
+def build_recommendation_prompt(restaurants, preferences: dict, token_budget: int = PROMPT_TOKEN_BUDGET) -> tuple:
+    """
+    Returns (prompt, estimated_tokens), trimming addresses and cuisine lists until the prompt fits.
+    """
+    restaurants = to_records(restaurants)
+    wants = describe_preferences(preferences)
+    if not restaurants:
+        prompt = (
+            f"Unfortunately, no restaurants exactly matched the request ({wants}). "
+            'Reply as JSON {"summary": "...", "restaurants": []} with a short, friendly suggestion for broadening the search.'
+        )
+        return prompt, estimate_tokens(prompt)
+
+    header = f"You are an expert Bangalore food guide. Request: {wants}.\nRestaurants (name | rating | cost for two | location | cuisines | address):\n"
+    footer = "\n\n" + INSTRUCTIONS.format(count=len(restaurants))
+
+    for level in TRIM_LEVELS:
+        prompt = header + render_restaurant_lines(restaurants, **level) + footer
+        tokens = estimate_tokens(prompt)
+        if tokens <= token_budget:
+            return prompt, tokens
+
+    logger.warning(f"Prompt for {len(restaurants)} restaurants is ~{tokens} tokens, over the {token_budget} budget even when trimmed")
+    return prompt, tokens
@@ -0,0 +1,182 @@
+import os
+import time
+import asyncio
+import logging
+from collections import deque
+from contextvars import ContextVar
+from typing import Awaitable, Callable, Optional
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# End-to-end budget for one API request; LLM calls get whatever is left of it
+REQUEST_BUDGET_SECONDS = float(os.getenv("REQUEST_BUDGET_SECONDS", 8))
+HEDGE_REQUESTS = os.getenv("HEDGE_REQUESTS", "1") == "1"
+# Hedging only starts once the p95 is based on this many observations
+HEDGE_MIN_SAMPLES = 20
+
+request_deadline = ContextVar("request_deadline", default=None)
+
+
+class CircuitOpenError(Exception):
+    pass
+
+
+def start_deadline(seconds: float = REQUEST_BUDGET_SECONDS) -> float:
+    """
+    Sets the absolute deadline for the current request (inherited by tasks it spawns).
+    """
+    deadline = time.monotonic() + seconds
+    request_deadline.set(deadline)
+    return deadline
+
+
+def remaining_budget(cap: Optional[float] = None) -> float:
+    """
+    Seconds left before the request deadline, optionally capped; the cap alone applies outside a request.
+    """
+    deadline = request_deadline.get()
+    left = REQUEST_BUDGET_SECONDS if deadline is None else deadline - time.monotonic()
+    return max(0.0, left if cap is None else min(left, cap))
+
+
+class LatencyTracker:
+    """
+    Rolling window of successful call latencies.
+    """
+    def __init__(self, name: str, window: int = 200):
+        self.name = name
+        self.samples = deque(maxlen=window)
+
+    def observe(self, seconds: float) -> None:
+        self.samples.append(seconds)
+
+    def p95(self) -> Optional[float]:
+        if len(self.samples) < HEDGE_MIN_SAMPLES:
+            return None
+        ordered = sorted(self.samples)
+        return ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))]
+
+
+class CircuitBreaker:
+    """
+    Opens after `failure_threshold` consecutive failures and rejects calls for `reset_seconds`;
+    then lets a single trial call through (half-open) and closes again if it succeeds.
+    """
+    def __init__(self, name: str, failure_threshold: int = 5, reset_seconds: float = 30.0):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_seconds = reset_seconds
+        self.failures = 0
+        self.opened_at = None
+        self.trial_in_flight = False
+        self.rejected = 0
+
+    @property
+    def state(self) -> str:
+        if self.opened_at is None:
+            return "closed"
+        if time.monotonic() - self.opened_at >= self.reset_seconds:
+            return "half_open"
+        return "open"
+
+    def allow(self) -> bool:
+        state = self.state
+        if state == "closed":
+            return True
+        if state == "half_open" and not self.trial_in_flight:
+            self.trial_in_flight = True
+            return True
+        self.rejected += 1
+        return False
+
+    def record_success(self) -> None:
+        self.failures = 0
+        self.opened_at = None
+        self.trial_in_flight = False
+
+    def record_failure(self) -> None:
+        self.failures += 1
+        self.trial_in_flight = False
+        if self.opened_at is not None or self.failures >= self.failure_threshold:
+            if self.opened_at is None:
+                logger.warning(f"Circuit {self.name} opened after {self.failures} consecutive failures")
+            self.opened_at = time.monotonic()
+
+    def stats(self) -> dict:
+        return {"state": self.state, "consecutive_failures": self.failures, "rejected": self.rejected}
+
+
+# One breaker for the Groq recommendation calls; one latency profile per kind of call
+groq_breaker = CircuitBreaker("groq")
+# Parsing has its own short cap and falls back to filter-less retrieval by itself, so slow parses
+# trip only this breaker instead of pushing /recommend onto templated responses
+parse_breaker = CircuitBreaker("groq_parse")
+LATENCY = {kind: LatencyTracker(kind) for kind in ("parse", "recommend", "summary", "first_token")}
+HEDGES = {"launched": 0, "won": 0}
+
+
+async def resilient_call(make_call: Callable[[], Awaitable], kind: str, timeout: float, breaker: CircuitBreaker = None):
+    """
+    Awaits make_call() within `timeout` seconds. When the call outlives the observed p95 for its
+    kind, one duplicate is launched and whichever finishes first wins.
+    Raises CircuitOpenError, asyncio.TimeoutError or the call's own exception.
+    """
+    breaker = breaker or groq_breaker
+    # Before allow(): a spent deadline says nothing about Groq and must not take the half-open trial slot
+    if timeout <= 0:
+        raise asyncio.TimeoutError("request deadline already passed")
+    if not breaker.allow():
+        raise CircuitOpenError(f"circuit {breaker.name} is open")
+
+    tracker = LATENCY[kind]
+    start = time.monotonic()
+    tasks = [asyncio.ensure_future(make_call())]
+    try:
+        p95 = tracker.p95()
+        if HEDGE_REQUESTS and p95 is not None and p95 < timeout:
+            done, _ = await asyncio.wait(tasks, timeout=p95)
+            if not done:
+                HEDGES["launched"] += 1
+                logger.info(f"{kind} call passed p95 ({p95:.2f}s), sending a hedged duplicate")
+                tasks.append(asyncio.ensure_future(make_call()))
+
+        result = None
+        pending = set(tasks)
+        while pending:
+            left = timeout - (time.monotonic() - start)
+            done, pending = await asyncio.wait(pending, timeout=max(left, 0), return_when=asyncio.FIRST_COMPLETED)
+            if not done:
+                raise asyncio.TimeoutError(f"{kind} call exceeded {timeout:.2f}s")
+            winner = next((t for t in done if t.exception() is None), None)
+            if winner is not None:
+                result = winner.result()
+                if winner is not tasks[0]:
+                    HEDGES["won"] += 1
+                break
+            if not pending:
+                raise next(iter(done)).exception()
+
+        tracker.observe(time.monotonic() - start)
+        breaker.record_success()
+        return result
+    except asyncio.CancelledError:
+        # The caller went away; that says nothing about Groq's health
+        breaker.trial_in_flight = False
+        raise
+    except Exception:
+        breaker.record_failure()
+        raise
+    finally:
+        for task in tasks:
+            if not task.done():
+                task.cancel()
+
+
+def resilience_stats() -> dict:
+    return {
+        "breaker": groq_breaker.stats(),
+        "parse_breaker": parse_breaker.stats(),
+        "p95_seconds": {kind: tracker.p95() for kind, tracker in LATENCY.items()},
+        "hedges": dict(HEDGES),
+    }
@@ -0,0 +1,189 @@
+import re
+import time
+import bisect
+import logging
+from collections import Counter
+from typing import Iterable, Optional, List
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+WORD = re.compile(r"[a-z0-9]+")
+MAX_SUGGESTIONS = 8
+# Trigram candidates that get the (slower) edit-distance check
+FUZZY_CANDIDATES = 20
+
+
+def compact(text: str) -> str:
+    """
+    "Indira nagar" / "Indira-Nagar" -> "indiranagar": spacing and punctuation never count as typos.
+    """
+    return "".join(WORD.findall(str(text).lower()))
+
+
+def trigrams(text: str) -> set:
+    padded = f"  {text} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+def edit_distance(a: str, b: str, limit: int) -> int:
+    """
+    Levenshtein distance, or limit + 1 as soon as it is known to exceed `limit`.
+    """
+    if abs(len(a) - len(b)) > limit:
+        return limit + 1
+    previous = list(range(len(b) + 1))
+    for i, ca in enumerate(a, 1):
+        current = [i]
+        for j, cb in enumerate(b, 1):
+            current.append(min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + (ca != cb)))
+        if min(current) > limit:
+            return limit + 1
+        previous = current
+    return previous[-1]
+
+
+def _counts(names) -> dict:
+    # Either {name: restaurant count} or a plain list of names
+    return dict(names) if hasattr(names, "items") else {name: 0 for name in names}
+
+
+class Resolver:
+    """
+    Typo-tolerant lookup over every location and cuisine name, built once per vocabulary.
+    A sorted prefix table (one key per word start, so "5th bl" finds "Koramangala 5th Block")
+    answers autocomplete with two bisects; a trigram index narrows fuzzy matches to a handful
+    of names before any edit distance is computed. Ties go to the name with more restaurants.
+    """
+    def __init__(self, locations: Iterable[str] = (), cuisines: Iterable[str] = ()):
+        start = time.perf_counter()
+        self.names, self.kinds, self.counts, self.keys = [], [], [], []
+        self.exact = {}
+        self.grams = {}
+        prefixes = []
+        for kind, names in (("location", _counts(locations)), ("cuisine", _counts(cuisines))):
+            for name, count in names.items():
+                key = compact(name)
+                if not key or (kind, key) in self.exact:
+                    continue
+                entry = len(self.names)
+                self.names.append(name)
+                self.kinds.append(kind)
+                self.counts.append(int(count or 0))
+                self.keys.append(key)
+                self.exact[(kind, key)] = entry
+                words = WORD.findall(name.lower())
+                for i in range(len(words)):
+                    # i == 0 marks a match on the start of the whole name
+                    prefixes.append(("".join(words[i:]), i, entry))
+                for gram in trigrams(key):
+                    self.grams.setdefault(gram, []).append(entry)
+        prefixes.sort()
+        self.prefix_keys = [p[0] for p in prefixes]
+        self.prefix_entries = [(p[1], p[2]) for p in prefixes]
+        self.lookups = 0
+        self.total_seconds = 0.0
+        logger.info(f"Resolver ready with {len(self.names)} names in {(time.perf_counter() - start) * 1000:.1f} ms")
+
+    def _rank(self, entries) -> List[int]:
+        return sorted(set(entries), key=lambda e: (-self.counts[e], self.names[e]))
+
+    def _prefix(self, key: str, kind: Optional[str], whole_name: bool = False) -> List[int]:
+        lo = bisect.bisect_left(self.prefix_keys, key)
+        hi = bisect.bisect_left(self.prefix_keys, key + "\uffff")
+        starts = {}
+        for word_start, entry in self.prefix_entries[lo:hi]:
+            if (kind is None or self.kinds[entry] == kind) and (not whole_name or word_start == 0):
+                starts[entry] = min(word_start, starts.get(entry, word_start))
+        return sorted(starts, key=lambda e: (starts[e] > 0, -self.counts[e], self.names[e]))
+
+    def _fuzzy(self, key: str, kind: Optional[str]) -> List[int]:
+        """
+        Names within ~1 edit per 4 characters of `key`, either whole or as a prefix, best first.
+        """
+        overlap = Counter()
+        for gram in trigrams(key):
+            for entry in self.grams.get(gram, ()):
+                if kind is None or self.kinds[entry] == kind:
+                    overlap[entry] += 1
+        limit = max(1, len(key) // 4)
+        scored = []
+        for entry, _ in overlap.most_common(FUZZY_CANDIDATES):
+            name = self.keys[entry]
+            # A prefix may also be one letter short of the name's prefix ("indra" -> "indira")
+            distance = min(edit_distance(key, candidate, limit) for candidate in (name, name[:len(key)], name[:len(key) + 1]))
+            if distance <= limit:
+                scored.append((distance, -self.counts[entry], self.names[entry], entry))
+        return [entry for *_, entry in sorted(scored)]
+
+    def _pick(self, entries: List[int]) -> str:
+        """
+        One name, or for several ("Koramangala 5th/6th Block") their shared leading words, which the
+        retrieval substring match expands back to all of them.
+        """
+        ranked = self._rank(entries)
+        if len(ranked) == 1:
+            return self.names[ranked[0]]
+        best = self.names[ranked[0]]
+        shared = WORD.findall(best.lower())
+        for entry in ranked[1:]:
+            words = WORD.findall(self.names[entry].lower())
+            n = 0
+            while n < min(len(shared), len(words)) and shared[n] == words[n]:
+                n += 1
+            shared = shared[:n]
+        if not shared:
+            return best
+        return " ".join(best.split()[:len(shared)])
+
+    def resolve(self, text: str, kind: str) -> Optional[str]:
+        """
+        Canonical name for a parsed location/cuisine ("indira nagar" -> "Indiranagar",
+        "koramangala" -> "Koramangala", "chineese" -> "Chinese"), or None if nothing is close.
+        """
+        start = time.perf_counter()
+        try:
+            key = compact(text or "")
+            if not key:
+                return None
+            entry = self.exact.get((kind, key))
+            if entry is not None:
+                return self.names[entry]
+            prefixed = self._prefix(key, kind, whole_name=True)
+            if prefixed:
+                return self._pick(prefixed)
+            # "btm layout" -> "BTM": the longest known name the text starts with
+            for end in range(len(key) - 1, 2, -1):
+                entry = self.exact.get((kind, key[:end]))
+                if entry is not None:
+                    return self.names[entry]
+            fuzzy = self._fuzzy(key, kind)
+            if not fuzzy:
+                return None
+            best = fuzzy[0]
+            # Equally close names (a misspelt "koramangla" vs every block) resolve like a prefix
+            ties = [e for e in fuzzy if self.keys[e][:len(key)] == self.keys[best][:len(key)]]
+            return self._pick(ties)
+        finally:
+            self.lookups += 1
+            self.total_seconds += time.perf_counter() - start
+
+    def suggest(self, text: str, kind: Optional[str] = None, limit: int = MAX_SUGGESTIONS) -> List[dict]:
+        """
+        Autocomplete: names starting with (or with a word starting with) `text`, then close misspellings.
+        """
+        start = time.perf_counter()
+        key = compact(text or "")
+        entries = self._prefix(key, kind)[:limit] if key else []
+        if len(entries) < limit and len(key) >= 3:
+            entries += [e for e in self._fuzzy(key, kind) if e not in entries][:limit - len(entries)]
+        self.lookups += 1
+        self.total_seconds += time.perf_counter() - start
+        return [{"name": self.names[e], "kind": self.kinds[e], "restaurants": self.counts[e]} for e in entries]
+
+    def stats(self) -> dict:
+        return {
+            "names": len(self.names),
+            "lookups": self.lookups,
+            "avg_lookup_us": round(self.total_seconds / self.lookups * 1e6, 1) if self.lookups else 0.0,
+        }
@@ -0,0 +1,145 @@
+import os
+import json
+import time
+import asyncio
+import sqlite3
+import hashlib
+import logging
+import tempfile
+import threading
+from typing import Optional
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# /tmp is the only writable path on Vercel and is shared by every worker on the same host
+CACHE_PATH = os.getenv("LLM_CACHE_PATH", os.path.join(tempfile.gettempdir(), "llm_response_cache.sqlite3"))
+CACHE_TTL_SECONDS = float(os.getenv("LLM_CACHE_TTL_SECONDS", 24 * 3600))
+CACHE_MAX_ENTRIES = int(os.getenv("LLM_CACHE_MAX_ENTRIES", 5000))
+
+
+def make_key(*parts) -> str:
+    """
+    Stable SHA-256 over JSON-serializable parts (dict keys sorted).
+    """
+    raw = json.dumps(parts, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha256(raw.encode()).hexdigest()
+
+
+class ResponseCache:
+    """
+    Small SQLite-backed key/value cache with TTL and least-recently-used eviction.
+    WAL mode lets several uvicorn workers (or serverless invocations on one host) read
+    and write the same file concurrently. Each namespace is evicted independently.
+    """
+    def __init__(
+        self,
+        namespace: str,
+        path: Optional[str] = None,
+        ttl_seconds: float = CACHE_TTL_SECONDS,
+        max_entries: int = CACHE_MAX_ENTRIES
+    ):
+        self.namespace = namespace
+        self.path = path or CACHE_PATH
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._lock = threading.Lock()
+        self._conn = None
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._conn is None:
+            conn = sqlite3.connect(self.path, timeout=5, check_same_thread=False, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS cache ("
+                " namespace TEXT NOT NULL, key TEXT NOT NULL, value TEXT NOT NULL,"
+                " created_at REAL NOT NULL, accessed_at REAL NOT NULL,"
+                " PRIMARY KEY (namespace, key))"
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS cache_lru_idx ON cache (namespace, accessed_at)")
+            self._conn = conn
+        return self._conn
+
+    def get(self, key: str) -> Optional[str]:
+        now = time.time()
+        try:
+            with self._lock:
+                conn = self._connect()
+                row = conn.execute(
+                    "SELECT value, created_at FROM cache WHERE namespace = ? AND key = ?",
+                    (self.namespace, key)
+                ).fetchone()
+                if row is not None and now - row[1] > self.ttl_seconds:
+                    conn.execute("DELETE FROM cache WHERE namespace = ? AND key = ?", (self.namespace, key))
+                    row = None
+                if row is None:
+                    self.misses += 1
+                    return None
+                conn.execute(
+                    "UPDATE cache SET accessed_at = ? WHERE namespace = ? AND key = ?",
+                    (now, self.namespace, key)
+                )
+                self.hits += 1
+                return row[0]
+        except sqlite3.Error as e:
+            # A broken cache must never break a recommendation
+            logger.warning(f"Cache read failed ({self.namespace}): {e}")
+            self.misses += 1
+            return None
+
+    def set(self, key: str, value: str) -> None:
+        now = time.time()
+        try:
+            with self._lock:
+                conn = self._connect()
+                conn.execute(
+                    "INSERT OR REPLACE INTO cache (namespace, key, value, created_at, accessed_at) VALUES (?, ?, ?, ?, ?)",
+                    (self.namespace, key, value, now, now)
+                )
+                size = conn.execute("SELECT count(*) FROM cache WHERE namespace = ?", (self.namespace,)).fetchone()[0]
+                if size > self.max_entries:
+                    evicted = conn.execute(
+                        "DELETE FROM cache WHERE rowid IN ("
+                        " SELECT rowid FROM cache WHERE namespace = ? ORDER BY accessed_at LIMIT ?)",
+                        (self.namespace, size - self.max_entries)
+                    ).rowcount
+                    self.evictions += evicted
+        except sqlite3.Error as e:
+            logger.warning(f"Cache write failed ({self.namespace}): {e}")
+
+    async def aget(self, key: str) -> Optional[str]:
+        """
+        get() on a worker thread: a busy SQLite file (5 s lock timeout) must not stall the event loop.
+        """
+        return await asyncio.to_thread(self.get, key)
+
+    async def aset(self, key: str, value: str) -> None:
+        await asyncio.to_thread(self.set, key, value)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._connect().execute("DELETE FROM cache WHERE namespace = ?", (self.namespace,))
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        try:
+            with self._lock:
+                size = self._connect().execute(
+                    "SELECT count(*) FROM cache WHERE namespace = ?", (self.namespace,)
+                ).fetchone()[0]
+        except sqlite3.Error:
+            size = None
+        return {
+            "namespace": self.namespace,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            "entries": size,
+            "max_entries": self.max_entries,
+            "ttl_seconds": self.ttl_seconds,
+        }
@@ -0,0 +1,49 @@
+import asyncio
+import logging
+from typing import Awaitable, Callable, Hashable
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+class SingleFlight:
+    """
+    In-process request coalescing: concurrent calls with the same key await one shared task
+    instead of each doing the work. The task is detached from its first caller, so a client
+    disconnecting does not cancel the result the others are waiting for.
+    """
+    def __init__(self, name: str):
+        self.name = name
+        self.inflight = {}
+        self.calls = 0
+        self.executions = 0
+
+    async def do(self, key: Hashable, fn: Callable[..., Awaitable], *args, **kwargs) -> tuple:
+        """
+        Returns (result, shared); shared is True when another caller's in-flight task was reused.
+        """
+        self.calls += 1
+        task = self.inflight.get(key)
+        shared = task is not None
+        if not shared:
+            self.executions += 1
+            task = asyncio.ensure_future(fn(*args, **kwargs))
+            self.inflight[key] = task
+            task.add_done_callback(lambda done: self._forget(key, done))
+        return await asyncio.shield(task), shared
+
+    def _forget(self, key: Hashable, task: asyncio.Future) -> None:
+        if self.inflight.get(key) is task:
+            del self.inflight[key]
+        if not task.cancelled() and task.exception() is not None:
+            logger.warning(f"{self.name} flight failed for all waiters: {task.exception()}")
+
+    def stats(self) -> dict:
+        collapsed = self.calls - self.executions
+        return {
+            "calls": self.calls,
+            "executions": self.executions,
+            "collapsed": collapsed,
+            "collapsed_share": round(collapsed / self.calls, 4) if self.calls else 0.0,
+            "in_flight": len(self.inflight),
+        }
@@ -0,0 +1,114 @@
+import json
+import asyncio
+import httpx
+import pytest
+import pandas as pd
+from groq import AsyncGroq
+import fake_groq
+import llm_recommender
+from blurbs import BlurbStore, RateLimitGate, enrich_blurbs, blurb_key, _parse_duration
+from json_stream import RecommendationStreamParser
+from response_cache import ResponseCache
+
+frame = pd.DataFrame({
+    'name': [f'Place {i}' for i in range(20)],
+    'address': [f'{i} Main Road' for i in range(20)],
+    'location': ['BTM'] * 20,
+    'cuisines': ['Chinese, Thai'] * 20,
+    'rate': ['4.1/5'] * 20,
+    'approx_cost(for two people)': ['400'] * 20,
+})
+
+def fake_client():
+    transport = httpx.ASGITransport(app=fake_groq.app)
+    return AsyncGroq(api_key="test", base_url="http://fake-groq", http_client=httpx.AsyncClient(transport=transport))
+
+@pytest.fixture
+def store(tmp_path):
+    fake_groq.configure(first_token_delay=0, token_delay=0, rate_limit_every=0)
+    yield BlurbStore(str(tmp_path / "blurbs.sqlite3"))
+    fake_groq.configure(first_token_delay=0, token_delay=0, rate_limit_every=0)
+
+def test_enrichment_stores_one_blurb_per_restaurant(store):
+    stats = asyncio.run(enrich_blurbs(frame, store, fake_client(), batch_size=8))
+    assert stats["stored"] == 20 and stats["failed"] == 0
+    blurbs = store.for_frame(frame)
+    assert blurbs[3] == "Place 3 in BTM serves Chinese, Thai at about ₹400 for two."
+
+def test_enrichment_resumes_from_checkpoint(store):
+    asyncio.run(enrich_blurbs(frame, store, fake_client(), limit=8))
+    assert store.count() == 8
+    fake_groq.configure(first_token_delay=0)
+    stats = asyncio.run(enrich_blurbs(frame, store, fake_client()))
+    assert stats["stored"] == 12
+    # Only the missing restaurants were sent: 12 rows in batches of 8
+    assert fake_groq.STATE["requests"] == 2
+
+def test_concurrency_is_bounded(store):
+    fake_groq.configure(first_token_delay=0.05)
+    asyncio.run(enrich_blurbs(frame, store, fake_client(), batch_size=2, concurrency=3))
+    assert fake_groq.STATE["max_in_flight"] == 3
+    assert store.count() == 20
+
+def test_rate_limited_batches_are_retried(store):
+    fake_groq.configure(rate_limit_every=2, retry_after=0.01)
+    stats = asyncio.run(enrich_blurbs(frame, store, fake_client(), batch_size=4, concurrency=2))
+    assert stats["stored"] == 20
+    assert stats["rate_limit_pauses"] >= 2
+
+def test_rate_limit_headers_pause_all_workers():
+    gate = RateLimitGate()
+    gate.observe({"x-ratelimit-remaining-requests": "0", "x-ratelimit-reset-requests": "2m0.5s"})
+    assert gate.pauses == 1
+    gate.observe({"x-ratelimit-remaining-tokens": "100", "x-ratelimit-reset-tokens": "1s"}, needed_tokens=500)
+    assert gate.pauses == 2
+    assert _parse_duration("2m59.56s") == pytest.approx(179.56)
+    assert _parse_duration("120ms") == pytest.approx(0.12)
+    assert _parse_duration("3") == 3
+
+def test_recommendation_is_assembled_from_stored_blurbs(store, tmp_path, monkeypatch):
+    page = frame.head(3)
+    store.save_many([(blurb_key(n, a), n, a, f"Blurb for {n}.") for n, a in zip(page['name'], page['address'])], "test")
+    monkeypatch.setattr(llm_recommender, "blurb_store", store)
+    monkeypatch.setattr(llm_recommender, "async_client", None)
+    monkeypatch.setattr(llm_recommender, "recommendation_cache", ResponseCache("recommendation", str(tmp_path / "c.sqlite3")))
+
+    result = json.loads(asyncio.run(llm_recommender.get_llm_recommendation_async(page, {"location": "BTM"})))
+    assert [r["aiReason"] for r in result["restaurants"]] == ["Blurb for Place 0.", "Blurb for Place 1.", "Blurb for Place 2."]
+    assert result["restaurants"][0]["rating"] == 4.1
+    assert "Place 0" in result["summary"]
+
+    # A page with any restaurant lacking a blurb falls back to full generation
+    assert store.for_frame(frame.head(4)) is None
+
+def test_summary_only_call_is_small(store, tmp_path, monkeypatch):
+    page = frame.head(2)
+    store.save_many([(blurb_key(n, a), n, a, "Stored.") for n, a in zip(page['name'], page['address'])], "test")
+    monkeypatch.setattr(llm_recommender, "blurb_store", store)
+    monkeypatch.setattr(llm_recommender, "async_client", fake_client())
+    monkeypatch.setattr(llm_recommender, "recommendation_cache", ResponseCache("recommendation", str(tmp_path / "c.sqlite3")))
+
+    async def run():
+        result = await llm_recommender.get_llm_recommendation_async(page, {"location": "BTM"})
+        return result, llm_recommender.last_token_usage.get()
+
+    result, usage = asyncio.run(run())
+    assert usage["max_tokens"] == llm_recommender.SUMMARY_MAX_TOKENS
+    assert [r["aiReason"] for r in json.loads(result)["restaurants"]] == ["Stored.", "Stored."]
+
+def test_stream_sends_stored_blurbs_before_the_summary(store, tmp_path, monkeypatch):
+    page = frame.head(2)
+    store.save_many([(blurb_key(n, a), n, a, "Stored.") for n, a in zip(page['name'], page['address'])], "test")
+    monkeypatch.setattr(llm_recommender, "blurb_store", store)
+    monkeypatch.setattr(llm_recommender, "BLURB_SUMMARY", "template")
+    monkeypatch.setattr(llm_recommender, "recommendation_cache", ResponseCache("recommendation", str(tmp_path / "c.sqlite3")))
+
+    async def collect():
+        parser = RecommendationStreamParser()
+        events = []
+        async for delta in llm_recommender.stream_llm_recommendation_async(page, {"location": "BTM"}):
+            events += parser.feed(delta)
+        return events
+
+    kinds = [kind for kind, _ in asyncio.run(collect())]
+    assert kinds == ["restaurant", "restaurant", "summary"]
@@ -0,0 +1,56 @@
+import pytest
+from gazetteer import Gazetteer
+
+@pytest.fixture
+def gazetteer():
+    return Gazetteer(
+        ['Indiranagar', 'BTM', 'Koramangala 5th Block', 'Electronic City'],
+        ['Burger', 'North Indian', 'Chinese', 'Momos', 'Cafe', 'Pizza']
+    )
+
+def test_structured_query_resolves_locally(gazetteer):
+    assert gazetteer.parse("burger in indiranagar under 500 above 4 stars") == {
+        'location': 'Indiranagar', 'cuisine': 'Burger', 'max_price': 500, 'min_rating': 4.0, 'max_rating': None
+    }
+
+def test_longest_multiword_match_and_plurals(gazetteer):
+    parsed = gazetteer.parse("north indian and chinese burgers in koramangala 5th block")
+    assert parsed['location'] == 'Koramangala 5th Block'
+    assert parsed['cuisine'] == 'North Indian, Chinese, Burger'
+
+@pytest.mark.parametrize("query, field, value", [
+    ("pizza under rs 300", "max_price", 300),
+    ("pizza less than 1.5k", "max_price", 1500),
+    ("pizza up to ₹800", "max_price", 800),
+    ("pizza 4+ stars", "min_rating", 4.0),
+    ("pizza 4 stars and above", "min_rating", 4.0),
+    ("pizza at least 4.2 rating", "min_rating", 4.2),
+    ("pizza under 4 stars", "max_rating", 4.0),
+    ("pizza above 3.5", "min_rating", 3.5),
+])
+def test_price_and_rating_patterns(gazetteer, query, field, value):
+    assert gazetteer.parse(query)[field] == value
+
+@pytest.mark.parametrize("query", [
+    "something cozy for a date",
+    "cheap chinese in btm",
+    "pizza in koramangala",          # partial location name
+    "pizza in btm or indiranagar",   # two locations
+    "pizza above 500",               # minimum price is not a filter
+])
+def test_unresolved_queries_defer_to_llm(gazetteer, query):
+    assert gazetteer.parse(query) is None
+
+def test_stats_report_local_share(gazetteer):
+    gazetteer.parse("momos in btm")
+    gazetteer.parse("momos in btm")
+    gazetteer.parse("romantic dinner")
+    stats = gazetteer.stats()
+    assert (stats['local'], stats['llm_fallback']) == (2, 1)
+    assert stats['local_share'] == pytest.approx(0.6667)
+
+def test_leftover_keeps_only_the_words_no_filter_covers(gazetteer):
+    assert gazetteer.leftover("craft beer in indiranagar under 800 rupees") == "craft beer"
+    assert gazetteer.leftover("best chinese above 4 stars") == ""
+    # Names the LLM resolved that the vocabulary doesn't know yet are covered too
+    assert gazetteer.leftover("rooftop in whitefeild", {"location": "whitefeild", "semantic_query": "rooftop"}) == "rooftop"
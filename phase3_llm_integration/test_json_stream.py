@@ -0,0 +1,60 @@
+import json
+import asyncio
+import httpx
+import pytest
+import pandas as pd
+from groq import AsyncGroq
+import fake_groq
+import llm_recommender
+from json_stream import RecommendationStreamParser
+from response_cache import ResponseCache
+
+DOCUMENT = json.dumps({
+    "summary": "Two \"great\" picks, one with a {brace}.",
+    "restaurants": [
+        {"id": 1, "name": "Wok Express", "cuisines": "Chinese, Thai", "aiReason": "Fast [and] cheap."},
+        {"id": 2, "name": "Third Wave", "tags": ["cafe", {"x": 1}], "aiReason": "Great coffee \\ cake."}
+    ]
+})
+
+@pytest.mark.parametrize("chunk_size", [1, 7, len(DOCUMENT)])
+def test_events_are_emitted_as_values_close(chunk_size):
+    parser = RecommendationStreamParser()
+    events = []
+    for start in range(0, len(DOCUMENT), chunk_size):
+        events += parser.feed(DOCUMENT[start:start + chunk_size])
+    expected = json.loads(DOCUMENT)
+    assert events == [
+        ("summary", expected["summary"]),
+        ("restaurant", expected["restaurants"][0]),
+        ("restaurant", expected["restaurants"][1]),
+    ]
+
+def test_restaurant_is_emitted_before_the_document_ends():
+    parser = RecommendationStreamParser()
+    cut = DOCUMENT.index('{"id": 2')
+    events = parser.feed(DOCUMENT[:cut])
+    assert [kind for kind, _ in events] == ["summary", "restaurant"]
+
+def fake_async_client():
+    transport = httpx.ASGITransport(app=fake_groq.app)
+    return AsyncGroq(api_key="test", base_url="http://fake-groq", http_client=httpx.AsyncClient(transport=transport))
+
+def test_streamed_recommendation_from_fake_groq(tmp_path, monkeypatch):
+    monkeypatch.setattr(llm_recommender, "async_client", fake_async_client())
+    monkeypatch.setattr(llm_recommender, "recommendation_cache", ResponseCache("recommendation", str(tmp_path / "c.sqlite3")))
+    df = pd.DataFrame({
+        'id': [1, 2], 'name': ['Wok Express', 'Third Wave'], 'rate': ['4.1/5', '4.5/5'], 'location': ['BTM', 'BTM'],
+        'cuisines': ['Chinese, Thai', 'Cafe'], 'approx_cost(for two people)': [400, 600], 'address': ['1 Road', '2 Road']
+    })
+
+    async def collect():
+        return [delta async for delta in llm_recommender.stream_llm_recommendation_async(df, {"location": "BTM"})]
+
+    deltas = asyncio.run(collect())
+    assert len(deltas) > 1
+    parsed = json.loads("".join(deltas))
+    assert [r["name"] for r in parsed["restaurants"]] == ['Wok Express', 'Third Wave']
+
+    # The assembled stream is cached, so a replay is a single chunk
+    assert asyncio.run(collect()) == ["".join(deltas)]
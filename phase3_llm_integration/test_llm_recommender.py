@@ -1,6 +1,10 @@
+import json
+from types import SimpleNamespace
 import pytest
 import pandas as pd
-from llm_recommender import generate_recommendation_prompt
+import llm_recommender
+from llm_recommender import generate_recommendation_prompt, canonicalize_query
+from response_cache import ResponseCache
 
 @pytest.fixture
 def mock_df():
@@ -34,3 +38,59 @@ def test_prompt_generation_empty_data():
     assert "Nowhere" in prompt
     assert "Alien Food" in prompt
     assert "Unfortunately, no restaurants exactly matched" in prompt
+
+def test_canonicalize_query_collapses_case_whitespace_and_repeats():
+    doubled = "burger in indiranagar under 500 under 4 stars" * 3
+    assert canonicalize_query(doubled) == "burger in indiranagar under 500 under 4 stars"
+    assert canonicalize_query("  Burger   IN\tIndiranagar ") == "burger in indiranagar"
+    assert canonicalize_query("banana split in btm") == "banana split in btm"
+    assert canonicalize_query("Burger in HSR  burger in hsr burger IN hsr") == "burger in hsr"
+
+@pytest.mark.parametrize("query", [
+    "dum dum biryani in btm", "mangalore mangalorean thali", "bora bora bar", "chocolate chocolate cake",
+    "cafe cafe in hsr", "bora bora", "pizza in btm pizza", "a" * 499 + "b",
+])
+def test_canonicalize_query_keeps_repeated_words(query):
+    assert canonicalize_query(query) == query
+
+@pytest.fixture
+def fake_parser(tmp_path, monkeypatch):
+    replies = []
+    calls = []
+
+    def create(**kwargs):
+        calls.append(kwargs["messages"][-1]["content"])
+        reply = replies.pop(0)
+        if isinstance(reply, Exception):
+            raise reply
+        return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content=reply))])
+
+    monkeypatch.setattr(llm_recommender, "client", SimpleNamespace(chat=SimpleNamespace(completions=SimpleNamespace(create=create))))
+    monkeypatch.setattr(llm_recommender, "parse_cache", ResponseCache("parse", str(tmp_path / "parse.sqlite3")))
+    return SimpleNamespace(replies=replies, calls=calls)
+
+def test_equivalent_queries_share_one_parse(fake_parser):
+    fake_parser.replies.append(json.dumps({"location": "Indiranagar", "cuisine": "Burger"}))
+    first = llm_recommender.parse_search_query("Burger in Indiranagar")
+    first["location"] = None  # callers may edit the result
+    second = llm_recommender.parse_search_query("burger in indiranagarburger in  indiranagar")
+    assert second == {"location": "Indiranagar", "cuisine": "Burger"}
+    assert len(fake_parser.calls) == 1
+    assert "burger in indiranagar" in fake_parser.calls[0]
+    assert llm_recommender.parse_cache.stats()["hit_rate"] == 0.5
+
+def test_parse_failures_are_not_cached(fake_parser):
+    fake_parser.replies += [RuntimeError("rate limited"), "not json", json.dumps({"cuisine": "Cafe"})]
+    assert llm_recommender.parse_search_query("cafe") == {}
+    assert llm_recommender.parse_search_query("cafe") == {}
+    assert llm_recommender.parse_search_query("cafe") == {"cuisine": "Cafe"}
+    assert llm_recommender.parse_search_query("cafe") == {"cuisine": "Cafe"}
+    assert len(fake_parser.calls) == 3
+
+def test_parse_cache_survives_restart(fake_parser, tmp_path, monkeypatch):
+    fake_parser.replies.append(json.dumps({"cuisine": "Cafe"}))
+    llm_recommender.parse_search_query("cafe")
+    # A new cache object on the same file stands in for a restarted worker
+    monkeypatch.setattr(llm_recommender, "parse_cache", ResponseCache("parse", str(tmp_path / "parse.sqlite3")))
+    assert llm_recommender.parse_search_query("Cafe") == {"cuisine": "Cafe"}
+    assert len(fake_parser.calls) == 1
@@ -0,0 +1,80 @@
+import asyncio
+import httpx
+import pytest
+import pandas as pd
+from groq import AsyncGroq
+import fake_groq
+import llm_recommender
+from prompt_builder import (
+    build_recommendation_prompt, render_restaurant_lines, completion_budget, estimate_tokens, MAX_COMPLETION_TOKENS
+)
+from response_cache import ResponseCache
+
+@pytest.fixture
+def df():
+    return pd.DataFrame({
+        'name': ['ECHOES Koramangala', 'Pin Me Down'],
+        'rate': ['4.7/5', None],
+        'location': ['Koramangala 5th Block', 'BTM'],
+        'cuisines': ['Chinese, American, Continental, Italian, North Indian', 'Continental, Mexican'],
+        'approx_cost(for two people)': ['1,200', '800'],
+        'address': ['No. 40, 1st Floor, Hosur Road, Koramangala 5th Block, Bangalore', '2nd Stage, BTM']
+    })
+
+def test_rows_render_in_one_pass(df):
+    lines = render_restaurant_lines(df).split("\n")
+    assert lines[0] == (
+        "1. ECHOES Koramangala | 4.7⭐ | ₹1200 | Koramangala 5th Block | "
+        "Chinese, American, Continental, Italian, North Indian | No. 40, 1st Floor, Hosur Road, Koramangala 5th Block, Bangalore"
+    )
+    assert lines[1].startswith("2. Pin Me Down | N/A⭐ | ₹800 |")
+
+def test_trimmed_rendering(df):
+    line = render_restaurant_lines(df, address_chars=10, max_cuisines=2).split("\n")[0]
+    assert line.endswith("| Chinese, American | No. 40, 1s…")
+    assert "Hosur" not in render_restaurant_lines(df, address_chars=0)
+
+def test_records_render_like_frames(df):
+    from records import Restaurant
+    records = [
+        Restaurant(name='ECHOES Koramangala', rating=4.7, cost=1200.0, location='Koramangala 5th Block',
+                   cuisines='Chinese, American, Continental, Italian, North Indian',
+                   address='No. 40, 1st Floor, Hosur Road, Koramangala 5th Block, Bangalore'),
+        Restaurant(name='Pin Me Down', cost=800.0, location='BTM', cuisines='Continental, Mexican', address='2nd Stage, BTM'),
+    ]
+    assert render_restaurant_lines(records) == render_restaurant_lines(df)
+    assert build_recommendation_prompt(records, {"location": "BTM"}) == build_recommendation_prompt(df, {"location": "BTM"})
+
+def test_budget_trims_fields_before_overflowing(df):
+    full_prompt, full_tokens = build_recommendation_prompt(df, {"location": "BTM"}, token_budget=10_000)
+    assert "Hosur Road" in full_prompt
+
+    trimmed_prompt, trimmed_tokens = build_recommendation_prompt(df, {"location": "BTM"}, token_budget=full_tokens - 5)
+    assert trimmed_tokens <= full_tokens - 5
+    assert "ECHOES Koramangala" in trimmed_prompt and "Pin Me Down" in trimmed_prompt
+
+def test_estimate_tracks_length():
+    assert estimate_tokens("") == 0
+    assert 8 <= estimate_tokens("Recommend these specific restaurants for the user, please.") <= 14
+
+def test_completion_budget_scales_with_restaurants():
+    assert completion_budget(1) < completion_budget(5) < completion_budget(10)
+    assert completion_budget(100) == MAX_COMPLETION_TOKENS
+
+def test_token_usage_is_reported_per_request(df, tmp_path, monkeypatch):
+    transport = httpx.ASGITransport(app=fake_groq.app)
+    client = AsyncGroq(api_key="test", base_url="http://fake-groq", http_client=httpx.AsyncClient(transport=transport))
+    monkeypatch.setattr(llm_recommender, "async_client", client)
+    monkeypatch.setattr(llm_recommender, "recommendation_cache", ResponseCache("recommendation", str(tmp_path / "c.sqlite3")))
+
+    async def run():
+        await llm_recommender.get_llm_recommendation_async(df, {"location": "BTM"})
+        first = llm_recommender.last_token_usage.get()
+        await llm_recommender.get_llm_recommendation_async(df, {"location": "BTM"})
+        return first, llm_recommender.last_token_usage.get()
+
+    first, second = asyncio.run(run())
+    assert first["max_tokens"] == completion_budget(2)
+    assert first["completion_tokens"] > 0 and first["prompt_tokens"] >= 0
+    assert not first["cached"]
+    assert second == {"prompt_tokens": 0, "completion_tokens": 0, "estimated_prompt_tokens": 0, "max_tokens": 0, "cached": True}
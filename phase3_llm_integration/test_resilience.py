@@ -0,0 +1,164 @@
+import json
+import time
+import asyncio
+from types import SimpleNamespace
+import httpx
+import pytest
+import pandas as pd
+from groq import AsyncGroq
+import fake_groq
+import resilience
+import llm_recommender
+from resilience import CircuitBreaker, CircuitOpenError, LatencyTracker, resilient_call, start_deadline
+from response_cache import ResponseCache
+from blurbs import BlurbStore
+
+frame = pd.DataFrame({
+    'id': [1, 2], 'name': ['Wok Express', 'Third Wave'], 'rate': ['4.1/5', '4.5/5'], 'location': ['BTM', 'BTM'],
+    'cuisines': ['Chinese', 'Cafe'], 'approx_cost(for two people)': [400, 600], 'address': ['1 Road', '2 Road']
+})
+
+@pytest.fixture(autouse=True)
+def fresh_state(monkeypatch):
+    monkeypatch.setattr(resilience, "groq_breaker", CircuitBreaker("test", failure_threshold=3, reset_seconds=0.2))
+    monkeypatch.setattr(resilience, "parse_breaker", CircuitBreaker("parse", failure_threshold=3, reset_seconds=0.2))
+    for kind in resilience.LATENCY:
+        monkeypatch.setitem(resilience.LATENCY, kind, LatencyTracker(kind))
+    monkeypatch.setattr(resilience, "HEDGES", {"launched": 0, "won": 0})
+
+@pytest.fixture
+def stalled_groq(tmp_path, monkeypatch):
+    transport = httpx.ASGITransport(app=fake_groq.app)
+    client = AsyncGroq(api_key="test", base_url="http://fake-groq", http_client=httpx.AsyncClient(transport=transport))
+    monkeypatch.setattr(llm_recommender, "async_client", client)
+    monkeypatch.setattr(llm_recommender, "recommendation_cache", ResponseCache("recommendation", str(tmp_path / "c.sqlite3")))
+    monkeypatch.setattr(llm_recommender, "blurb_store", BlurbStore(str(tmp_path / "blurbs.sqlite3")))
+    monkeypatch.setitem(fake_groq.SETTINGS, "first_token_delay", 2.0)
+
+def test_breaker_opens_then_recovers_through_a_trial_call():
+    breaker = CircuitBreaker("test", failure_threshold=2, reset_seconds=0.05)
+    breaker.record_failure()
+    assert breaker.allow()
+    breaker.record_failure()
+    assert breaker.state == "open" and not breaker.allow()
+
+    time.sleep(0.06)
+    assert breaker.allow()          # the single half-open trial
+    assert not breaker.allow()
+    breaker.record_success()
+    assert breaker.state == "closed" and breaker.allow()
+
+def test_slow_call_is_hedged_once_p95_is_known():
+    for _ in range(resilience.HEDGE_MIN_SAMPLES):
+        resilience.LATENCY["recommend"].observe(0.02)
+    delays = iter([1.0, 0.01])
+
+    async def call():
+        delay = next(delays)
+        await asyncio.sleep(delay)
+        return delay
+
+    start = time.perf_counter()
+    assert asyncio.run(resilient_call(call, "recommend", timeout=2.0)) == 0.01
+    assert time.perf_counter() - start < 0.5
+    assert resilience.HEDGES == {"launched": 1, "won": 1}
+
+def test_deadline_raises_and_counts_as_failure():
+    async def stall():
+        await asyncio.sleep(1)
+
+    for _ in range(3):
+        with pytest.raises(asyncio.TimeoutError):
+            asyncio.run(resilient_call(stall, "parse", timeout=0.02))
+    with pytest.raises(CircuitOpenError):
+        asyncio.run(resilient_call(stall, "parse", timeout=0.02))
+
+def test_spent_deadline_does_not_take_the_half_open_trial():
+    breaker = CircuitBreaker("test", failure_threshold=1, reset_seconds=0.05)
+    breaker.record_failure()
+    time.sleep(0.06)
+
+    async def ok():
+        return "ok"
+
+    with pytest.raises(asyncio.TimeoutError):
+        asyncio.run(resilient_call(ok, "recommend", timeout=0, breaker=breaker))
+    assert breaker.state == "half_open" and not breaker.trial_in_flight
+    assert asyncio.run(resilient_call(ok, "recommend", timeout=1.0, breaker=breaker)) == "ok"
+    assert breaker.state == "closed"
+
+def test_slow_parses_do_not_open_the_recommendation_circuit(stalled_groq, tmp_path, monkeypatch):
+    monkeypatch.setattr(llm_recommender, "PARSE_TIMEOUT_SECONDS", 0.05)
+    monkeypatch.setattr(llm_recommender, "parse_cache", ResponseCache("parse", str(tmp_path / "p.sqlite3")))
+    for i in range(3):
+        assert asyncio.run(llm_recommender.parse_search_query_async(f"cafes {i}")) == {}
+    assert resilience.parse_breaker.state == "open"
+    assert resilience.groq_breaker.state == "closed"
+
+def test_stalled_groq_gets_templated_response_within_budget(stalled_groq):
+    async def run():
+        start_deadline(0.3)
+        return await llm_recommender.get_llm_recommendation_async(frame, {"location": "BTM"})
+
+    start = time.perf_counter()
+    result = json.loads(asyncio.run(run()))
+    assert time.perf_counter() - start < 1.0
+    assert [r["name"] for r in result["restaurants"]] == ['Wok Express', 'Third Wave']
+    assert result["restaurants"][1]["aiReason"] == "Third Wave serves Cafe, is rated 4.5⭐ and costs about ₹600 for two."
+    assert "Wok Express" in result["summary"]
+    # Fallbacks are not cached
+    assert llm_recommender.recommendation_cache.stats()["entries"] == 0
+
+def test_stalled_stream_falls_back_to_template(stalled_groq):
+    async def collect():
+        start_deadline(0.3)
+        return "".join([d async for d in llm_recommender.stream_llm_recommendation_async(frame, {"location": "BTM"})])
+
+    result = json.loads(asyncio.run(collect()))
+    assert len(result["restaurants"]) == 2
+
+def test_open_circuit_skips_groq(stalled_groq, monkeypatch):
+    resilience.groq_breaker.opened_at = time.monotonic()
+    start = time.perf_counter()
+    result = json.loads(asyncio.run(llm_recommender.get_llm_recommendation_async(frame, {})))
+    assert time.perf_counter() - start < 0.2
+    assert len(result["restaurants"]) == 2
+    assert resilience.groq_breaker.rejected == 1
+
+def test_missing_client_still_returns_the_retrieved_rows(stalled_groq, monkeypatch):
+    monkeypatch.setattr(llm_recommender, "client", None)
+    monkeypatch.setattr(llm_recommender, "async_client", None)
+
+    async def collect():
+        return "".join([d async for d in llm_recommender.stream_llm_recommendation_async(frame, {"location": "BTM"})])
+
+    for content in (
+        llm_recommender.get_llm_recommendation(frame, {"location": "BTM"}),
+        asyncio.run(llm_recommender.get_llm_recommendation_async(frame, {"location": "BTM"})),
+        asyncio.run(collect()),
+    ):
+        assert [r["name"] for r in json.loads(content)["restaurants"]] == ['Wok Express', 'Third Wave']
+
+class StallingStream:
+    """Sends one delta, then stops producing chunks."""
+    async def __aiter__(self):
+        yield SimpleNamespace(choices=[SimpleNamespace(delta=SimpleNamespace(content='{"summary": '))])
+        await asyncio.sleep(10)
+
+    async def close(self):
+        pass
+
+def test_stream_stalling_midway_counts_against_the_circuit(stalled_groq, monkeypatch):
+    async def create(**kwargs):
+        return StallingStream()
+
+    client = SimpleNamespace(chat=SimpleNamespace(completions=SimpleNamespace(create=create)))
+    monkeypatch.setattr(llm_recommender, "async_client", client)
+
+    async def collect():
+        start_deadline(0.3)
+        return [d async for d in llm_recommender.stream_llm_recommendation_async(frame, {"location": "BTM"})]
+
+    with pytest.raises(asyncio.TimeoutError):
+        asyncio.run(collect())
+    assert resilience.groq_breaker.failures == 1
@@ -0,0 +1,48 @@
+import time
+import pytest
+from resolver import Resolver, edit_distance
+
+@pytest.fixture
+def resolver():
+    return Resolver(
+        {'Koramangala 5th Block': 2500, 'Koramangala 6th Block': 1800, 'Koramangala 7th Block': 900,
+         'Indiranagar': 2000, 'BTM': 3000, 'Electronic City': 700, 'JP Nagar': 900, 'Jayanagar': 800},
+        {'North Indian': 9000, 'Chinese': 5000, 'Biryani': 3000, 'Burger': 800, 'Cafe': 1500}
+    )
+
+def test_edit_distance_stops_at_limit():
+    assert edit_distance("chineese", "chinese", 2) == 1
+    assert edit_distance("atlantis", "indiranagar", 2) == 3
+
+@pytest.mark.parametrize("text, expected", [
+    ("indiranagar", "Indiranagar"),
+    ("Indira nagar", "Indiranagar"),
+    ("indranagar", "Indiranagar"),
+    ("koramangala 5th", "Koramangala 5th Block"),
+    ("Koramangala", "Koramangala"),     # every block, through the substring match
+    ("koramangla", "Koramangala"),
+    ("btm layout", "BTM"),
+    ("Atlantis", None),
+])
+def test_locations_resolve_despite_typos_and_partial_names(resolver, text, expected):
+    assert resolver.resolve(text, "location") == expected
+
+def test_cuisines_resolve_separately(resolver):
+    assert resolver.resolve("chineese", "cuisine") == "Chinese"
+    assert resolver.resolve("chineese", "location") is None
+
+def test_suggestions_rank_prefixes_by_popularity(resolver):
+    names = [s["name"] for s in resolver.suggest("kora")]
+    assert names == ['Koramangala 5th Block', 'Koramangala 6th Block', 'Koramangala 7th Block']
+    # Any word may start the match, but name starts rank first
+    assert [s["name"] for s in resolver.suggest("nagar", kind="location")] == ['JP Nagar']
+    assert [s["name"] for s in resolver.suggest("6th bl")] == ['Koramangala 6th Block']
+    assert resolver.suggest("biriyani")[0] == {"name": "Biryani", "kind": "cuisine", "restaurants": 3000}
+    assert resolver.suggest("") == []
+
+def test_suggest_takes_microseconds(resolver):
+    start = time.perf_counter()
+    for _ in range(1000):
+        resolver.suggest("ko", kind="location")
+    assert (time.perf_counter() - start) / 1000 < 0.001
+    assert resolver.stats()["lookups"] == 1000
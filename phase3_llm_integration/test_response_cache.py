@@ -0,0 +1,88 @@
+import time
+import asyncio
+import pytest
+import pandas as pd
+from types import SimpleNamespace
+from response_cache import ResponseCache, make_key
+import llm_recommender
+
+@pytest.fixture
+def cache_path(tmp_path):
+    return str(tmp_path / "cache.sqlite3")
+
+def test_round_trip_and_counters(cache_path):
+    cache = ResponseCache("test", cache_path)
+    assert cache.get("a") is None
+    cache.set("a", '{"x": 1}')
+    assert cache.get("a") == '{"x": 1}'
+    stats = cache.stats()
+    assert (stats["hits"], stats["misses"], stats["entries"]) == (1, 1, 1)
+
+def test_entries_are_shared_between_instances(cache_path):
+    # Two instances on one file behave like two workers on one host
+    ResponseCache("test", cache_path).set("k", "v")
+    assert ResponseCache("test", cache_path).get("k") == "v"
+    assert ResponseCache("other", cache_path).get("k") is None
+
+def test_async_access_leaves_the_event_loop_free(cache_path):
+    cache = ResponseCache("test", cache_path)
+    cache.set("k", "v")
+
+    async def run():
+        # Another worker holding the cache: the lookup waits on its thread, other requests keep going
+        with cache._lock:
+            lookup = asyncio.create_task(cache.aget("k"))
+            await asyncio.sleep(0.05)
+            assert not lookup.done()
+        await cache.aset("k2", "w")
+        return await lookup
+
+    assert asyncio.run(run()) == "v"
+    assert cache.get("k2") == "w"
+
+def test_expired_entries_miss(cache_path):
+    cache = ResponseCache("test", cache_path, ttl_seconds=0.01)
+    cache.set("k", "v")
+    time.sleep(0.05)
+    assert cache.get("k") is None
+    assert cache.stats()["entries"] == 0
+
+def test_lru_eviction_keeps_recently_read_entries(cache_path):
+    cache = ResponseCache("test", cache_path, max_entries=2)
+    cache.set("old", "1")
+    time.sleep(0.01)
+    cache.set("recent", "2")
+    time.sleep(0.01)
+    cache.get("old")
+    cache.set("new", "3")
+    assert cache.get("recent") is None
+    assert cache.get("old") == "1"
+    assert cache.get("new") == "3"
+    assert cache.stats()["evictions"] == 1
+
+def test_make_key_ignores_dict_order():
+    assert make_key("m", {"a": 1, "b": 2}) == make_key("m", {"b": 2, "a": 1})
+
+@pytest.fixture
+def fake_groq(cache_path, monkeypatch):
+    calls = []
+
+    def create(**kwargs):
+        calls.append(kwargs)
+        return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content='{"restaurants": []}'))])
+
+    monkeypatch.setattr(llm_recommender, "client", SimpleNamespace(chat=SimpleNamespace(completions=SimpleNamespace(create=create))))
+    monkeypatch.setattr(llm_recommender, "recommendation_cache", ResponseCache("recommendation", cache_path))
+    return calls
+
+def test_recommendation_is_served_from_cache(fake_groq):
+    df = pd.DataFrame({'id': [3, 1], 'name': ['B', 'A'], 'rate': [4.1, 4.5]})
+    first = llm_recommender.get_llm_recommendation(df, {"location": "BTM ", "cuisine": None, "max_price": 500})
+    # Same rows in another order and equivalent preferences hit the same entry
+    second = llm_recommender.get_llm_recommendation(df.iloc[::-1], {"location": "btm", "max_price": 500.0})
+    assert first == second
+    assert len(fake_groq) == 1
+    assert llm_recommender.recommendation_cache.stats()["hits"] == 1
+
+    llm_recommender.get_llm_recommendation(df.head(1), {"location": "btm", "max_price": 500.0})
+    assert len(fake_groq) == 2
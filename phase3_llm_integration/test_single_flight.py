@@ -0,0 +1,66 @@
+import asyncio
+import pytest
+from single_flight import SingleFlight
+
+def test_concurrent_duplicates_share_one_execution():
+    flight = SingleFlight("test")
+    calls = []
+
+    async def work(value):
+        calls.append(value)
+        await asyncio.sleep(0.05)
+        return value * 2
+
+    async def burst():
+        return await asyncio.gather(*[flight.do("k", work, 21) for _ in range(10)], flight.do("other", work, 1))
+
+    results = asyncio.run(burst())
+    assert [r for r, _ in results[:10]] == [42] * 10
+    assert sum(shared for _, shared in results[:10]) == 9
+    assert results[10] == (2, False)
+    assert calls == [21, 1]
+    assert flight.stats() == {"calls": 11, "executions": 2, "collapsed": 9, "collapsed_share": 0.8182, "in_flight": 0}
+
+def test_finished_flights_are_not_reused():
+    flight = SingleFlight("test")
+
+    async def work():
+        return object()
+
+    async def twice():
+        first, _ = await flight.do("k", work)
+        second, shared = await flight.do("k", work)
+        return first is second, shared
+
+    assert asyncio.run(twice()) == (False, False)
+
+def test_errors_reach_every_waiter():
+    flight = SingleFlight("test")
+
+    async def fail():
+        await asyncio.sleep(0.01)
+        raise RuntimeError("boom")
+
+    async def burst():
+        return await asyncio.gather(*[flight.do("k", fail) for _ in range(3)], return_exceptions=True)
+
+    results = asyncio.run(burst())
+    assert all(isinstance(r, RuntimeError) for r in results)
+    assert flight.stats()["executions"] == 1
+
+def test_cancelled_waiter_does_not_cancel_the_flight():
+    flight = SingleFlight("test")
+
+    async def work():
+        await asyncio.sleep(0.05)
+        return "done"
+
+    async def scenario():
+        leader = asyncio.ensure_future(flight.do("k", work))
+        await asyncio.sleep(0)
+        follower = asyncio.ensure_future(flight.do("k", work))
+        await asyncio.sleep(0.01)
+        leader.cancel()
+        return await follower
+
+    assert asyncio.run(scenario()) == ("done", True)
@@ -1,14 +1,21 @@
 import sys
 import os
+import json
+import time
+import asyncio
+import hashlib
 import logging
-import pandas as pd
+import importlib
+import threading
+from contextlib import asynccontextmanager
 from pydantic import BaseModel
 from typing import Optional, List
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, HTTPException, Request, Response, Depends
 from fastapi.middleware.cors import CORSMiddleware
-from sqlalchemy import create_engine, text
+from fastapi.responses import StreamingResponse, JSONResponse
 from dotenv import load_dotenv
 
+IMPORT_STARTED = time.perf_counter()
 load_dotenv()
 
 # Add previous phases to sys.path
@@ -17,15 +24,125 @@ sys.path.append(os.path.join(BASE_DIR, 'phase2_knowledge_base'))
 sys.path.append(os.path.join(BASE_DIR, 'phase3_llm_integration'))
 
 try:
-    from retrieval import retrieve_restaurants
-    from llm_recommender import get_llm_recommendation, parse_search_query
+    from json_stream import RecommendationStreamParser
+    from gazetteer import Gazetteer
+    from resolver import Resolver
+    from single_flight import SingleFlight
+    from resilience import start_deadline, request_deadline, resilience_stats
+    from records import split_cuisines, to_records
 except ImportError as e:
     logging.error(f"Import Error: {e}")
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-app = FastAPI(title="AI Restaurant Recommendation API", version="1.0")
+# SQLAlchemy and groq cost most of a cold start, so they load on first use (or during the
+# lifespan warmup) instead of at import: name -> (module, attribute or None for the module).
+# Requests work on Restaurant records; pandas only loads to build the facet catalog or memory index.
+LAZY_IMPORTS = {
+    "retrieval": ("retrieval", None),
+    "retrieve_restaurants_async": ("retrieval", "retrieve_restaurants_async"),
+    "encode_cursor": ("retrieval", "encode_cursor"),
+    "decode_cursor": ("retrieval", "decode_cursor"),
+    "MAX_PAGE_SIZE": ("retrieval", "MAX_PAGE_SIZE"),
+    "page_key": ("retrieval", "page_key"),
+    "get_llm_recommendation_async": ("llm_recommender", "get_llm_recommendation_async"),
+    "stream_llm_recommendation_async": ("llm_recommender", "stream_llm_recommendation_async"),
+    "parse_search_query_async": ("llm_recommender", "parse_search_query_async"),
+    "recommendation_cache": ("llm_recommender", "recommendation_cache"),
+    "parse_cache": ("llm_recommender", "parse_cache"),
+    "canonicalize_query": ("llm_recommender", "canonicalize_query"),
+    "last_token_usage": ("llm_recommender", "last_token_usage"),
+}
+
+def load_dependencies() -> None:
+    """
+    Imports the deferred names into this module (idempotent; names already set, e.g. patched, are kept).
+    """
+    for name, (module, attr) in LAZY_IMPORTS.items():
+        if name in globals():
+            continue
+        try:
+            imported = importlib.import_module(module)
+        except ImportError as e:
+            logger.error(f"Import Error: {e}")
+            continue
+        globals()[name] = getattr(imported, attr) if attr else imported
+
+def __getattr__(name):
+    # main.retrieval etc. from outside (tests, api/index.py) trigger the deferred imports
+    if name in LAZY_IMPORTS:
+        load_dependencies()
+        if name in globals():
+            return globals()[name]
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+async def ensure_dependencies():
+    if any(name not in globals() for name in LAZY_IMPORTS):
+        await asyncio.to_thread(load_dependencies)
+
+WARMUP_ON_STARTUP = os.getenv("WARMUP_ON_STARTUP", "1") == "1"
+WARMUP_TIMEOUT_SECONDS = float(os.getenv("WARMUP_TIMEOUT_SECONDS", "10"))
+# Cold-start timings in milliseconds, reported by /startup/stats
+STARTUP = {"import_ms": None, "warmup_ms": {}}
+# Set once the background warmup has finished or given up
+WARMED_UP = threading.Event()
+
+async def warm_database_pool():
+    if retrieval.RETRIEVAL_BACKEND == "memory" or not retrieval.DATABASE_URL:
+        return
+    from sqlalchemy import text
+    async with retrieval.get_async_engine().connect() as conn:
+        await conn.execute(text("SELECT 1"))
+
+async def warm_up() -> dict:
+    """
+    Loads the deferred modules, then opens the database pool and builds the facet catalog and the
+    location/cuisine vocabulary (gazetteer + resolver) concurrently. Failures are logged, not raised;
+    whatever did not warm up is built on first use as before.
+    """
+    timings = {}
+
+    async def timed(name, make_call):
+        start = time.perf_counter()
+        try:
+            await make_call()
+        except Exception as e:
+            logger.warning(f"Warmup step {name} failed: {e}")
+        timings[name] = round((time.perf_counter() - start) * 1000, 1)
+
+    start = time.perf_counter()
+    await timed("imports", ensure_dependencies)
+    await asyncio.gather(
+        timed("database_pool", warm_database_pool),
+        timed("facets", lambda: asyncio.to_thread(retrieval.get_facet_catalog)),
+        timed("vocabulary", lambda: asyncio.gather(get_gazetteer(), get_resolver())),
+    )
+    timings["total"] = round((time.perf_counter() - start) * 1000, 1)
+    return timings
+
+async def run_warmup():
+    try:
+        STARTUP["warmup_ms"] = await asyncio.wait_for(warm_up(), WARMUP_TIMEOUT_SECONDS)
+        logger.info(f"Warmed up in {STARTUP['warmup_ms']['total']} ms: {STARTUP['warmup_ms']}")
+    except asyncio.TimeoutError:
+        logger.warning(f"Warmup exceeded {WARMUP_TIMEOUT_SECONDS}s; finishing on first use")
+    finally:
+        WARMED_UP.set()
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Warmup runs in the background, so startup never waits on it (in Postgres mode the facet
+    # catalog is a full-table read); requests arriving first build what they need themselves
+    task = asyncio.create_task(run_warmup()) if WARMUP_ON_STARTUP else None
+    yield
+    if task is not None and not task.done():
+        task.cancel()
+
+app = FastAPI(
+    title="AI Restaurant Recommendation API", version="1.0",
+    lifespan=lifespan, dependencies=[Depends(ensure_dependencies)]
+)
 
 app.add_middleware(
     CORSMiddleware,
@@ -36,7 +153,6 @@ app.add_middleware(
 )
 
 DATABASE_URL = os.getenv("DATABASE_URL")
-engine = create_engine(DATABASE_URL) if DATABASE_URL else None
 
 class RecommendationRequest(BaseModel):
     search_query: Optional[str] = None
@@ -46,6 +162,8 @@ class RecommendationRequest(BaseModel):
     min_rating: Optional[float] = None
     max_rating: Optional[float] = None
     top_n: Optional[int] = 5
+    # Opaque token from a previous response's next_cursor; when set, the other fields are ignored
+    cursor: Optional[str] = None
 
 class RecommendationResponse(BaseModel):
     query: RecommendationRequest
@@ -53,114 +171,419 @@ class RecommendationResponse(BaseModel):
     recommendation_text: str
     parsed_filters: Optional[dict] = None
     error: Optional[str] = None
+    next_cursor: Optional[str] = None
+    # Prompt/completion token counts for this request's LLM call (zeros on a cache hit)
+    token_usage: Optional[dict] = None
+
+# Identical concurrent requests share one parse and one retrieval + LLM run
+parse_flight = SingleFlight("parse")
+recommend_flight = SingleFlight("recommend")
 
-VALID_LOCATIONS = None
+VOCABULARY = None
 
-def get_valid_locations():
-    global VALID_LOCATIONS
-    if VALID_LOCATIONS is None:
+async def get_vocabulary() -> tuple:
+    """
+    ({location: restaurant count}, {cuisine: restaurant count}) from the facet catalog, read once per process.
+    """
+    global VOCABULARY
+    if VOCABULARY is None:
+        # The first build scans the data; keep it off the event loop
+        catalog = (await asyncio.to_thread(retrieval.get_facet_catalog)).catalog
+        VOCABULARY = (
+            {entry["value"]: entry["count"] for entry in catalog["location"]},
+            {entry["value"]: entry["count"] for entry in catalog["cuisine"]},
+        )
+    return VOCABULARY
+
+GAZETTEER = None
+
+async def get_gazetteer() -> "Gazetteer":
+    """
+    Local parser over every known location and cuisine, built once per process.
+    """
+    global GAZETTEER
+    if GAZETTEER is None:
         try:
-            with engine.connect() as conn:
-                res = conn.execute(text("SELECT DISTINCT location FROM restaurants WHERE location IS NOT NULL"))
-                VALID_LOCATIONS = {row[0].lower() for row in res}
+            locations, cuisines = await get_vocabulary()
+            GAZETTEER = Gazetteer(locations, cuisines)
+            logger.info(f"Gazetteer ready with {len(locations)} locations and {len(cuisines)} cuisines")
         except Exception as e:
-            logger.error(f"Error loading valid locations: {e}")
-            return set()
-    return VALID_LOCATIONS
+            # Without a vocabulary only price/rating phrases resolve locally; retry on the next request
+            logger.error(f"Error loading gazetteer vocabulary: {e}")
+            return Gazetteer()
+    return GAZETTEER
+
+RESOLVER = None
+
+async def get_resolver() -> "Resolver":
+    """
+    Fuzzy location/cuisine lookup (parsed-filter validation and /suggest), built once per process.
+    """
+    global RESOLVER
+    if RESOLVER is None:
+        try:
+            locations, cuisines = await get_vocabulary()
+            RESOLVER = Resolver(locations, cuisines)
+        except Exception as e:
+            logger.error(f"Error loading resolver vocabulary: {e}")
+            return Resolver()
+    return RESOLVER
+
+def resolve_parsed_names(parsed_filters: dict, resolver: "Resolver") -> dict:
+    """
+    Maps LLM-parsed names onto the dataset's ("indira nagar" -> "Indiranagar"). Locations with no
+    close match are hallucinated and dropped; unknown cuisines stay as given for the substring match.
+    """
+    location = parsed_filters.get("location")
+    if location:
+        resolved = resolver.resolve(location, "location")
+        if resolved is None:
+            logger.warning(f"Ignoring hallucinated location: {location}")
+        elif resolved != location:
+            logger.info(f"Resolved location {location!r} to {resolved!r}")
+        parsed_filters["location"] = resolved
+
+    cuisine = parsed_filters.get("cuisine")
+    if cuisine:
+        names = [resolver.resolve(name, "cuisine") or name for name in split_cuisines(cuisine)]
+        parsed_filters["cuisine"] = ", ".join(names) if names else None
+    return parsed_filters
+
+async def parse_query(search_query: str) -> dict:
+    """
+    Structured queries resolve locally in microseconds; anything else goes to the Groq parser.
+    """
+    query = canonicalize_query(search_query)
+    gazetteer = await get_gazetteer()
+    local = gazetteer.parse(query)
+    if local is not None:
+        return local
+
+    parsed_filters = await parse_search_query_async(query)
+    # Free-form text ("cozy rooftop with live music") also ranks the results by meaning, when indexed
+    if retrieval.get_semantic_index() is not None:
+        parsed_filters = {**parsed_filters, "semantic_query": query}
+    # ...and by the words themselves ("craft beer") against names, dishes and reviews; only the words
+    # the structured filters don't already cover, so "in btm under 500" never skews the ranking
+    keywords = gazetteer.leftover(query, parsed_filters)
+    if keywords and retrieval.get_text_index() is not None:
+        parsed_filters = {**parsed_filters, "keyword_query": keywords}
+
+    # Validation: only locations that exist in our Bangalore dataset, typos and partial names included
+    return resolve_parsed_names(parsed_filters, await get_resolver())
+
+async def fetch_page(filters: dict, page_size: int, after: tuple = None):
+    """
+    Retrieves one page plus a lookahead row; returns (restaurant records, next_cursor).
+    """
+    matched = await retrieve_restaurants_async(
+        location=filters.get("location"),
+        cuisine=filters.get("cuisine"),
+        max_price=filters.get("max_price"),
+        min_rating=filters.get("min_rating"),
+        max_rating=filters.get("max_rating"),
+        top_n=page_size + 1,
+        after=after,
+        semantic_query=filters.get("semantic_query"),
+        keyword_query=filters.get("keyword_query"),
+        records=True
+    )
+    matched = to_records(matched)
+    if len(matched) <= page_size:
+        return matched, None
+    matched = matched[:page_size]
+    return matched, encode_cursor(filters, page_key(matched), page_size)
+
+def merge_filters(request: RecommendationRequest, parsed_filters: dict) -> dict:
+    """
+    Dropdown and parsed values combined: the stricter bound wins.
+    """
+    location = parsed_filters.get("location") or request.location
+    cuisine = parsed_filters.get("cuisine") or request.cuisine
+    
+    pricesResource = [v for v in [request.max_price, parsed_filters.get("max_price")] if v is not None]
+    max_price = min(pricesResource) if pricesResource else None
+
+    min_ratingsResource = [v for v in [request.min_rating, parsed_filters.get("min_rating")] if v is not None]
+    min_rating = max(min_ratingsResource) if min_ratingsResource else None
+
+    max_ratingsResource = [v for v in [request.max_rating, parsed_filters.get("max_rating")] if v is not None]
+    max_rating = min(max_ratingsResource) if max_ratingsResource else None
+
+    return {
+        "location": location,
+        "cuisine": cuisine,
+        "max_price": max_price,
+        "min_rating": min_rating,
+        "max_rating": max_rating,
+        "semantic_query": parsed_filters.get("semantic_query"),
+        "keyword_query": parsed_filters.get("keyword_query")
+    }
+
+async def resolve_request(request: RecommendationRequest):
+    """
+    Returns (filters, parsed_filters, after, page_size).
+    Later pages carry their resolved filters, so parsing and validation are skipped entirely.
+    """
+    if request.cursor:
+        try:
+            filters, after, page_size = decode_cursor(request.cursor)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        return filters, {}, after, page_size
 
-@app.post("/recommend", response_model=RecommendationResponse)
-def get_recommendation(request: RecommendationRequest):
     parsed_filters = {}
+    if request.search_query:
+        try:
+            parsed, _ = await parse_flight.do(canonicalize_query(request.search_query), parse_query, request.search_query)
+            parsed_filters = dict(parsed)
+        except Exception as e:
+            logger.error(f"Query parsing error: {e}")
+    page_size = max(1, min(request.top_n or 5, MAX_PAGE_SIZE))
+    return merge_filters(request, parsed_filters), parsed_filters, None, page_size
+
+async def retrieve_and_recommend(filters: dict, page_size: int, after: tuple = None) -> tuple:
+    """
+    Retrieval + LLM stage for one resolved request.
+    Returns (matched, next_cursor, llm_response, error_msg, token_usage, timings).
+    """
+    error_msg = None
+    next_cursor = None
+    matched = []
+    llm_response = '{"restaurants": []}'
+    timings = {}
+
+    # Retrieve the data
+    start = time.perf_counter()
+    try:
+        matched, next_cursor = await fetch_page(filters, page_size, after)
+    except Exception as e:
+        logger.error(f"Retrieval error: {e}")
+        error_msg = str(e)
+
+    timings["retrieve"] = time.perf_counter() - start
+    logger.info(f"Retrieved {len(matched)} restaurants for query")
+
+    # Get LLM Recommendation
+    start = time.perf_counter()
+    try:
+        llm_response = await get_llm_recommendation_async(matched, filters)
+    except Exception as e:
+        logger.error(f"LLM error: {e}")
+    timings["llm"] = time.perf_counter() - start
+
+    return matched, next_cursor, llm_response, error_msg, last_token_usage.get(), timings
+
+def server_timing(timings: dict) -> str:
+    """
+    Stage durations (seconds) as a Server-Timing header value, in milliseconds.
+    """
+    return ", ".join(f"{stage};dur={seconds * 1000:.1f}" for stage, seconds in timings.items())
+
+def flight_key(filters: dict, page_size: int, after: tuple = None) -> str:
+    return json.dumps({"filters": filters, "page_size": page_size, "after": after}, sort_keys=True, default=str)
+
+@app.post("/recommend", response_model=RecommendationResponse)
+async def get_recommendation(request: RecommendationRequest, response: Response):
     error_msg = None
-    matched_df = pd.DataFrame()
+    next_cursor = None
+    matched = []
     llm_response = '{"restaurants": []}'
+    token_usage = None
+    timings = {}
+
+    request_start = time.perf_counter()
+    start_deadline()
+    filters, parsed_filters, after, page_size = await resolve_request(request)
+    timings["parse"] = time.perf_counter() - request_start
     
     try:
-        # 1. Parse natural language search query
-        if request.search_query:
-            try:
-                parsed_filters = parse_search_query(request.search_query)
-                
-                # Validation: Only allow locations that exist in our Bangalore dataset
-                loc_to_validate = parsed_filters.get("location")
-                if loc_to_validate:
-                    valid_locs = get_valid_locations()
-                    if loc_to_validate.lower() not in valid_locs:
-                        logger.warning(f"Ignoring hallucinated location: {loc_to_validate}")
-                        parsed_filters["location"] = None
-            except Exception as e:
-                logger.error(f"Query parsing error: {e}")
-
-        # 2. Merge filters (Dropdowns and Parsed values)
-        location = parsed_filters.get("location") or request.location
-        cuisine = parsed_filters.get("cuisine") or request.cuisine
-        
-        pricesResource = [v for v in [request.max_price, parsed_filters.get("max_price")] if v is not None]
-        max_price = min(pricesResource) if pricesResource else None
-
-        min_ratingsResource = [v for v in [request.min_rating, parsed_filters.get("min_rating")] if v is not None]
-        min_rating = max(min_ratingsResource) if min_ratingsResource else None
-
-        # 3. Retrieve the data
-        try:
-            matched_df = retrieve_restaurants(
-                location=location,
-                cuisine=cuisine,
-                max_price=max_price,
-                min_rating=min_rating,
-                top_n=request.top_n or 5
-            )
-        except Exception as e:
-            logger.error(f"Retrieval error: {e}")
-            error_msg = str(e)
-            
-        logger.info(f"Retrieved {len(matched_df)} restaurants for query")
-            
-        # 4. Get LLM Recommendation
-        try:
-            llm_response = get_llm_recommendation(matched_df, {
-                "location": location, 
-                "cuisine": cuisine,
-                "max_price": max_price,
-                "min_rating": min_rating
-            })
-        except Exception as e:
-            logger.error(f"LLM error: {e}")
-            
+        (matched, next_cursor, llm_response, error_msg, token_usage, stage_timings), shared = await recommend_flight.do(
+            flight_key(filters, page_size, after), retrieve_and_recommend, filters, page_size, after
+        )
+        timings.update(stage_timings)
+        if shared and token_usage is not None:
+            # Tokens were spent once, by the request that led the flight
+            token_usage = {**token_usage, "coalesced": True}
     except Exception as e:
         logger.error(f"General recommendation error: {e}")
         error_msg = str(e)
 
+    timings["total"] = time.perf_counter() - request_start
+    response.headers["Server-Timing"] = server_timing(timings)
+
     return RecommendationResponse(
         query=request,
-        restaurant_count=len(matched_df),
+        restaurant_count=len(matched),
         recommendation_text=llm_response,
         parsed_filters=parsed_filters,
-        error=error_msg
+        error=error_msg,
+        next_cursor=next_cursor,
+        token_usage=token_usage
     )
 
+def restaurant_cards(restaurants) -> list:
+    """
+    Plain restaurant data in the UI's card shape, available before the LLM has written anything.
+    """
+    return [
+        {
+            "id": r.id if r.id is not None else i + 1,
+            "name": r.name,
+            "rating": None if r.rating is None else round(r.rating, 1),
+            "costForTwo": None if r.cost is None else str(int(r.cost)),
+            "address": r.address,
+            "cuisines": r.cuisines,
+            "location": r.location,
+        }
+        for i, r in enumerate(to_records(restaurants))
+    ]
+
+def sse_event(event: str, data) -> str:
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False, default=str)}\n\n"
+
+@app.post("/recommend/stream")
+async def stream_recommendation(request: RecommendationRequest):
+    """
+    Server-Sent Events version of /recommend:
+    `restaurants` (cards, right after retrieval) -> `summary` / `reason` (as each LLM value completes) -> `done`.
+    """
+    request_start = time.perf_counter()
+    deadline = start_deadline()
+    filters, parsed_filters, after, page_size = await resolve_request(request)
+    parse_seconds = time.perf_counter() - request_start
+
+    async def events():
+        request_deadline.set(deadline)
+        try:
+            matched, next_cursor = await fetch_page(filters, page_size, after)
+        except Exception as e:
+            logger.error(f"Retrieval error: {e}")
+            yield sse_event("error", {"error": str(e)})
+            return
+
+        yield sse_event("restaurants", {
+            "parsed_filters": parsed_filters,
+            "restaurants": restaurant_cards(matched),
+            "next_cursor": next_cursor,
+        })
+
+        parser = RecommendationStreamParser()
+        parts = []
+        try:
+            async for delta in stream_llm_recommendation_async(matched, filters):
+                parts.append(delta)
+                for kind, value in parser.feed(delta):
+                    yield sse_event("summary" if kind == "summary" else "reason", value)
+        except Exception as e:
+            # The cards and part of the answer are already out: tell the client the rest isn't coming
+            logger.error(f"LLM streaming error: {e!r}")
+            yield sse_event("error", {"error": str(e) or type(e).__name__})
+
+        yield sse_event("done", {"recommendation_text": "".join(parts), "token_usage": last_token_usage.get()})
+
+    return StreamingResponse(events(), media_type="text/event-stream", headers={
+        "Cache-Control": "no-cache", "X-Accel-Buffering": "no", "Server-Timing": server_timing({"parse": parse_seconds})
+    })
+
 @app.get("/health")
 def health_check():
     return {"status": "ok", "db": DATABASE_URL is not None}
 
+@app.get("/cache/stats")
+def cache_stats():
+    return {"recommendation": recommendation_cache.stats(), "parse": parse_cache.stats()}
+
+@app.get("/coalescing/stats")
+def coalescing_stats():
+    return {"parse": parse_flight.stats(), "recommend": recommend_flight.stats()}
+
+@app.get("/resilience/stats")
+def llm_resilience_stats():
+    return resilience_stats()
+
+@app.get("/parser/stats")
+async def parser_stats():
+    return {
+        "gazetteer": (await get_gazetteer()).stats(),
+        "resolver": (await get_resolver()).stats(),
+        "parse_cache": parse_cache.stats(),
+    }
+
+@app.get("/suggest")
+async def suggest(q: str = "", kind: Optional[str] = None, limit: int = 8):
+    """
+    Autocomplete for the search box: locations/cuisines by prefix, then close misspellings.
+    """
+    if kind not in (None, "location", "cuisine"):
+        raise HTTPException(status_code=400, detail="kind must be 'location' or 'cuisine'")
+    resolver = await get_resolver()
+    return {"query": q, "suggestions": resolver.suggest(q, kind, max(1, min(limit, 20)))}
+
+# Facets only change with the data, so browsers may reuse them and revalidate with the ETag
+FACET_MAX_AGE_SECONDS = int(os.getenv("FACET_MAX_AGE_SECONDS", "300"))
+
+def catalog_response(request: Request, body: dict, etag: str) -> Response:
+    headers = {"ETag": etag, "Cache-Control": f"public, max-age={FACET_MAX_AGE_SECONDS}"}
+    if etag in request.headers.get("if-none-match", ""):
+        return Response(status_code=304, headers=headers)
+    return JSONResponse(body, headers=headers)
+
+def variant_etag(etag: str, *parts) -> str:
+    digest = hashlib.sha1(json.dumps(parts, default=str).encode()).hexdigest()[:8]
+    return f'{etag[:-1]}-{digest}"'
+
+@app.get("/facets")
+def get_facets(request: Request):
+    """
+    Every location, cuisine, price bucket and rating bucket with its restaurant count.
+    """
+    try:
+        catalog = retrieval.get_facet_catalog()
+    except Exception as e:
+        raise HTTPException(status_code=503, detail=f"Facet catalog unavailable: {e}")
+    return catalog_response(request, catalog.catalog, catalog.etag)
+
+@app.get("/facets/counts")
+def get_facet_counts(
+    request: Request,
+    location: Optional[str] = None,
+    cuisine: Optional[str] = None,
+    max_price: Optional[float] = None,
+    min_rating: Optional[float] = None,
+    max_rating: Optional[float] = None
+):
+    """
+    Facet counts under the current filters; each facet is counted against the other filters,
+    so a zero means picking that value would return nothing.
+    """
+    try:
+        catalog = retrieval.get_facet_catalog()
+    except Exception as e:
+        raise HTTPException(status_code=503, detail=f"Facet catalog unavailable: {e}")
+    filters = (location, cuisine, max_price, min_rating, max_rating)
+    return catalog_response(request, catalog.counts(*filters), variant_etag(catalog.etag, *filters))
+
 @app.get("/locations")
-def get_locations():
+def get_locations(request: Request):
     try:
-        with engine.connect() as conn:
-            res = conn.execute(text("SELECT DISTINCT location FROM restaurants WHERE location IS NOT NULL ORDER BY location ASC LIMIT 100"))
-            return {"locations": [row[0] for row in res]}
+        catalog = retrieval.get_facet_catalog()
     except Exception as e:
         return {"locations": [], "error": str(e)}
+    body = {"locations": [entry["value"] for entry in catalog.catalog["location"]]}
+    return catalog_response(request, body, variant_etag(catalog.etag, "locations"))
 
 @app.get("/cuisines")
-def get_cuisines():
+def get_cuisines(request: Request):
     try:
-        with engine.connect() as conn:
-            res = conn.execute(text("SELECT DISTINCT cuisines FROM restaurants WHERE cuisines IS NOT NULL LIMIT 100"))
-            c = set()
-            for row in res:
-                for x in str(row[0]).split(','):
-                    if x.strip(): c.add(x.strip())
-            return {"cuisines": sorted(list(c))}
+        catalog = retrieval.get_facet_catalog()
     except Exception as e:
         return {"cuisines": [], "error": str(e)}
+    body = {"cuisines": [entry["value"] for entry in catalog.catalog["cuisine"]]}
+    return catalog_response(request, body, variant_etag(catalog.etag, "cuisines"))
+
+@app.get("/startup/stats")
+def startup_stats():
+    return STARTUP
+
+STARTUP["import_ms"] = round((time.perf_counter() - IMPORT_STARTED) * 1000, 1)
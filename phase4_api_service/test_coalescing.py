@@ -0,0 +1,51 @@
+import asyncio
+import httpx
+import pandas as pd
+import main
+from single_flight import SingleFlight
+
+def test_identical_concurrent_requests_run_retrieval_and_llm_once(monkeypatch):
+    counts = {"parse": 0, "retrieve": 0, "llm": 0}
+
+    async def slow_parse(query):
+        counts["parse"] += 1
+        await asyncio.sleep(0.05)
+        return {"location": "BTM", "cuisine": "Chinese"}
+
+    async def slow_retrieve(**kwargs):
+        counts["retrieve"] += 1
+        await asyncio.sleep(0.05)
+        return pd.DataFrame({'id': [1], 'name': ['Wok Express'], 'rate': [4.1]})
+
+    async def slow_llm(df, prefs):
+        counts["llm"] += 1
+        await asyncio.sleep(0.2)
+        main.last_token_usage.set({"prompt_tokens": 100, "completion_tokens": 50})
+        return '{"restaurants": []}'
+
+    monkeypatch.setattr(main, "parse_query", slow_parse)
+    monkeypatch.setattr(main, "retrieve_restaurants_async", slow_retrieve)
+    monkeypatch.setattr(main, "get_llm_recommendation_async", slow_llm)
+    monkeypatch.setattr(main, "parse_flight", SingleFlight("parse"))
+    monkeypatch.setattr(main, "recommend_flight", SingleFlight("recommend"))
+
+    async def burst():
+        transport = httpx.ASGITransport(app=main.app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            same = [client.post("/recommend", json={"search_query": "Chinese in BTM"}) for _ in range(20)]
+            other = [client.post("/recommend", json={"location": "Indiranagar"})]
+            responses = await asyncio.gather(*same, *other)
+            return responses, (await client.get("/coalescing/stats")).json()
+
+    responses, stats = asyncio.run(burst())
+    assert all(r.status_code == 200 for r in responses)
+    assert counts == {"parse": 1, "retrieve": 2, "llm": 2}
+    assert all(r.json()["restaurant_count"] == 1 for r in responses)
+
+    usages = [r.json()["token_usage"] for r in responses[:20]]
+    assert sum(1 for u in usages if u.get("coalesced")) == 19
+    assert all(u["prompt_tokens"] == 100 for u in usages)
+
+    assert stats["recommend"]["calls"] == 21
+    assert stats["recommend"]["collapsed"] == 19
+    assert stats["parse"]["collapsed"] == 19
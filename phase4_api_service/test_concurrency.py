@@ -0,0 +1,39 @@
+import asyncio
+import httpx
+import pandas as pd
+from groq import AsyncGroq
+import main
+import fake_groq
+import llm_recommender
+from blurbs import BlurbStore
+from response_cache import ResponseCache
+
+async def slow_retrieve(**kwargs):
+    await asyncio.sleep(0.05)
+    return pd.DataFrame({'id': [1], 'name': ['Slow Cafe'], 'rate': [4.5]})
+
+def test_single_worker_serves_hundreds_of_concurrent_requests(tmp_path, monkeypatch):
+    transport = httpx.ASGITransport(app=fake_groq.app)
+    client = AsyncGroq(api_key="test", base_url="http://fake-groq", http_client=httpx.AsyncClient(transport=transport))
+    monkeypatch.setattr(llm_recommender, "async_client", client)
+    monkeypatch.setattr(llm_recommender, "recommendation_cache", ResponseCache("recommendation", str(tmp_path / "c.sqlite3")))
+    monkeypatch.setattr(llm_recommender, "blurb_store", BlurbStore(str(tmp_path / "blurbs.sqlite3")))
+    monkeypatch.setattr(main, "retrieve_restaurants_async", slow_retrieve)
+    # Roughly a Groq round trip; a sync endpoint would hold a threadpool slot for this long
+    monkeypatch.setitem(fake_groq.SETTINGS, "first_token_delay", 0.3)
+    monkeypatch.setattr(fake_groq, "STATE", {"requests": 0, "in_flight": 0, "max_in_flight": 0})
+
+    async def burst(n):
+        transport = httpx.ASGITransport(app=main.app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            # Distinct budgets, so request coalescing doesn't fold them into one Groq call
+            return await asyncio.gather(*[
+                client.post("/recommend", json={"location": "BTM", "max_price": 500 + i, "top_n": 5}) for i in range(n)
+            ])
+
+    responses = asyncio.run(burst(300))
+
+    assert all(r.status_code == 200 for r in responses)
+    assert fake_groq.STATE["requests"] == 300
+    # A 40-slot threadpool would never have more than 40 Groq calls open at once
+    assert fake_groq.STATE["max_in_flight"] > 100
@@ -0,0 +1,41 @@
+import pytest
+import pandas as pd
+from fastapi.testclient import TestClient
+import main
+import retrieval
+from memory_index import RestaurantIndex
+from facets import FacetCatalog
+
+frame = pd.DataFrame({
+    'name': ['A', 'B', 'C', 'D'],
+    'location': ['BTM', 'BTM', 'Indiranagar', 'HSR'],
+    'cuisines': ['Cafe', 'Chinese, Cafe', 'Chinese', 'Biryani'],
+    'approx_cost(for two people)': [300.0, 900.0, 1500.0, 400.0],
+    'rate': [4.5, 3.9, 4.2, None],
+})
+
+@pytest.fixture
+def client(monkeypatch):
+    monkeypatch.setattr(retrieval, "_facet_catalog", FacetCatalog(RestaurantIndex(frame)))
+    return TestClient(main.app)
+
+def test_facets_are_cacheable(client):
+    response = client.get("/facets")
+    assert response.status_code == 200
+    assert response.headers["cache-control"].startswith("public, max-age=")
+    assert response.json()["location"] == [
+        {"value": "BTM", "count": 2}, {"value": "HSR", "count": 1}, {"value": "Indiranagar", "count": 1}
+    ]
+    revalidated = client.get("/facets", headers={"If-None-Match": response.headers["etag"]})
+    assert revalidated.status_code == 304
+
+def test_locations_and_cuisines_come_from_the_catalog(client):
+    assert client.get("/locations").json() == {"locations": ["BTM", "HSR", "Indiranagar"]}
+    assert client.get("/cuisines").json() == {"cuisines": ["Biryani", "Cafe", "Chinese"]}
+
+def test_filter_aware_counts(client):
+    response = client.get("/facets/counts", params={"location": "BTM", "min_rating": 4.0})
+    data = response.json()
+    assert data["total"] == 1
+    assert {e["value"]: e["count"] for e in data["cuisine"]} == {"Biryani": 0, "Cafe": 1, "Chinese": 0}
+    assert response.headers["etag"] != client.get("/facets/counts").headers["etag"]
@@ -0,0 +1,56 @@
+import pytest
+import pandas as pd
+from fastapi.testclient import TestClient
+import main
+import retrieval
+from resolver import Resolver
+
+frame = pd.DataFrame({
+    'name': [f'Restaurant {i}' for i in range(5)],
+    'location': ['BTM'] * 5,
+    'cuisines': ['Cafe'] * 5,
+    'approx_cost(for two people)': [300.0] * 5,
+    'rate': [4.9, 4.7, 4.5, 4.3, 4.1]
+})
+
+@pytest.fixture
+def client(monkeypatch):
+    calls = {"parse": 0}
+
+    async def fake_parse(query):
+        calls["parse"] += 1
+        return {"location": "BTM"}
+
+    async def fake_llm(restaurants, prefs):
+        return ",".join(r.name for r in restaurants)
+
+    monkeypatch.setattr(main, "parse_search_query_async", fake_parse)
+    monkeypatch.setattr(main, "RESOLVER", Resolver(['BTM'], ['Cafe']))
+    monkeypatch.setattr(main, "get_llm_recommendation_async", fake_llm)
+    monkeypatch.setattr(main, "retrieve_restaurants_async", lambda **kw: retrieval.retrieve_restaurants_async(df=frame, **kw))
+    test_client = TestClient(main.app)
+    test_client.calls = calls
+    return test_client
+
+def test_cursor_walks_all_pages_without_reparsing(client):
+    response = client.post("/recommend", json={"search_query": "cafes in btm", "top_n": 2}).json()
+    pages = [response["recommendation_text"]]
+    while response["next_cursor"]:
+        response = client.post("/recommend", json={"cursor": response["next_cursor"]}).json()
+        pages.append(response["recommendation_text"])
+
+    assert pages == ['Restaurant 0,Restaurant 1', 'Restaurant 2,Restaurant 3', 'Restaurant 4']
+    assert client.calls["parse"] == 1
+
+def test_invalid_cursor_is_rejected(client):
+    response = client.post("/recommend", json={"cursor": "garbage"})
+    assert response.status_code == 400
+
+def test_page_size_is_capped(client, monkeypatch):
+    monkeypatch.setattr(main, "MAX_PAGE_SIZE", 3)
+    response = client.post("/recommend", json={"location": "BTM", "top_n": 1000}).json()
+    assert response["recommendation_text"] == 'Restaurant 0,Restaurant 1,Restaurant 2'
+    assert response["next_cursor"]
+
+    crafted = retrieval.encode_cursor({"location": "BTM"}, (4.7, 1), 0)
+    assert client.post("/recommend", json={"cursor": crafted}).status_code == 400
@@ -0,0 +1,68 @@
+import pytest
+import pandas as pd
+from fastapi.testclient import TestClient
+import main
+from gazetteer import Gazetteer
+from resolver import Resolver
+
+@pytest.fixture
+def client(monkeypatch):
+    calls = {"llm_parse": 0, "filters": None}
+
+    async def fake_parse(query):
+        calls["llm_parse"] += 1
+        return {"location": "Atlantis", "cuisine": "Cafe"}
+
+    async def fake_retrieve(**kwargs):
+        calls["filters"] = kwargs
+        return pd.DataFrame()
+
+    async def fake_llm(df, prefs):
+        return '{"restaurants": []}'
+
+    monkeypatch.setattr(main, "GAZETTEER", Gazetteer(['Indiranagar'], ['Burger', 'Cafe']))
+    monkeypatch.setattr(main, "parse_search_query_async", fake_parse)
+    monkeypatch.setattr(main, "RESOLVER", Resolver(['Indiranagar'], ['Burger', 'Cafe']))
+    monkeypatch.setattr(main, "retrieve_restaurants_async", fake_retrieve)
+    monkeypatch.setattr(main, "get_llm_recommendation_async", fake_llm)
+    test_client = TestClient(main.app)
+    test_client.calls = calls
+    return test_client
+
+def test_structured_query_skips_llm_parser(client):
+    data = client.post("/recommend", json={"search_query": "Burger in Indiranagar under 500 under 4 stars"}).json()
+    assert client.calls["llm_parse"] == 0
+    assert data["parsed_filters"]["location"] == "Indiranagar"
+    assert client.calls["filters"]["max_rating"] == 4.0
+    assert client.calls["filters"]["max_price"] == 500
+
+def test_free_form_query_falls_back_and_is_validated(client):
+    data = client.post("/recommend", json={"search_query": "a quiet cafe to read"}).json()
+    assert client.calls["llm_parse"] == 1
+    assert data["parsed_filters"] == {"location": None, "cuisine": "Cafe"}
+
+    stats = client.get("/parser/stats").json()["gazetteer"]
+    assert stats["llm_fallback"] == 1
+
+def test_misspelt_location_is_resolved_not_dropped(client, monkeypatch):
+    async def fake_parse(query):
+        return {"location": "indira nagar", "cuisine": "cafes"}
+    monkeypatch.setattr(main, "parse_search_query_async", fake_parse)
+
+    data = client.post("/recommend", json={"search_query": "a quiet cafe to read in indira nagar"}).json()
+    assert data["parsed_filters"] == {"location": "Indiranagar", "cuisine": "Cafe"}
+
+def test_suggest_endpoint(client):
+    assert client.get("/suggest", params={"q": "indi"}).json()["suggestions"][0]["name"] == "Indiranagar"
+    assert client.get("/suggest", params={"q": "bur", "kind": "cuisine"}).json()["suggestions"][0]["name"] == "Burger"
+    assert client.get("/suggest", params={"q": "x", "kind": "dish"}).status_code == 400
+
+def test_keyword_query_is_what_the_filters_leave(client, monkeypatch):
+    import retrieval
+    monkeypatch.setattr(retrieval, "get_semantic_index", lambda: None)
+    monkeypatch.setattr(retrieval, "get_text_index", lambda: object())
+
+    client.post("/recommend", json={"search_query": "craft beer cafe in indiranagar under 800"})
+    assert client.calls["filters"]["keyword_query"] == "craft beer"
+    client.post("/recommend", json={"search_query": "a cafe in indiranagar under 800"})
+    assert client.calls["filters"]["keyword_query"] is None
@@ -0,0 +1,78 @@
+import json
+import time
+import asyncio
+from types import SimpleNamespace
+import httpx
+import pytest
+import pandas as pd
+from groq import AsyncGroq
+import main
+import fake_groq
+import llm_recommender
+from response_cache import ResponseCache
+
+frame = pd.DataFrame({
+    'id': [1, 2], 'name': ['Wok Express', 'Third Wave'], 'rate': ['4.1/5', '4.5/5'], 'location': ['BTM', 'BTM'],
+    'cuisines': ['Chinese', 'Cafe'], 'approx_cost(for two people)': [400, 600], 'address': ['1 Road', '2 Road']
+})
+
+@pytest.fixture
+def slow_groq(tmp_path, monkeypatch):
+    async def fake_retrieve(**kwargs):
+        return frame
+
+    transport = httpx.ASGITransport(app=fake_groq.app)
+    client = AsyncGroq(api_key="test", base_url="http://fake-groq", http_client=httpx.AsyncClient(transport=transport))
+    monkeypatch.setattr(llm_recommender, "async_client", client)
+    monkeypatch.setattr(llm_recommender, "recommendation_cache", ResponseCache("recommendation", str(tmp_path / "c.sqlite3")))
+    monkeypatch.setattr(main, "retrieve_restaurants_async", fake_retrieve)
+    monkeypatch.setitem(fake_groq.SETTINGS, "first_token_delay", 0.5)
+
+async def read_events():
+    """(seconds since request, event, data) for each SSE event."""
+    # Drive the StreamingResponse directly: ASGITransport would buffer the whole body
+    start = time.perf_counter()
+    response = await main.stream_recommendation(main.RecommendationRequest(location="BTM"))
+    assert response.media_type == "text/event-stream"
+    events = []
+    async for message in response.body_iterator:
+        event_line, data_line = message.strip().split("\n")
+        events.append((time.perf_counter() - start, event_line[len("event: "):], json.loads(data_line[len("data: "):])))
+    return events
+
+def test_cards_arrive_before_the_llm_starts(slow_groq):
+    events = asyncio.run(read_events())
+    kinds = [kind for _, kind, _ in events]
+    assert kinds == ["restaurants", "summary", "reason", "reason", "done"]
+
+    first_at, _, cards = events[0]
+    assert first_at < 0.3
+    assert [c["name"] for c in cards["restaurants"]] == ['Wok Express', 'Third Wave']
+    assert cards["restaurants"][1]["rating"] == 4.5
+
+    assert events[2][2]["aiReason"].startswith("Wok Express")
+    assert json.loads(events[-1][2]["recommendation_text"])["summary"] == events[1][2]
+
+class BrokenStream:
+    """Streams the start of a recommendation, then loses the connection."""
+    def __init__(self, deltas):
+        self.deltas = deltas
+
+    async def __aiter__(self):
+        for delta in self.deltas:
+            yield SimpleNamespace(choices=[SimpleNamespace(delta=SimpleNamespace(content=delta))])
+        raise httpx.ReadError("connection reset")
+
+    async def close(self):
+        pass
+
+def test_stream_failing_midway_ends_with_an_error(slow_groq, monkeypatch):
+    async def create(**kwargs):
+        return BrokenStream(['{"summary": "Two picks.", ', '"restaurants": [{"id": 1, "aiReason": "Fast."}, '])
+
+    client = SimpleNamespace(chat=SimpleNamespace(completions=SimpleNamespace(create=create)))
+    monkeypatch.setattr(llm_recommender, "async_client", client)
+    events = asyncio.run(read_events())
+    assert [kind for _, kind, _ in events] == ["restaurants", "summary", "reason", "error", "done"]
+    assert events[3][2]["error"] == "connection reset"
+    assert llm_recommender.recommendation_cache.stats()["entries"] == 0
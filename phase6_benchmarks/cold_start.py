@@ -0,0 +1,164 @@
+import os
+import sys
+import json
+import time
+import logging
+import argparse
+import platform
+import statistics
+import subprocess
+from typing import Optional
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+# Modules a cold import of the API must not pull in; they load on first use or during warmup
+HEAVY_MODULES = ["pandas", "numpy", "sqlalchemy", "groq"]
+STAGES = ["import_ms", "startup_ms", "lifespan_ms", "first_response_ms", "time_to_first_response_ms", "warm_response_ms"]
+# What had happened by each point, independent of machine speed (true only if true in every run)
+FLAGS = ["warmup_done_at_startup", "facets_ready_before_first_request"]
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+def child(path: str, warmup: bool) -> dict:
+    """
+    Runs inside a fresh interpreter: imports the Vercel entry point, optionally starts the app and
+    waits for its background warmup, then times the first and second GET of `path`.
+    """
+    start = time.perf_counter()
+    sys.path.insert(0, BASE_DIR)
+    import api.index
+    imported = time.perf_counter()
+    heavy = [m for m in HEAVY_MODULES if m in sys.modules]
+
+    # The test client is harness, not part of the app's cold start
+    from fastapi.testclient import TestClient
+    client = TestClient(api.index.app)
+    harness_ready = time.perf_counter()
+    warmup_done_at_startup = None
+    if warmup:
+        from phase4_api_service.main import WARMED_UP
+        client.__enter__()
+        started = time.perf_counter()
+        warmup_done_at_startup = WARMED_UP.is_set()
+        WARMED_UP.wait(60)
+    else:
+        started = harness_ready
+    ready = time.perf_counter()
+    retrieval = sys.modules.get("retrieval")
+    facets_ready = retrieval is not None and retrieval._facet_catalog is not None
+    status = client.get(path).status_code
+    first = time.perf_counter()
+    client.get(path)
+    second = time.perf_counter()
+    if warmup:
+        client.__exit__(None, None, None)
+
+    return {
+        "status": status,
+        "heavy_modules_at_import": heavy,
+        "warmup_done_at_startup": warmup_done_at_startup,
+        "facets_ready_before_first_request": facets_ready,
+        "import_ms": round((imported - start) * 1000, 1),
+        # How long startup blocks, and how long until the background warmup is done
+        "startup_ms": round((started - harness_ready) * 1000, 1),
+        "lifespan_ms": round((ready - harness_ready) * 1000, 1),
+        "first_response_ms": round((first - ready) * 1000, 1),
+        "time_to_first_response_ms": round((imported - start + first - harness_ready) * 1000, 1),
+        "warm_response_ms": round((second - first) * 1000, 1),
+    }
+
+
+def measure(snapshot_dir: str, path: str = "/api/facets", warmup: bool = False, runs: int = 3) -> dict:
+    """
+    Median of `runs` cold starts, each in a new process against the seeded snapshot (memory backend).
+    """
+    workdir = os.path.dirname(snapshot_dir)
+    env = {
+        **os.environ,
+        "RETRIEVAL_BACKEND": "memory",
+        "SNAPSHOT_DIR": snapshot_dir,
+        "WARMUP_ON_STARTUP": "1" if warmup else "0",
+        # Keep any locally built indexes and caches out of the measurement
+        "SEMANTIC_INDEX_DIR": os.path.join(workdir, "no_semantic_index"),
+        "TEXT_INDEX_DIR": os.path.join(workdir, "no_text_index"),
+        "LLM_CACHE_PATH": os.path.join(workdir, "cache.sqlite3"),
+        "BLURB_DB_PATH": os.path.join(workdir, "blurbs.sqlite3"),
+        "GROQ_API_KEY": os.environ.get("GROQ_API_KEY", "cold-start-benchmark"),
+    }
+    samples = []
+    for _ in range(runs):
+        spawned = time.perf_counter()
+        result = subprocess.run(
+            [sys.executable, os.path.abspath(__file__), "--child", "--path", path] + (["--warmup"] if warmup else []),
+            env=env, capture_output=True, text=True, check=True
+        )
+        sample = json.loads(result.stdout.strip().splitlines()[-1])
+        sample["process_ms"] = round((time.perf_counter() - spawned) * 1000, 1)
+        samples.append(sample)
+
+    report = {stage: statistics.median(s[stage] for s in samples) for stage in STAGES + ["process_ms"]}
+    report["status"] = samples[-1]["status"]
+    report["heavy_modules_at_import"] = sorted({m for s in samples for m in s["heavy_modules_at_import"]})
+    report.update({flag: all(s[flag] for s in samples) for flag in FLAGS})
+    report["runs"] = runs
+    return report
+
+
+def check_budget(report: dict, max_import_ms: Optional[float] = None, max_first_response_ms: Optional[float] = None) -> list:
+    """
+    Budget violations as messages; empty when within budget.
+    """
+    problems = []
+    for mode, result in report.items():
+        if not isinstance(result, dict) or "import_ms" not in result:
+            continue
+        if result["heavy_modules_at_import"]:
+            problems.append(f"{mode}: importing the API loaded {', '.join(result['heavy_modules_at_import'])}")
+        if max_import_ms is not None and result["import_ms"] > max_import_ms:
+            problems.append(f"{mode}: import took {result['import_ms']} ms (budget {max_import_ms} ms)")
+        if max_first_response_ms is not None and result["time_to_first_response_ms"] > max_first_response_ms:
+            problems.append(
+                f"{mode}: first response after {result['time_to_first_response_ms']} ms (budget {max_first_response_ms} ms)"
+            )
+    return problems
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Measure API import time and time-to-first-response in fresh processes.")
+    parser.add_argument("--child", action="store_true", help=argparse.SUPPRESS)
+    parser.add_argument("--path", default="/api/facets", help="GET endpoint timed as the first request")
+    parser.add_argument("--warmup", action="store_true", help=argparse.SUPPRESS)
+    parser.add_argument("--rows", type=int, default=5000, help="size of the synthetic dataset")
+    parser.add_argument("--runs", type=int, default=3)
+    parser.add_argument("--max-import-ms", type=float, help="fail if the median import exceeds this")
+    parser.add_argument("--max-first-response-ms", type=float, help="fail if the median time-to-first-response exceeds this")
+    parser.add_argument("--name", help="result file name (default: UTC timestamp)")
+    args = parser.parse_args()
+
+    if args.child:
+        logging.disable(logging.CRITICAL)
+        print(json.dumps(child(args.path, args.warmup)))
+        sys.exit(0)
+
+    import tempfile
+    from load_test import save_report
+    from fixtures import seed_snapshot
+
+    with tempfile.TemporaryDirectory() as workdir:
+        snapshot_dir = os.path.join(workdir, "snapshot")
+        seed_snapshot(snapshot_dir, args.rows)
+        report = {
+            # Serverless-style: no lifespan, the first request pays for imports and data loading
+            "lazy": measure(snapshot_dir, args.path, warmup=False, runs=args.runs),
+            # Server-style: the lifespan hook warms everything in the background before traffic
+            "warmup": measure(snapshot_dir, args.path, warmup=True, runs=args.runs),
+        }
+    report["config"] = {"rows": args.rows, "path": args.path, "python": platform.python_version(), "machine": platform.machine()}
+    print(json.dumps(report, indent=2))
+    print(f"Saved to {save_report(report, args.name or 'cold_start-' + time.strftime('%Y%m%dT%H%M%SZ', time.gmtime()))}")
+
+    problems = check_budget(report, args.max_import_ms, args.max_first_response_ms)
+    for problem in problems:
+        logger.error(problem)
+    sys.exit(1 if problems else 0)
@@ -0,0 +1,79 @@
+import os
+import sys
+import logging
+from typing import Optional
+
+import numpy as np
+import pandas as pd
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(os.path.join(BASE_DIR, 'phase1_data_ingestion'))
+
+from data_ingestion import clean_dataframe
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+LOCATIONS = [
+    'BTM', 'Koramangala 5th Block', 'Koramangala 6th Block', 'Indiranagar', 'HSR', 'Jayanagar', 'JP Nagar',
+    'Whitefield', 'Marathahalli', 'Bellandur', 'Electronic City', 'MG Road', 'Brigade Road', 'Church Street',
+    'Malleshwaram', 'Banashankari', 'Basavanagudi', 'Ulsoor', 'Frazer Town', 'Sarjapur Road',
+]
+CUISINES = [
+    'North Indian', 'South Indian', 'Chinese', 'Biryani', 'Fast Food', 'Cafe', 'Desserts', 'Beverages',
+    'Continental', 'Italian', 'Pizza', 'Burger', 'Street Food', 'Bakery', 'Mughlai', 'Andhra', 'Chettinad',
+    'Kerala', 'Thai', 'Momos', 'Seafood', 'Arabian', 'Ice Cream', 'Juices', 'Asian',
+]
+REST_TYPES = ['Casual Dining', 'Quick Bites', 'Cafe', 'Delivery', 'Dessert Parlor', 'Bar', 'Fine Dining']
+NAME_PARTS = (
+    ['Spice', 'Urban', 'Royal', 'Green', 'Little', 'Golden', 'Hungry', 'Third', 'Old', 'Blue', 'Happy', 'Wok'],
+    ['Kitchen', 'Bowl', 'Cafe', 'Dhaba', 'Express', 'House', 'Garden', 'Wave', 'Table', 'Bistro', 'Grill', 'Point'],
+)
+
+
+def synthetic_restaurants(rows: int = 5000, seed: int = 7) -> pd.DataFrame:
+    """
+    Deterministic Zomato-shaped frame (raw string formats included), run through the real cleaning stage.
+    Chains share a name across locations, like the real data, so per-name dedup is exercised.
+    """
+    rng = np.random.default_rng(seed)
+    first, second = NAME_PARTS
+    chains = [f"{a} {b}" for a in first for b in second]
+    names = [
+        chains[i] if i < len(chains) else f"{chains[i % len(chains)]} {i // len(chains)}"
+        for i in rng.integers(0, max(rows // 3, len(chains)), rows)
+    ]
+    cuisines = [", ".join(rng.choice(CUISINES, size=rng.integers(1, 5), replace=False)) for _ in range(rows)]
+    ratings = np.round(rng.normal(3.9, 0.35, rows).clip(2.5, 4.9), 1)
+    rate = np.where(rng.random(rows) < 0.05, "NEW", [f"{r}/5" for r in ratings])
+    cost = rng.choice([150, 200, 300, 400, 500, 600, 800, 1000, 1200, 1500, 2000, 2500], rows)
+
+    raw = pd.DataFrame({
+        'name': names,
+        'address': [f"{i + 1}, {rng.integers(1, 40)}th Cross, Bangalore" for i in range(rows)],
+        'location': rng.choice(LOCATIONS, rows),
+        'rest_type': rng.choice(REST_TYPES, rows),
+        'cuisines': cuisines,
+        'rate': rate,
+        'approx_cost(for two people)': [f"{c:,}" for c in cost],
+        'dish_liked': [", ".join(c.split(", ")[:2]) for c in cuisines],
+        'online_order': rng.choice(['Yes', 'No'], rows),
+        'book_table': rng.choice(['Yes', 'No'], rows),
+    })
+    return clean_dataframe(raw, report=False)
+
+
+def seed_snapshot(snapshot_dir: str, rows: int = 5000, seed: int = 7) -> dict:
+    """
+    Writes the synthetic dataset as an Arrow snapshot for RETRIEVAL_BACKEND=memory.
+    """
+    from snapshot import write_snapshot
+    return write_snapshot(synthetic_restaurants(rows, seed), snapshot_dir, source=f"synthetic:{rows}:{seed}")
+
+
+def seed_postgres(database_url: str, rows: int = 5000, seed: int = 7) -> Optional[dict]:
+    """
+    Loads the synthetic dataset into a (disposable) Postgres with the production loader.
+    """
+    from upload_to_supabase import upload_data, _psycopg2_url
+    return upload_data(_psycopg2_url(database_url), synthetic_restaurants(rows, seed))
@@ -0,0 +1,246 @@
+import os
+import sys
+import json
+import math
+import time
+import random
+import asyncio
+import logging
+import argparse
+import platform
+from datetime import datetime, timezone
+from typing import Optional
+
+import httpx
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+for phase in ('phase1_data_ingestion', 'phase2_knowledge_base', 'phase3_llm_integration', 'phase4_api_service'):
+    sys.path.append(os.path.join(BASE_DIR, phase))
+
+from fixtures import LOCATIONS, CUISINES, seed_snapshot, seed_postgres
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+RESULTS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "results")
+STAGES = ["parse", "retrieve", "llm", "total"]
+
+
+def build_scenarios(count: int = 40, seed: int = 11) -> list:
+    """
+    A fixed mix of request bodies: structured queries (local parser), free-form ones (LLM parser),
+    dropdown-only filters and price/rating bounds.
+    """
+    rng = random.Random(seed)
+    scenarios = []
+    for i in range(count):
+        location, cuisine = rng.choice(LOCATIONS), rng.choice(CUISINES)
+        kind = i % 4
+        if kind == 0:
+            scenarios.append({"search_query": f"{cuisine} in {location} under {rng.choice([300, 500, 800, 1200])}"})
+        elif kind == 1:
+            scenarios.append({"search_query": f"somewhere cosy for a {cuisine.lower()} date night near {location}"})
+        elif kind == 2:
+            scenarios.append({"location": location, "cuisine": cuisine})
+        else:
+            scenarios.append({"location": location, "min_rating": rng.choice([3.5, 4.0, 4.2]), "top_n": rng.choice([5, 10])})
+    return scenarios
+
+
+def parse_server_timing(header: Optional[str]) -> dict:
+    """
+    "parse;dur=1.2, llm;dur=250.0" -> {"parse": 1.2, "llm": 250.0} (milliseconds)
+    """
+    stages = {}
+    for entry in (header or "").split(","):
+        name, _, params = entry.strip().partition(";")
+        for param in params.split(";"):
+            key, _, value = param.strip().partition("=")
+            if name and key == "dur":
+                stages[name] = float(value)
+    return stages
+
+
+def percentile(values: list, q: float) -> Optional[float]:
+    """
+    Nearest-rank percentile; None for no samples.
+    """
+    if not values:
+        return None
+    ordered = sorted(values)
+    rank = max(0, min(len(ordered) - 1, math.ceil(q / 100 * len(ordered)) - 1))
+    return ordered[rank]
+
+
+async def run_load(client: httpx.AsyncClient, scenarios: list, requests: int, concurrency: int, path: str = "/recommend") -> tuple:
+    """
+    Sends `requests` POSTs (cycling through scenarios) with at most `concurrency` in flight.
+    Returns (samples, elapsed_seconds); each sample is {"status", "client_ms", "stages"}.
+    """
+    queue = asyncio.Queue()
+    for i in range(requests):
+        queue.put_nowait(scenarios[i % len(scenarios)])
+    samples = []
+
+    async def worker():
+        while not queue.empty():
+            body = queue.get_nowait()
+            start = time.perf_counter()
+            try:
+                response = await client.post(path, json=body)
+                status, stages = response.status_code, parse_server_timing(response.headers.get("server-timing"))
+            except httpx.HTTPError as e:
+                logger.warning(f"Request failed: {e}")
+                status, stages = None, {}
+            samples.append({"status": status, "client_ms": (time.perf_counter() - start) * 1000, "stages": stages})
+
+    start = time.perf_counter()
+    await asyncio.gather(*[worker() for _ in range(concurrency)])
+    return samples, time.perf_counter() - start
+
+
+def summarize(samples: list, elapsed: float, concurrency: int) -> dict:
+    ok = [s for s in samples if s["status"] == 200]
+    latency = {}
+    for stage in STAGES + ["client"]:
+        values = [s["client_ms"] if stage == "client" else s["stages"].get(stage) for s in ok]
+        values = [v for v in values if v is not None]
+        if values:
+            latency[stage] = {
+                "p50": round(percentile(values, 50), 2),
+                "p95": round(percentile(values, 95), 2),
+                "p99": round(percentile(values, 99), 2),
+                "mean": round(sum(values) / len(values), 2),
+            }
+    return {
+        "requests": len(samples),
+        "concurrency": concurrency,
+        "errors": len(samples) - len(ok),
+        "elapsed_seconds": round(elapsed, 3),
+        "requests_per_second": round(len(ok) / elapsed, 2) if elapsed else None,
+        "latency_ms": latency,
+    }
+
+
+def compare(report: dict, baseline: dict) -> dict:
+    """
+    Relative change against a baseline report: negative latency and positive throughput are improvements.
+    """
+    def change(new, old):
+        return round((new - old) / old * 100, 1) if new is not None and old else None
+
+    diff = {"requests_per_second_pct": change(report.get("requests_per_second"), baseline.get("requests_per_second"))}
+    for stage, stats in report.get("latency_ms", {}).items():
+        old = baseline.get("latency_ms", {}).get(stage)
+        if old:
+            diff[f"{stage}_p95_pct"] = change(stats["p95"], old["p95"])
+            diff[f"{stage}_p50_pct"] = change(stats["p50"], old["p50"])
+    return diff
+
+
+def configure_in_process(workdir: str, rows: int, database_url: Optional[str] = None, cache: bool = False) -> None:
+    """
+    Points the API at a seeded local dataset and the fake Groq server, with fresh caches.
+    """
+    import retrieval
+    import snapshot
+    import fake_groq
+    import llm_recommender
+    import main
+    from groq import AsyncGroq
+    from blurbs import BlurbStore
+    from response_cache import ResponseCache
+    from single_flight import SingleFlight
+
+    if database_url:
+        seed_postgres(database_url, rows)
+        retrieval.RETRIEVAL_BACKEND = "postgres"
+        retrieval.DATABASE_URL = database_url
+        retrieval._engine = retrieval._async_engine = None
+        retrieval._dimension_names = {}
+    else:
+        snapshot_dir = os.path.join(workdir, "snapshot")
+        seed_snapshot(snapshot_dir, rows)
+        snapshot.SNAPSHOT_DIR = snapshot_dir
+        retrieval.RETRIEVAL_BACKEND = "memory"
+        retrieval._memory_index = None
+    retrieval._facet_catalog = None
+
+    transport = httpx.ASGITransport(app=fake_groq.app)
+    llm_recommender.async_client = AsyncGroq(
+        api_key="fake", base_url="http://fake-groq", http_client=httpx.AsyncClient(transport=transport)
+    )
+    # ttl -1 makes every lookup miss, so each request pays the full LLM cost
+    ttl = {} if cache else {"ttl_seconds": -1}
+    cache_path = os.path.join(workdir, "cache.sqlite3")
+    llm_recommender.recommendation_cache = ResponseCache("recommendation", cache_path, **ttl)
+    llm_recommender.parse_cache = ResponseCache("parse", cache_path, **ttl)
+    llm_recommender.blurb_store = BlurbStore(os.path.join(workdir, "blurbs.sqlite3"))
+    main.recommendation_cache, main.parse_cache = llm_recommender.recommendation_cache, llm_recommender.parse_cache
+    main.VOCABULARY = main.GAZETTEER = main.RESOLVER = None
+    main.parse_flight, main.recommend_flight = SingleFlight("parse"), SingleFlight("recommend")
+
+
+async def benchmark(
+    requests: int = 200,
+    concurrency: int = 20,
+    url: Optional[str] = None,
+    scenarios: Optional[list] = None,
+    path: str = "/recommend"
+) -> dict:
+    """
+    Drives a live server at `url`, or phase4_api_service.main:app in-process (configure_in_process first).
+    """
+    scenarios = scenarios or build_scenarios()
+    if url:
+        client = httpx.AsyncClient(base_url=url, timeout=60)
+    else:
+        import main
+        client = httpx.AsyncClient(transport=httpx.ASGITransport(app=main.app), base_url="http://bench", timeout=60)
+    async with client:
+        samples, elapsed = await run_load(client, scenarios, requests, concurrency, path)
+    return summarize(samples, elapsed, concurrency)
+
+
+def save_report(report: dict, name: Optional[str] = None, results_dir: str = RESULTS_DIR) -> str:
+    os.makedirs(results_dir, exist_ok=True)
+    name = name or datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%SZ")
+    path = os.path.join(results_dir, f"{name}.json")
+    with open(path, "w") as f:
+        json.dump(report, f, indent=2)
+    return path
+
+
+if __name__ == "__main__":
+    import tempfile
+    import fake_groq
+
+    parser = argparse.ArgumentParser(description="Load-test /recommend against a seeded dataset and the fake Groq server.")
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=20)
+    parser.add_argument("--rows", type=int, default=5000, help="size of the synthetic dataset")
+    parser.add_argument("--url", help="benchmark a running server instead of the in-process app")
+    parser.add_argument("--database-url", help="seed and query this Postgres instead of the memory backend")
+    parser.add_argument("--first-token-delay", type=float, default=0.25)
+    parser.add_argument("--tokens-per-second", type=float, default=600)
+    parser.add_argument("--cache", action="store_true", help="keep the LLM response/parse caches enabled")
+    parser.add_argument("--name", help="result file name (default: UTC timestamp)")
+    parser.add_argument("--baseline", help="earlier result JSON to compare against")
+    args = parser.parse_args()
+
+    fake_groq.configure(first_token_delay=args.first_token_delay, tokens_per_second=args.tokens_per_second)
+    with tempfile.TemporaryDirectory() as workdir:
+        if not args.url:
+            configure_in_process(workdir, args.rows, args.database_url, args.cache)
+        report = asyncio.run(benchmark(args.requests, args.concurrency, args.url))
+
+    report["config"] = {
+        "rows": args.rows, "backend": "postgres" if args.database_url else "memory", "url": args.url,
+        "first_token_delay": args.first_token_delay, "tokens_per_second": args.tokens_per_second, "cache": args.cache,
+        "python": platform.python_version(), "machine": platform.machine(),
+    }
+    if args.baseline:
+        with open(args.baseline) as f:
+            report["vs_baseline"] = compare(report, json.load(f))
+    print(json.dumps(report, indent=2))
+    print(f"Saved to {save_report(report, args.name)}")
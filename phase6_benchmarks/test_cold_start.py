@@ -0,0 +1,32 @@
+import pytest
+from fixtures import seed_snapshot
+from cold_start import measure, check_budget
+
+@pytest.fixture(scope="module")
+def snapshot_dir(tmp_path_factory):
+    path = str(tmp_path_factory.mktemp("cold") / "snapshot")
+    seed_snapshot(path, 300)
+    return path
+
+def test_import_defers_heavy_modules_and_lazy_first_request_works(snapshot_dir):
+    report = measure(snapshot_dir, runs=1)
+    assert report["status"] == 200
+    assert report["heavy_modules_at_import"] == []
+    assert report["time_to_first_response_ms"] >= report["import_ms"] + report["first_response_ms"] - 1
+
+def test_lifespan_warmup_moves_the_cost_before_traffic(snapshot_dir):
+    lazy = measure(snapshot_dir, runs=1)
+    warm = measure(snapshot_dir, warmup=True, runs=1)
+    assert warm["status"] == 200
+    assert warm["heavy_modules_at_import"] == []
+    # Startup returns before the background warmup is done, which then builds the facets ahead of traffic
+    assert not warm["warmup_done_at_startup"]
+    assert warm["facets_ready_before_first_request"]
+    assert not lazy["facets_ready_before_first_request"]
+
+def test_budget_violations_are_reported():
+    report = {"lazy": {"import_ms": 900, "time_to_first_response_ms": 2000, "heavy_modules_at_import": ["pandas"]}, "config": {}}
+    problems = check_budget(report, max_import_ms=500, max_first_response_ms=3000)
+    assert len(problems) == 2
+    assert "pandas" in problems[0] and "900" in problems[1]
+    assert check_budget({"lazy": {**report["lazy"], "heavy_modules_at_import": []}}) == []
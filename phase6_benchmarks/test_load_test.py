@@ -0,0 +1,49 @@
+import asyncio
+import pytest
+from fixtures import synthetic_restaurants
+from load_test import build_scenarios, parse_server_timing, percentile, compare, configure_in_process, benchmark
+import fake_groq
+import main
+import llm_recommender
+import retrieval
+import snapshot
+
+@pytest.fixture
+def in_process(tmp_path, monkeypatch):
+    # configure_in_process rewires module globals; restore them afterwards
+    for module, names in [
+        (retrieval, ["RETRIEVAL_BACKEND", "_memory_index", "_facet_catalog"]),
+        (snapshot, ["SNAPSHOT_DIR"]),
+        (llm_recommender, ["async_client", "recommendation_cache", "parse_cache", "blurb_store"]),
+        (main, ["recommendation_cache", "parse_cache", "VOCABULARY", "GAZETTEER", "RESOLVER", "parse_flight", "recommend_flight"]),
+    ]:
+        for name in names:
+            monkeypatch.setattr(module, name, getattr(module, name))
+    monkeypatch.setitem(fake_groq.SETTINGS, "first_token_delay", 0.01)
+    configure_in_process(str(tmp_path), rows=500)
+
+def test_synthetic_dataset_is_deterministic_and_cleaned():
+    first, second = synthetic_restaurants(300), synthetic_restaurants(300)
+    assert first.equals(second)
+    assert str(first['rate'].dtype) == "float32"
+    assert first['rate'].isna().any()          # "NEW" ratings survive as NaN
+    assert first['name'].duplicated().any()    # chains share names
+
+def test_server_timing_and_percentiles():
+    assert parse_server_timing("parse;dur=1.5, retrieve;dur=0.2, llm;desc=\"x\";dur=250") == {"parse": 1.5, "retrieve": 0.2, "llm": 250.0}
+    assert parse_server_timing(None) == {}
+    values = list(range(1, 101))
+    assert (percentile(values, 50), percentile(values, 95), percentile(values, 99)) == (50, 95, 99)
+
+def test_compare_reports_relative_change():
+    old = {"requests_per_second": 10, "latency_ms": {"total": {"p50": 100, "p95": 200}}}
+    new = {"requests_per_second": 15, "latency_ms": {"total": {"p50": 90, "p95": 100}}}
+    assert compare(new, old) == {"requests_per_second_pct": 50.0, "total_p95_pct": -50.0, "total_p50_pct": -10.0}
+
+def test_in_process_benchmark_reports_every_stage(in_process):
+    report = asyncio.run(benchmark(requests=24, concurrency=6, scenarios=build_scenarios(8)))
+    assert report["errors"] == 0
+    assert report["requests"] == 24
+    assert set(report["latency_ms"]) == {"parse", "retrieve", "llm", "total", "client"}
+    assert report["latency_ms"]["llm"]["p50"] >= 10
+    assert report["requests_per_second"] > 0
@@ -20,29 +20,117 @@ export default function Home() {
   const [restaurants, setRestaurants] = useState<Restaurant[]>([]);
   const [summary, setSummary] = useState("");
   const [loading, setLoading] = useState(false);
+  const [nextCursor, setNextCursor] = useState<string | null>(null);
+  const [loadingMore, setLoadingMore] = useState(false);
 
   // Filter States
-  const [locations, setLocations] = useState<string[]>([]);
+  const [locationSuggestions, setLocationSuggestions] = useState<string[]>([]);
   const [cuisines, setCuisines] = useState<string[]>([]);
 
   const [selectedLocation, setSelectedLocation] = useState("");
   const [selectedCuisine, setSelectedCuisine] = useState("");
   const [maxPrice, setMaxPrice] = useState("1000");
   const [minRating, setMinRating] = useState("4.0");
+  // Restaurant counts per dropdown value under the other current filters; 0 greys the option out
+  const [facetCounts, setFacetCounts] = useState<Record<string, Record<string, number>>>({});
 
   useEffect(() => {
     // Fetch filter options on mount
-    fetch("/api/locations")
-      .then(res => res.json())
-      .then(data => setLocations(data.locations || []))
-      .catch(err => console.error(err));
-
     fetch("/api/cuisines")
       .then(res => res.json())
       .then(data => setCuisines(data.cuisines || []))
       .catch(err => console.error(err));
   }, []);
 
+  useEffect(() => {
+    // Locality autocomplete: ranked prefix/typo matches from the backend instead of the full list
+    const q = selectedLocation.trim();
+    if (!q) {
+      setLocationSuggestions([]);
+      return;
+    }
+    const controller = new AbortController();
+    const timer = setTimeout(() => {
+      fetch(`/api/suggest?kind=location&q=${encodeURIComponent(q)}`, { signal: controller.signal })
+        .then(res => res.json())
+        // eslint-disable-next-line @typescript-eslint/no-explicit-any
+        .then(data => setLocationSuggestions((data.suggestions || []).map((s: any) => s.name)))
+        .catch(err => {
+          if (err.name !== "AbortError") console.error(err);
+        });
+    }, 80);
+    return () => {
+      clearTimeout(timer);
+      controller.abort();
+    };
+  }, [selectedLocation]);
+
+  useEffect(() => {
+    // One precomputed-bitmap lookup on the backend covers every dropdown
+    const params = new URLSearchParams({ max_price: maxPrice, min_rating: minRating });
+    if (selectedLocation.trim()) params.set("location", selectedLocation.trim());
+    if (selectedCuisine) params.set("cuisine", selectedCuisine);
+    const controller = new AbortController();
+    const timer = setTimeout(() => {
+      fetch(`/api/facets/counts?${params}`, { signal: controller.signal })
+        .then(res => res.json())
+        .then(data => {
+          const counts: Record<string, Record<string, number>> = {};
+          for (const facet of ["cuisine", "max_price", "min_rating"]) {
+            counts[facet] = {};
+            for (const entry of data[facet] || []) counts[facet][String(entry.value)] = entry.count;
+          }
+          setFacetCounts(counts);
+        })
+        .catch(err => {
+          if (err.name !== "AbortError") console.error(err);
+        });
+    }, 80);
+    return () => {
+      clearTimeout(timer);
+      controller.abort();
+    };
+  }, [selectedLocation, selectedCuisine, maxPrice, minRating]);
+
+  const isEmptyOption = (facet: string, value: string) => {
+    const key = facet === "cuisine" ? value : String(parseFloat(value));
+    return facetCounts[facet]?.[key] === 0;
+  };
+
+  // Deep check to prevent .map crashes (in case LLM wraps it weirdly)
+  // eslint-disable-next-line @typescript-eslint/no-explicit-any
+  const extractRestaurants = (parsed: any): Restaurant[] => {
+    if (Array.isArray(parsed.restaurants)) return parsed.restaurants;
+    if (Array.isArray(parsed)) return parsed;
+    // Edge case: Sometimes LLMs double-wrap {"restaurants": {"restaurants": []}}
+    if (parsed.restaurants && Array.isArray(parsed.restaurants.restaurants)) return parsed.restaurants.restaurants;
+    return [];
+  };
+
+  const handleShowMore = async () => {
+    if (!nextCursor) return;
+    setLoadingMore(true);
+    try {
+      // The cursor carries the already-resolved filters, so the backend skips query parsing
+      const res = await fetch("/api/recommend", {
+        method: "POST",
+        headers: { "Content-Type": "application/json" },
+        body: JSON.stringify({ cursor: nextCursor })
+      });
+      const data = await res.json();
+      setNextCursor(data.next_cursor || null);
+      if (data.recommendation_text) {
+        const more = extractRestaurants(JSON.parse(data.recommendation_text));
+        setRestaurants(prev => [...prev, ...more]);
+      }
+    } catch (error) {
+      console.error("Failed to fetch more recommendations:", error);
+      setNextCursor(null);
+    } finally {
+      setLoadingMore(false);
+    }
+  };
+
   const handleSearch = async () => {
     setLoading(true);
     try {
@@ -61,6 +149,7 @@ export default function Home() {
         body: JSON.stringify(payload)
       });
       const data = await res.json();
+      setNextCursor(data.next_cursor || null);
 
       if (data.recommendation_text) {
         try {
@@ -68,16 +157,9 @@ export default function Home() {
           if (data.parsed_filters) {
             const pf = data.parsed_filters;
 
-            // Location Sync - only update if AI found a valid location from the prompt
+            // Location Sync - the backend already resolved it to a known locality
             if (pf.location) {
-              const matchedLoc = locations.find(l => l.toLowerCase() === pf.location.toLowerCase()) ||
-                locations.find(l => l.toLowerCase().includes(pf.location.toLowerCase()));
-              if (matchedLoc) {
-                setSelectedLocation(matchedLoc);
-              } else {
-                if (!locations.includes(pf.location)) setLocations(prev => [pf.location, ...prev]);
-                setSelectedLocation(pf.location);
-              }
+              setSelectedLocation(pf.location);
             } else if (prompt && !selectedLocation) {
               // If user used search box, AI found NO location, AND user hasn't manually selected one, clear it
               setSelectedLocation("");
@@ -105,18 +187,7 @@ export default function Home() {
           const parsed = JSON.parse(data.recommendation_text);
           console.log("Parsed AI JSON:", parsed);
 
-          // Deep check to prevent .map crashes (in case LLM wraps it weirdly)
-          let restaurantList: Restaurant[] = [];
-          if (Array.isArray(parsed.restaurants)) {
-            restaurantList = parsed.restaurants;
-          } else if (Array.isArray(parsed)) {
-            restaurantList = parsed;
-          } else if (parsed.restaurants && Array.isArray(parsed.restaurants.restaurants)) {
-            // Edge case: Sometimes LLMs double-wrap {"restaurants": {"restaurants": []}}
-            restaurantList = parsed.restaurants.restaurants;
-          }
-
-          setRestaurants(restaurantList);
+          setRestaurants(extractRestaurants(parsed));
 
           if (parsed.summary) {
             setSummary(parsed.summary);
@@ -187,22 +258,25 @@ export default function Home() {
           </div>
 
           <div className="flex flex-wrap justify-center gap-4 mb-8">
-            {/* Location Dropdown */}
+            {/* Location Autocomplete */}
             <div className="relative">
-              <select
-                className="appearance-none bg-white border text-sm md:text-base border-gray-200 rounded-full pl-4 pr-10 py-2 cursor-pointer hover:bg-gray-50 hover:shadow-sm transition-all focus:outline-none"
+              <input
+                type="text"
+                list="location-suggestions"
+                placeholder="Select locality..."
+                className="bg-white border text-sm md:text-base border-gray-200 rounded-full pl-4 pr-10 py-2 hover:bg-gray-50 hover:shadow-sm transition-all focus:outline-none"
                 value={selectedLocation}
                 onChange={(e) => {
                   setSelectedLocation(e.target.value);
                   setPrompt("");
                 }}
-              >
-                <option value="">Select locality...</option>
-                {locations.map(loc => (
-                  <option key={loc} value={loc}>{loc}</option>
+              />
+              <datalist id="location-suggestions">
+                {locationSuggestions.map(loc => (
+                  <option key={loc} value={loc} />
                 ))}
-              </select>
-              <ChevronDown className="w-4 h-4 text-gray-500 absolute right-4 top-3 pointer-events-none" />
+              </datalist>
+              <MapPin className="w-4 h-4 text-gray-500 absolute right-4 top-3 pointer-events-none" />
             </div>
 
             {/* Cuisine Dropdown */}
@@ -217,7 +291,7 @@ export default function Home() {
               >
                 <option value="">Select cuisines...</option>
                 {cuisines.map(c => (
-                  <option key={c} value={c}>{c}</option>
+                  <option key={c} value={c} disabled={isEmptyOption("cuisine", c)}>{c}</option>
                 ))}
               </select>
               <ChevronDown className="w-4 h-4 text-gray-500 absolute right-4 top-3 pointer-events-none" />
@@ -230,10 +304,10 @@ export default function Home() {
                 value={maxPrice}
                 onChange={(e) => setMaxPrice(e.target.value)}
               >
-                <option value="500">Up to ₹500</option>
-                <option value="1000">Up to ₹1000</option>
-                <option value="2000">Up to ₹2000</option>
-                <option value="5000">Up to ₹5000</option>
+                <option value="500" disabled={isEmptyOption("max_price", "500")}>Up to ₹500</option>
+                <option value="1000" disabled={isEmptyOption("max_price", "1000")}>Up to ₹1000</option>
+                <option value="2000" disabled={isEmptyOption("max_price", "2000")}>Up to ₹2000</option>
+                <option value="5000" disabled={isEmptyOption("max_price", "5000")}>Up to ₹5000</option>
               </select>
               <ChevronDown className="w-4 h-4 text-gray-500 absolute right-4 top-3 pointer-events-none" />
             </div>
@@ -245,10 +319,10 @@ export default function Home() {
                 value={minRating}
                 onChange={(e) => setMinRating(e.target.value)}
               >
-                <option value="3.0">3.0+ Stars</option>
-                <option value="3.5">3.5+ Stars</option>
-                <option value="4.0">4.0+ Stars</option>
-                <option value="4.5">4.5+ Stars</option>
+                <option value="3.0" disabled={isEmptyOption("min_rating", "3.0")}>3.0+ Stars</option>
+                <option value="3.5" disabled={isEmptyOption("min_rating", "3.5")}>3.5+ Stars</option>
+                <option value="4.0" disabled={isEmptyOption("min_rating", "4.0")}>4.0+ Stars</option>
+                <option value="4.5" disabled={isEmptyOption("min_rating", "4.5")}>4.5+ Stars</option>
               </select>
               <ChevronDown className="w-4 h-4 text-gray-500 absolute right-4 top-3 pointer-events-none" />
             </div>
@@ -286,7 +360,7 @@ export default function Home() {
 
           <div className="grid grid-cols-1 md:grid-cols-2 lg:grid-cols-3 gap-8">
             {restaurants.map((restaurant, idx) => (
-              <div key={restaurant.id || idx} className="bg-white rounded-2xl shadow-[0_2px_12px_rgb(0,0,0,0.06)] border border-gray-100 overflow-hidden hover:shadow-lg transition-shadow">
+              <div key={`${restaurant.name}-${idx}`} className="bg-white rounded-2xl shadow-[0_2px_12px_rgb(0,0,0,0.06)] border border-gray-100 overflow-hidden hover:shadow-lg transition-shadow">
                 {/* Content... */}
                 <div className="p-4">
                   <div className="flex justify-between items-start mb-1">
@@ -334,6 +408,16 @@ export default function Home() {
               </div>
             ))}
           </div>
+
+          {nextCursor && restaurants.length > 0 && (
+            <button
+              onClick={handleShowMore}
+              disabled={loadingMore}
+              className="mt-10 mx-auto flex items-center justify-center border border-[#E23744] text-[#E23744] hover:bg-rose-50 font-medium px-8 py-3 rounded-xl transition-all active:scale-95"
+            >
+              {loadingMore ? <Loader2 className="w-5 h-5 animate-spin" /> : "Show more"}
+            </button>
+          )}
         </section>
 
       </main>
@@ -2,9 +2,9 @@ import sys
 import os
 import pandas as pd
 sys.path.append(os.path.join(os.getcwd(), 'phase1_data_ingestion'))
-from data_ingestion import get_zomato_data
+from snapshot import load_restaurant_data
 
-df = get_zomato_data()
+df = load_restaurant_data()
 df['approx_cost(for two people)'] = pd.to_numeric(df['approx_cost(for two people)'], errors='coerce')
 df['rate'] = pd.to_numeric(df['rate'], errors='coerce')
 